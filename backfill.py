@@ -0,0 +1,214 @@
+import datetime
+import json
+import logging
+import os
+import re
+import threading
+from lxml import html as lxml_html
+from http_scraper import NaverHttpClient, HttpEngineError
+from batch_crawler import crawl_batch, load_watchlist, TokenBucket
+from storage import OhlcvStorage, SQLITE_FILENAME
+from metrics import setup_logging
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = "backfill_checkpoint.json"
+BACKFILL_SYMBOL_CONCURRENCY = 4  # 동시에 백필할 종목 수
+BACKFILL_PAGE_WINDOW = 4  # 종목당 한 번에 가져올 페이지 수
+BACKFILL_RATE = 8.0  # 전체 초당 최대 요청 수
+
+_DATE_PATTERN = re.compile(r"^\d{4}\.\d{2}\.\d{2}$")
+_PAGE_PATTERN = re.compile(r"page=(\d+)")
+
+
+def _to_int(text):
+    digits = text.replace(",", "").strip()
+    return int(digits) if digits.lstrip("-").isdigit() else None
+
+
+def parse_sise_day_page(page_html):
+    """일별 시세 페이지(item/sise_day.nhn) HTML에서 ([일별 시세 dict], 마지막 페이지 번호) 추출
+
+    날짜는 ISO 문자열(YYYY-MM-DD), 전일비는 하락이면 음수
+    """
+    tree = lxml_html.fromstring(page_html)
+    rows = []
+    for tr in tree.cssselect("table.type2 tr"):
+        cells = tr.cssselect("td")
+        if len(cells) < 7:
+            continue
+        date_text = cells[0].text_content().strip()
+        if not _DATE_PATTERN.match(date_text):
+            continue  # 구분선/빈 행
+
+        change_cell = cells[2]
+        change = _to_int(re.sub(r"[^\d,]", "", change_cell.text_content()))
+        if change is not None and "하락" in change_cell.text_content():
+            change = -change
+
+        rows.append({
+            "date": date_text.replace(".", "-"),
+            "close": _to_int(cells[1].text_content()),
+            "change": change,
+            "open": _to_int(cells[3].text_content()),
+            "high": _to_int(cells[4].text_content()),
+            "low": _to_int(cells[5].text_content()),
+            "volume": _to_int(cells[6].text_content()),
+        })
+
+    last_page = None
+    last_links = tree.cssselect("td.pgRR a")
+    if last_links:
+        match = _PAGE_PATTERN.search(last_links[0].get("href", ""))
+        if match:
+            last_page = int(match.group(1))
+    return rows, last_page
+
+
+class Checkpoint:
+    """종목별 백필 진행 상황을 JSON 파일에 기록 (중단 후 다시 실행하면 이어서 진행)"""
+
+    def __init__(self, filename=CHECKPOINT_FILE):
+        self.filename = filename
+        self._lock = threading.Lock()
+        self.state = {}
+        if os.path.exists(filename):
+            with open(filename, "r", encoding="utf-8") as file:
+                self.state = json.load(file)
+
+    def get(self, code):
+        with self._lock:
+            return dict(self.state.get(code, {}))
+
+    def update(self, code, **values):
+        """종목 상태를 갱신하고 임시 파일 → 교체 방식으로 저장"""
+        with self._lock:
+            self.state.setdefault(code, {}).update(values)
+            temp_filename = f"{self.filename}.tmp"
+            with open(temp_filename, "w", encoding="utf-8") as file:
+                json.dump(self.state, file, ensure_ascii=False, indent=2)
+            os.replace(temp_filename, self.filename)
+
+    def clear(self):
+        """모든 종목 완료 시 체크포인트 삭제"""
+        with self._lock:
+            self.state = {}
+            if os.path.exists(self.filename):
+                os.remove(self.filename)
+
+
+class HistoryBackfiller:
+    """종목별 일별 시세(sise_day)를 과거로 거슬러 올라가며 저장
+
+    - 이미 저장된 마지막 날짜(백필 시작 시점 기준)보다 과거이거나 since 이전 날짜가 나오면 중단
+      (마지막 날짜는 장중에 저장된 미완성 행일 수 있으므로 항상 다시 가져와 덮어씀)
+    - 페이지 묶음(window)마다 저장 후 체크포인트 기록 → 중단되어도 다음 실행에서 이어서 진행
+    - 종목과 페이지를 병렬로 가져오되 전체 요청 속도는 하나의 토큰 버킷으로 제한
+    """
+
+    def __init__(self, http_client=None, store=None, checkpoint=None, since=None, max_pages=None,
+                 symbol_concurrency=BACKFILL_SYMBOL_CONCURRENCY, page_window=BACKFILL_PAGE_WINDOW,
+                 rate=BACKFILL_RATE, stop_event=None):
+        self.http_client = http_client or NaverHttpClient()
+        self.store = store or OhlcvStorage(SQLITE_FILENAME)
+        self.checkpoint = checkpoint or Checkpoint()
+        self.since = since.isoformat() if isinstance(since, datetime.date) else since
+        self.max_pages = max_pages
+        self.symbol_concurrency = symbol_concurrency
+        self.page_window = page_window
+        self.bucket = TokenBucket(rate, capacity=max(1, page_window))
+        self.stop_event = stop_event
+
+    def _fetch_page(self, job):
+        code, page = job
+        try:
+            return parse_sise_day_page(self.http_client.fetch("/item/sise_day.nhn", params={"code": code, "page": page}))
+        except HttpEngineError as e:
+            logger.error("❌ [BACKFILL] [%s] %s페이지 요청 실패: %s", code, page, e)
+            return None
+
+    def backfill_symbol(self, code):
+        """한 종목 백필 (저장한 행 수 반환, 페이지 요청 실패 시 None)"""
+        state = self.checkpoint.get(code)
+        if state.get("done"):
+            return 0
+
+        # 백필 시작 시점에 이미 저장되어 있던 마지막 날짜 (재시작해도 같은 기준 사용)
+        if "stop_date" not in state:
+            state = {"stop_date": self.store.latest_date(code), "next_page": 1}
+            self.checkpoint.update(code, **state)
+        stop_date = state["stop_date"]
+        page = state["next_page"]
+        last_page = state.get("last_page")
+        oldest_date = state.get("oldest_date")
+        saved = 0
+
+        while True:
+            if self.stop_event is not None and self.stop_event.is_set():
+                return saved
+            if self.max_pages is not None and page > self.max_pages:
+                break
+            if last_page is not None and page > last_page:
+                break
+
+            # 이어서 받는 경우 저장된 마지막 날짜는 거의 항상 1페이지에 있으므로 1페이지만 먼저 요청
+            window = 1 if stop_date and page == 1 else self.page_window
+            window_end = page + window - 1
+            if last_page is not None:
+                window_end = min(window_end, last_page)
+            if self.max_pages is not None:
+                window_end = min(window_end, self.max_pages)
+            jobs = [(code, p) for p in range(page, window_end + 1)]
+            results = crawl_batch(jobs, self._fetch_page, max_workers=len(jobs), timeout=None,
+                                  stop_event=self.stop_event, bucket=self.bucket)
+
+            rows, reached_end = [], False
+            for result in results:
+                if result is None:
+                    logger.warning("⚠️ [BACKFILL] [%s] 페이지 요청 실패, 다음 실행에서 %s페이지부터 재시도", code, page)
+                    self.store.upsert(rows)
+                    return None
+                page_rows, page_last = result
+                if page_last is not None:
+                    last_page = page_last
+                # 마지막 페이지를 넘어가면 같은 페이지가 반복되므로 날짜가 더 과거로 가지 않으면 끝
+                if not page_rows or (oldest_date and page_rows[0]["date"] >= oldest_date):
+                    reached_end = True
+                    break
+                oldest_date = page_rows[-1]["date"]
+                for row in page_rows:
+                    if (stop_date and row["date"] < stop_date) or (self.since and row["date"] < self.since):
+                        reached_end = True
+                        break
+                    rows.append({**row, "code": code})
+                if reached_end:
+                    break
+
+            saved += self.store.upsert(rows)
+            page = window_end + 1
+            self.checkpoint.update(code, next_page=page, last_page=last_page, oldest_date=oldest_date)
+            if reached_end:
+                break
+
+        self.checkpoint.update(code, done=True)
+        logger.info("✅ [BACKFILL] [%s] %s건 저장 완료", code, saved)
+        return saved
+
+    def run(self, stock_codes):
+        """여러 종목 백필 (모두 끝나면 체크포인트 삭제) 후 {종목코드: 저장 건수} 반환"""
+        logger.info("📌 [BACKFILL] %s개 종목 일별 시세 백필 시작", len(stock_codes))
+        results = crawl_batch(stock_codes, self.backfill_symbol, max_workers=self.symbol_concurrency,
+                              rate=None, timeout=None, stop_event=self.stop_event)
+        summary = dict(zip(stock_codes, results))
+
+        if all(self.checkpoint.get(code).get("done") for code in stock_codes):
+            self.checkpoint.clear()
+            logger.info("✅ [BACKFILL] 모든 종목 백필 완료")
+        else:
+            logger.warning("⚠️ [BACKFILL] 미완료 종목이 있어 체크포인트 유지: %s", self.checkpoint.filename)
+        return summary
+
+
+if __name__ == "__main__":
+    setup_logging()
+    HistoryBackfiller().run(load_watchlist("stocks.txt"))
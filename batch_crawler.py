@@ -0,0 +1,133 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+logger = logging.getLogger(__name__)
+
+# 배치 크롤링 기본 설정
+DEFAULT_CONCURRENCY = 4  # 동시에 크롤링할 최대 종목 수
+DEFAULT_RATE = 5.0  # 초당 최대 요청 수 (토큰 버킷 충전 속도)
+DEFAULT_BURST = 5  # 순간적으로 허용할 최대 요청 수 (버킷 크기)
+DEFAULT_SYMBOL_TIMEOUT = 15  # 종목당 최대 처리 시간 (초)
+_POLL_INTERVAL = 0.2  # 타임아웃 확인 주기 (초)
+
+
+class TokenBucket:
+    """토큰 버킷 방식 요청 속도 제한기 (스레드 안전)"""
+
+    def __init__(self, rate=DEFAULT_RATE, capacity=DEFAULT_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, stop_event=None):
+        """토큰 하나를 얻을 때까지 대기 (stop_event가 설정되면 False 반환)"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                delay = (1 - self._tokens) / self.rate
+
+            if stop_event is not None:
+                if stop_event.wait(delay):
+                    return False
+            else:
+                time.sleep(delay)
+
+
+def load_watchlist(filename="stocks.txt"):
+    """stocks.txt에서 종목 코드 목록 읽기 (`#` 뒤 주석과 빈 줄, 중복 코드 제외)"""
+    if not os.path.exists(filename):
+        return []
+
+    stock_codes = []
+    with open(filename, "r", encoding="utf-8") as file:
+        for line in file:
+            stock_code = line.split("#", 1)[0].strip()
+            if stock_code and stock_code not in stock_codes:
+                stock_codes.append(stock_code)
+    return stock_codes
+
+
+def crawl_batch(stock_codes, fetch, max_workers=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                timeout=DEFAULT_SYMBOL_TIMEOUT, stop_event=None, bucket=None):
+    """여러 종목을 동시에 크롤링하고 입력 순서대로 결과 리스트 반환
+
+    - fetch(stock_code)는 데이터 dict 또는 None을 반환하는 함수
+    - 동시 실행 수는 max_workers, 요청 속도는 초당 rate개로 제한 (bucket을 넘기면 그 제한을 공유, rate=None이면 제한 없음)
+    - 종목별로 실행 시작 후 timeout초가 지나면 None으로 처리하고 기다리지 않음 (None이면 제한 없음)
+    - 시간 초과된 스레드는 멈출 수 없어 실행 슬롯을 계속 차지하므로, 종목별 timeout은 대기 중인 종목에 대한 상한이 아님
+      → 배치 전체 마감 시각(모든 종목이 timeout을 다 쓰고 속도 제한까지 받았을 때 걸리는 시간)이 지나면
+        아직 끝나지 않은 종목을 모두 None으로 처리하고 반환
+    """
+    results = [None] * len(stock_codes)
+    if not stock_codes:
+        return results
+
+    if bucket is None and rate is not None:
+        bucket = TokenBucket(rate, capacity=max(1, min(DEFAULT_BURST, max_workers)))
+    started_at = {}
+
+    deadline = None
+    if timeout is not None:
+        waves = -(-len(stock_codes) // max_workers)
+        deadline = time.monotonic() + timeout * waves + (len(stock_codes) / bucket.rate if bucket is not None else 0)
+
+    def task(index, stock_code):
+        if stop_event is not None and stop_event.is_set():
+            return None
+        if bucket is not None and not bucket.acquire(stop_event):
+            return None
+        started_at[index] = time.monotonic()
+        return fetch(stock_code)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crawl")
+    futures = {executor.submit(task, index, code): index for index, code in enumerate(stock_codes)}
+    pending = set(futures)
+
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    logger.error("❌ [BATCH] [%s] 크롤링 오류: %s", stock_codes[index], e)
+
+            # ✅ 시간 초과된 종목은 결과를 기다리지 않고 건너뜀
+            now = time.monotonic()
+            for future in list(pending):
+                index = futures[future]
+                if timeout is not None and index in started_at and now - started_at[index] > timeout:
+                    logger.warning("⏰ [BATCH] [%s] %s초 초과로 건너뜀", stock_codes[index], timeout)
+                    future.cancel()
+                    pending.discard(future)
+
+            if deadline is not None and pending and now > deadline:
+                logger.warning("⏰ [BATCH] 배치 마감 시간 초과로 남은 %s개 종목 건너뜀", len(pending))
+                for future in pending:
+                    future.cancel()
+                break
+
+            if stop_event is not None and stop_event.is_set():
+                for future in pending:
+                    future.cancel()
+                break
+    finally:
+        # 멈춘 작업 스레드가 배치 전체를 붙잡지 않도록 기다리지 않고 종료
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
@@ -0,0 +1,341 @@
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT_DIR, "bench", "results")
+DEFAULT_BASELINE = os.path.join(ROOT_DIR, "bench", "baseline.json")
+REGRESSION_THRESHOLD = 0.10  # 기준 대비 10% 이상 나빠지면 회귀로 표시
+MIN_REGRESSION_MS = 0.05  # 이보다 작은 시간 차이는 측정 오차로 보고 회귀로 보지 않음
+
+SCENARIOS = ("single_symbol", "batch", "storage", "search", "intraday")
+SEARCH_QUERIES = ("005930", "0006", "삼성", "삼성전자", "하이닉스", "ㅅㅅㅈㅈ", "ㅎㄷ", "전자", "바이오", "없는종목")
+
+
+def _stats(prefix, seconds):
+    """측정값(초) 목록 → {prefix_p50_ms, prefix_p95_ms, prefix_mean_ms}"""
+    if not seconds:
+        return {}
+    ordered = sorted(seconds)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        f"{prefix}_p50_ms": round(statistics.median(ordered) * 1000, 3),
+        f"{prefix}_p95_ms": round(p95 * 1000, 3),
+        f"{prefix}_mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+def _timed(func, iterations):
+    """func를 iterations번 실행해 (실행 시간 목록, 예외 횟수) 반환"""
+    seconds, errors = [], 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        try:
+            func()
+        except Exception:
+            errors += 1
+        seconds.append(time.perf_counter() - started)
+    return seconds, errors
+
+
+def _no_selenium(driver_path):
+    from selenium.common.exceptions import WebDriverException
+    raise WebDriverException("벤치마크에서는 Selenium 폴백을 사용하지 않음")
+
+
+def bench_single_symbol(main, iterations):
+    """종목 1개 / 환율 크롤링 지연 시간 (get_stock_data, get_exchange_rate)
+
+    stock / exchange_uncached는 매번 페이지 캐시를 비워 전체 응답 + 파싱 비용을 측정하고,
+    페이지가 바뀌지 않았을 때(304 / 같은 본문 해시)의 비용은 stock_not_modified로 따로 측정
+    """
+    scraper = main.StockExchangeScraper.get_instance()
+    http_client = scraper.http_client
+
+    def fetch_stock():
+        http_client.clear_page_cache()
+        scraper.get_stock_data("005930")
+
+    def fetch_exchange():
+        http_client.clear_page_cache()
+        scraper.get_exchange_rate(force=True)
+
+    stock_seconds, stock_errors = _timed(fetch_stock, iterations)
+    scraper.get_stock_data("005930")
+    not_modified_seconds, _ = _timed(lambda: scraper.get_stock_data("005930"), iterations)
+    uncached_seconds, _ = _timed(fetch_exchange, iterations)
+    cached_seconds, _ = _timed(scraper.get_exchange_rate, iterations)
+    return {
+        **_stats("stock", stock_seconds),
+        "stock_errors": stock_errors,
+        **_stats("stock_not_modified", not_modified_seconds),
+        **_stats("exchange_uncached", uncached_seconds),
+        **_stats("exchange_cached", cached_seconds),
+    }
+
+
+def bench_batch(main, symbols, max_workers, rate):
+    """N개 종목 배치 크롤링 처리량 (auto_crawl과 같은 crawl_batch 경로)"""
+    from batch_crawler import crawl_batch
+
+    scraper = main.StockExchangeScraper.get_instance()
+    stock_codes = [f"{index:06d}" for index in range(symbols)]
+    started = time.perf_counter()
+    results = crawl_batch(stock_codes, scraper.fetch_stock_data, max_workers=max_workers, rate=rate)
+    elapsed = time.perf_counter() - started
+    succeeded = sum(1 for result in results if result)
+    return {
+        "symbols": symbols,
+        "succeeded": succeeded,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "symbols_per_sec": round(succeeded / elapsed, 3) if elapsed else 0.0,
+    }
+
+
+def bench_storage(main, history_sizes, batch_size, repeats):
+    """이력 크기별 저장 비용 (save_to_csv, SQLite 저장소)"""
+    from storage import CsvAppendStorage, SqliteStorage
+
+    scraper = main.StockExchangeScraper.get_instance()
+    row = scraper.link_market_snapshot(scraper.http_client.get_stock_data("005930"), scraper.get_market_snapshot())
+    next_code = iter(range(10 ** 6))
+
+    def make_rows(count):
+        # (기준 날짜, 종목코드)가 같은 행은 중복으로 건너뛰므로 종목코드를 모두 다르게
+        return [{**row, "종목코드": f"{next(next_code):06d}"} for _ in range(count)]
+
+    metrics = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in history_sizes:
+            csv_filename = os.path.join(temp_dir, f"history_{size}.csv")
+            sqlite_filename = os.path.join(temp_dir, f"history_{size}.db")
+            if size:
+                history = make_rows(size)
+                CsvAppendStorage(csv_filename).write(history)
+                SqliteStorage(sqlite_filename).write(history)
+
+            def save_csv():
+                # 프로세스당 첫 저장(중복 키 읽기 포함)을 측정하도록 키 캐시를 비움
+                CsvAppendStorage._saved_keys.pop(os.path.abspath(csv_filename), None)
+                scraper.stock_data_list = make_rows(batch_size)
+                scraper.market_snapshot = None
+                scraper.save_to_csv(csv_filename)
+
+            sqlite_storage = SqliteStorage(sqlite_filename)
+            csv_seconds, _ = _timed(save_csv, repeats)
+            sqlite_seconds, _ = _timed(lambda: sqlite_storage.write(make_rows(batch_size)), repeats)
+            metrics.update(_stats(f"csv_append_{size}", csv_seconds))
+            metrics.update(_stats(f"sqlite_append_{size}", sqlite_seconds))
+
+    scraper.stock_data_list = []
+    metrics["batch_size"] = batch_size
+    return metrics
+
+
+def bench_search(main, universe_filename, iterations):
+    """종목 검색 지연 시간과 검색 → 크롤링(search_and_crawl) 경로 지연 시간"""
+    from symbol_index import SymbolIndex
+
+    index = SymbolIndex(universe_filename)
+    search_seconds = []
+    for _ in range(iterations):
+        for query in SEARCH_QUERIES:
+            started = time.perf_counter()
+            index.search(query, limit=main.SEARCH_RESULT_LIMIT)
+            search_seconds.append(time.perf_counter() - started)
+
+    # GUI의 search_and_crawl과 같은 순서: 검색 → 첫 결과 크롤링 → 환율(캐시) → 저장할 행 구성
+    scraper = main.StockExchangeScraper.get_instance()
+
+    def search_and_crawl():
+        _, code, _ = index.search("삼성전자", limit=1)[0]
+        scraper.stock_data_list = []
+        scraper.get_stock_data(code)
+        scraper.get_exchange_rate()
+        return scraper.build_rows()
+
+    crawl_seconds, crawl_errors = _timed(search_and_crawl, iterations)
+    scraper.stock_data_list = []
+    return {
+        "symbols": len(index.entries),
+        **_stats("search", search_seconds),
+        **_stats("search_and_crawl", crawl_seconds),
+        "search_and_crawl_errors": crawl_errors,
+    }
+
+
+def bench_intraday(server_url, symbols, cycles):
+    """장중 폴링 1회(관심 종목 전체 실시간 시세 요청 + 바뀐 틱 저장) 지연 시간과 저장 비율"""
+    from http_scraper import NaverHttpClient
+    from intraday import IntradayPoller
+    from storage import TickStorage
+
+    stock_codes = [f"{index:06d}" for index in range(symbols)]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        poller = IntradayPoller(NaverHttpClient(base_url=server_url), TickStorage(os.path.join(temp_dir, "ticks.db")),
+                                rate=None)
+        poller.poll_once(stock_codes)  # 첫 폴링은 모든 종목이 새 틱
+        written = []
+        seconds, errors = _timed(lambda: written.append(len(poller.poll_once(stock_codes))), cycles)
+
+    polled = symbols * len(written)
+    return {
+        "symbols": symbols,
+        **_stats("poll_cycle", seconds),
+        "poll_errors": errors,
+        "ticks_polled": polled,
+        "ticks_written": sum(written),
+        "written_ratio": round(sum(written) / polled, 3) if polled else 0.0,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    """모의 서버를 띄우고 선택한 시나리오를 실행해 결과 dict 반환"""
+    os.chdir(ROOT_DIR)  # main.py가 상대 경로(kospi_stock_codes.csv 등)를 사용
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+
+    from bench.mock_server import MockNaverServer
+    from http_scraper import NaverHttpClient
+    from driver_pool import WebDriverPool
+    from metrics import metrics, setup_logging
+
+    setup_logging(logging.DEBUG if args.verbose else logging.CRITICAL)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": vars(args),
+        },
+        "scenarios": {},
+    }
+
+    with MockNaverServer(args.latency, args.jitter, args.failure_rate, seed=args.seed) as server:
+        import main
+
+        # 모의 서버로 HTTP 요청을 보내고, 실패 시 Chrome을 띄우지 않도록 설정
+        main.StockExchangeScraper.http_client = NaverHttpClient(base_url=server.url)
+        main.StockExchangeScraper.driver_pool = WebDriverPool(None, driver_factory=_no_selenium)
+
+        for name in args.scenarios:
+            started = time.perf_counter()
+            if name == "single_symbol":
+                scenario = bench_single_symbol(main, args.iterations)
+            elif name == "batch":
+                scenario = bench_batch(main, args.symbols, args.workers, args.rate)
+            elif name == "storage":
+                scenario = bench_storage(main, args.history_sizes, args.batch_size, args.repeats)
+            elif name == "search":
+                scenario = bench_search(main, args.universe, args.iterations)
+            else:
+                scenario = bench_intraday(server.url, args.poll_symbols, args.iterations)
+            results["scenarios"][name] = scenario
+            print(f"⏱️ [BENCH] {name}: {time.perf_counter() - started:.2f}초", file=sys.stderr)
+
+        results["stages"] = metrics.snapshot()  # 전체 실행 동안의 단계별 소요 시간
+        results["meta"]["server_requests"] = server.requests
+        results["meta"]["server_failures"] = server.failures
+    return results
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """기준 결과와 비교해 [(시나리오, 지표, 기준값, 현재값, 변화율, 회귀 여부)] 반환
+
+    `_ms`로 끝나는 지표는 작을수록, `_per_sec`로 끝나는 지표는 클수록 좋음
+    """
+    rows = []
+    for scenario, metrics in results["scenarios"].items():
+        base_metrics = baseline.get("scenarios", {}).get(scenario, {})
+        for name, value in metrics.items():
+            base = base_metrics.get(name)
+            if not isinstance(base, (int, float)) or not base:
+                continue
+            change = (value - base) / base
+            regressed = (name.endswith("_ms") and change > threshold and value - base > MIN_REGRESSION_MS) or \
+                        (name.endswith("_per_sec") and change < -threshold)
+            rows.append((scenario, name, base, value, change, regressed))
+    return rows
+
+
+def print_comparison(rows):
+    for scenario, name, base, value, change, regressed in rows:
+        mark = "❌" if regressed else "  "
+        print(f"{mark} {scenario:<14} {name:<32} {base:>12.3f} → {value:>12.3f} ({change:+.1%})")
+    regressions = [row for row in rows if row[5]]
+    print(f"📊 [BENCH] 비교 지표 {len(rows)}개, 회귀 {len(regressions)}개")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="모의 네이버 금융 서버를 이용한 오프라인 벤치마크")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--iterations", type=int, default=30, help="지연 시간 측정 반복 횟수")
+    parser.add_argument("--symbols", type=int, default=50, help="배치 크롤링 종목 수")
+    parser.add_argument("--workers", type=int, default=4, help="배치 동시 실행 수")
+    parser.add_argument("--rate", type=float, default=None, help="배치 초당 요청 수 (기본: 제한 없음)")
+    parser.add_argument("--history-sizes", type=int, nargs="+", default=[0, 10000, 100000])
+    parser.add_argument("--batch-size", type=int, default=20, help="저장 1회당 행 수")
+    parser.add_argument("--repeats", type=int, default=10, help="저장 측정 반복 횟수")
+    parser.add_argument("--poll-symbols", type=int, default=150, help="장중 폴링 종목 수")
+    parser.add_argument("--universe", default="kospi_stock_codes.csv", help="검색에 사용할 종목 목록 파일")
+    parser.add_argument("--latency", type=float, default=0.0, help="모의 서버 응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="모의 서버 무작위 추가 지연 최대값 (초)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="모의 서버 503 응답 비율 (0~1)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: bench/results/bench_<시각>.json)")
+    parser.add_argument("--baseline", help=f"비교할 기준 결과 JSON (예: {os.path.relpath(DEFAULT_BASELINE, ROOT_DIR)})")
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 bench/baseline.json으로 저장")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="회귀로 판단할 변화율")
+    parser.add_argument("--verbose", action="store_true", help="크롤러 로그 출력")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # run()에서 작업 디렉터리를 바꾸므로 경로는 미리 절대 경로로
+    args.output = os.path.abspath(args.output) if args.output else None
+    args.baseline = os.path.abspath(args.baseline) if args.baseline else None
+    args.universe = os.path.abspath(args.universe) if os.path.exists(args.universe) else args.universe
+    results = run(args)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"bench_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+    print(f"✅ [BENCH] 결과 저장: {output}")
+
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, "w", encoding="utf-8") as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+        print(f"✅ [BENCH] 기준 결과 저장: {DEFAULT_BASELINE}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        if print_comparison(compare(results, baseline, args.threshold)):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
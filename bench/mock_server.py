@@ -0,0 +1,186 @@
+import argparse
+import hashlib
+import http.server
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+DEFAULT_STOCK_FIXTURE = "item_005930.html"  # 녹화된 페이지가 없는 종목코드에 대신 응답할 페이지
+FIXTURE_ENCODING = "euc-kr"
+REALTIME_CHANGE_RATE = 0.3  # 실시간 시세 요청마다 종목별로 가격/거래량이 바뀔 확률
+
+
+def _fixture_for(path, query):
+    """요청 경로 → 응답할 녹화 파일 이름 (없으면 None)"""
+    if path.startswith("/item/main"):
+        name = f"item_{query.get('code', [''])[0]}.html"
+        return name if os.path.exists(os.path.join(FIXTURE_DIR, name)) else DEFAULT_STOCK_FIXTURE
+    if path.startswith("/marketindex"):
+        return "marketindex.html"
+    if path.startswith("/sise"):
+        return "sise.html"
+    return None
+
+
+class MockNaverServer:
+    """녹화된 네이버 금융 페이지를 돌려주는 로컬 HTTP 서버 (지연/실패 주입 가능)
+
+    - latency: 모든 응답에 더할 지연 (초), jitter: 0 ~ jitter초 무작위 추가 지연
+    - failure_rate: 이 비율만큼 503 응답 (클라이언트 재시도 비용 측정용)
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, failure_rate=0.0, seed=None, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._ticks = {}  # 종목코드 -> [현재가, 거래량] (실시간 시세 응답용)
+        self._server = http.server.ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _load(self, name):
+        if name not in self._cache:
+            with open(os.path.join(FIXTURE_DIR, name), "rb") as file:
+                self._cache[name] = file.read()
+        return self._cache[name]
+
+    def _plan(self):
+        """이번 요청의 (지연 시간, 실패 여부) 결정"""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.failure_rate > 0 and self._random.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+        return delay, fail
+
+    def _realtime(self, query):
+        """실시간 시세 API 응답: 요청마다 종목별로 REALTIME_CHANGE_RATE 확률로 가격/거래량 변경"""
+        codes = query.get("query", [""])[0].split(":", 1)[-1].split(",")
+        datas = []
+        with self._lock:
+            for code in filter(None, codes):
+                tick = self._ticks.get(code)
+                base = 50000 + int(code) % 1000 * 100  # 전일 종가 (종목코드로 고정)
+                if tick is None:
+                    tick = self._ticks[code] = [base, 1000000]
+                elif self._random.random() < REALTIME_CHANGE_RATE:
+                    tick[0] += self._random.choice((-100, 0, 100))
+                    tick[1] += self._random.randint(1, 500)
+                change = tick[0] - base
+                direction = "2" if change > 0 else "5" if change < 0 else "3"  # 상승 / 하락 / 보합
+                datas.append({"cd": code, "nm": f"종목{code}", "sv": base, "nv": tick[0], "cv": abs(change),
+                              "cr": round(abs(change) / base * 100, 2), "rf": direction, "aq": tick[1], "ms": "OPEN"})
+        payload = {"resultCode": "success",
+                   "result": {"pollingInterval": 7000, "time": int(time.time() * 1000),
+                              "areas": [{"name": "SERVICE_ITEM", "datas": datas}]}}
+        return json.dumps(payload, ensure_ascii=False).encode(FIXTURE_ENCODING)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+            disable_nagle_algorithm = True  # 헤더/본문을 나눠 보낼 때 지연 ACK로 생기는 ~40ms 대기 방지
+
+            def do_GET(self):
+                delay, fail = server._plan()
+                if delay:
+                    time.sleep(delay)
+
+                parsed = urllib.parse.urlparse(self.path)
+                query = urllib.parse.parse_qs(parsed.query)
+                name = _fixture_for(parsed.path, query)
+                if fail:
+                    self._send(503, b"")
+                elif parsed.path.startswith("/api/realtime"):
+                    self._send(200, server._realtime(query), "application/json")
+                elif name is None:
+                    self._send(404, b"")
+                else:
+                    # 녹화 파일 내용 해시를 ETag로 사용 (조건부 요청이면 304)
+                    body = server._load(name)
+                    etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                    if self.headers.get("If-None-Match") == etag:
+                        self._send(304, b"", etag=etag)
+                    else:
+                        self._send(200, body, etag=etag)
+
+            def _send(self, status, body, content_type="text/html", etag=None):
+                self.send_response(status)
+                if etag:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Type", f"{content_type};charset={FIXTURE_ENCODING.upper()}")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-naver", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def record_fixtures(stock_codes, http_client=None):
+    """실제 네이버 금융에서 종목/시장지표 페이지를 받아 fixtures/에 저장"""
+    from http_scraper import NaverHttpClient
+
+    http_client = http_client or NaverHttpClient()
+    pages = [(f"item_{code}.html", "/item/main.nhn", {"code": code}) for code in stock_codes]
+    pages.append(("marketindex.html", "/marketindex/", None))
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for name, path, params in pages:
+        page_html = http_client.fetch(path, params=params)
+        with open(os.path.join(FIXTURE_DIR, name), "wb") as file:
+            file.write(page_html.encode(FIXTURE_ENCODING, errors="replace"))
+        print(f"✅ [BENCH] 녹화 완료: {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="녹화된 네이버 금융 페이지를 돌려주는 로컬 서버")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="무작위 추가 지연 최대값 (초)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="503 응답 비율 (0~1)")
+    parser.add_argument("--record", nargs="+", metavar="CODE", help="실제 사이트에서 종목 페이지를 녹화")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.record)
+    else:
+        mock = MockNaverServer(args.latency, args.jitter, args.failure_rate, port=args.port).start()
+        print(f"🚀 [BENCH] 모의 서버 실행 중: {mock.url} (Ctrl+C로 종료)")
+        try:
+            mock._thread.join()
+        except KeyboardInterrupt:
+            mock.stop()
@@ -0,0 +1,81 @@
+import threading
+import time
+
+
+class TTLCache:
+    """유효 시간(TTL)이 있는 스레드 안전 캐시 (히트/미스 횟수 기록)"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.load_seconds = 0.0  # loader 실행에 걸린 총 시간
+        self._entries = {}  # key -> (저장 시각, 값)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, key):
+        """유효한 값이 있으면 반환, 없거나 만료되었으면 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+
+    def get_or_load(self, key, loader):
+        """캐시에 값이 없으면 loader()로 가져와 저장 (같은 key는 동시에 한 번만 로드)
+
+        loader가 None을 반환하면 저장하지 않음
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # 기다리는 동안 다른 스레드가 이미 가져왔는지 다시 확인
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                    return entry[1]
+
+            started = time.perf_counter()
+            value = loader()
+            with self._lock:
+                self.loads += 1
+                self.load_seconds += time.perf_counter() - started
+
+            if value is not None:
+                self.set(key, value)
+            return value
+
+    def invalidate(self, key=None):
+        """특정 key 또는 전체 캐시 무효화"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """히트/미스 통계 반환 (saved_seconds: 평균 로드 시간 기준으로 아낀 시간 추정치)"""
+        with self._lock:
+            total = self.hits + self.misses
+            avg_load_seconds = self.load_seconds / self.loads if self.loads else 0.0
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries),
+                "avg_load_seconds": avg_load_seconds,
+                "saved_seconds": self.hits * avg_load_seconds,
+            }
@@ -0,0 +1,313 @@
+import argparse
+import json
+import logging
+import signal
+import sys
+import threading
+from batch_crawler import DEFAULT_CONCURRENCY, DEFAULT_RATE, DEFAULT_SYMBOL_TIMEOUT
+from metrics import setup_logging, METRICS_JSONL_FILE, METRICS_PORT
+from storage import SQLITE_FILENAME, SHARED_FS_JOURNAL_MODE
+from job_queue import JOB_QUEUE_FILE, JOB_LEASE_SECONDS, JOB_CRAWL, JOB_UNIVERSE, JOB_BACKFILL
+
+# 무거운 모듈(main, pandas, selenium 등)은 각 하위 명령 안에서 import
+# → `--help`나 HTTP 엔진 크롤링 한 번은 GUI/브라우저 없이 바로 시작
+
+logger = logging.getLogger("cli")
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+EXPORT_FORMATS = ("csv", "jsonl")
+JOB_KINDS = (JOB_CRAWL, JOB_BACKFILL, JOB_UNIVERSE)
+
+
+def _scraper_setup(args):
+    """공통 옵션 적용 (--base-url: 테스트/벤치마크용 모의 서버 주소)"""
+    import main
+    from http_scraper import NaverHttpClient
+
+    if args.base_url:
+        main.StockExchangeScraper.http_client = NaverHttpClient(base_url=args.base_url)
+    return main
+
+
+def _job_queue(args):
+    """작업 큐 열기 (--shared-fs: 여러 호스트가 공유 파일시스템으로 쓰는 큐는 WAL 대신 롤백 저널)"""
+    from job_queue import JobQueue, JOB_QUEUE_JOURNAL_MODE
+
+    return JobQueue(args.queue, journal_mode=SHARED_FS_JOURNAL_MODE if args.shared_fs else JOB_QUEUE_JOURNAL_MODE)
+
+
+def cmd_crawl(args):
+    """종목 코드(또는 watchlist 파일)를 배치로 크롤링해 저장"""
+    main = _scraper_setup(args)
+    from batch_crawler import load_watchlist
+
+    stock_codes = list(dict.fromkeys(args.codes + (load_watchlist(args.watchlist) if args.watchlist else [])))
+    if not stock_codes:
+        logger.error("❌ 크롤링할 종목 코드가 없습니다. (종목 코드 또는 --watchlist 지정)")
+        return 2
+
+    storage = None
+    if not args.no_save and args.storage:
+        from storage import create_storage
+        storage = create_storage(args.storage)
+
+    rows = main.crawl_codes(stock_codes, max_workers=args.workers, rate=args.rate, timeout=args.timeout,
+                            engine=args.engine, storage=storage, save=not args.no_save)
+    if args.json:
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False))
+    else:
+        for row in rows:
+            print(f"{row.get('종목코드', '')}\t{row.get('종목명', '')}\t{row.get('현재가', '')}\t{row.get('등락률', '')}")
+
+    main.StockExchangeScraper.get_instance().close_browser()
+    return 0 if len(rows) == len(stock_codes) else 1
+
+
+def cmd_daemon(args):
+    """GUI 없이 스케줄러 실행 (SIGINT/SIGTERM으로 종료)"""
+    main = _scraper_setup(args)
+
+    main.start_metrics(jsonl_file=args.metrics_file or None, port=args.metrics_port)
+    main.ensure_universe()
+
+    stop_event = threading.Event()
+
+    def stop(signum, frame):
+        logger.info("🛑 [DAEMON] 종료 신호 수신 (%s)", signal.Signals(signum).name)
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    job_queue = None
+    if args.queue:
+        job_queue = _job_queue(args)
+        logger.info("📥 [DAEMON] 작업 큐 모드: 크롤링은 워커(cli.py worker)가 실행 (%s)", args.queue)
+
+    scheduler = main.register_jobs(watchlist=args.watchlist, job_queue=job_queue)
+    logger.info("🚀 [DAEMON] 스케줄러 시작 (작업 %s개)", len(scheduler.jobs))
+    scheduler.run(stop_event, join_timeout=args.join_timeout)
+    main.StockExchangeScraper.get_instance().close_browser()
+    return 0
+
+
+def cmd_poll(args):
+    """장중 실시간 시세 폴링 (가격/거래량이 바뀐 틱만 저장, SIGINT/SIGTERM으로 종료)"""
+    from batch_crawler import load_watchlist
+    from http_scraper import NaverHttpClient
+    from intraday import IntradayPoller, NAVER_POLLING_URL
+    from storage import TickStorage
+
+    stock_codes = list(dict.fromkeys(args.codes + (load_watchlist(args.watchlist) if args.watchlist else [])))
+    if not stock_codes:
+        logger.error("❌ 폴링할 종목 코드가 없습니다. (종목 코드 또는 --watchlist 지정)")
+        return 2
+
+    poller = IntradayPoller(NaverHttpClient(base_url=args.base_url or NAVER_POLLING_URL), TickStorage(args.db),
+                            interval=args.interval, batch_size=args.batch_size)
+
+    def stop(signum, frame):
+        logger.info("🛑 [POLL] 종료 신호 수신 (%s)", signal.Signals(signum).name)
+        poller.stop_event.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    poller.run(stock_codes, market_hours=not args.any_time, duration=args.duration)
+    return 0
+
+
+def cmd_worker(args):
+    """작업 큐에서 작업을 임대해 실행 (여러 프로세스/호스트에서 동시에 실행 가능, SIGINT/SIGTERM으로 종료)"""
+    main = _scraper_setup(args)
+    from job_queue import QueueWorker, default_worker_id
+
+    job_queue = _job_queue(args)
+    main.JOB_SQLITE_FILENAME = args.db
+    if args.shared_fs:
+        main.JOB_SQLITE_JOURNAL_MODE = SHARED_FS_JOURNAL_MODE
+    stop_event = threading.Event()
+
+    def stop(signum, frame):
+        logger.info("🛑 [WORKER] 종료 신호 수신 (%s), 진행 중인 작업을 마치거나 반납 후 종료", signal.Signals(signum).name)
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    workers = [QueueWorker(job_queue, main.JOB_HANDLERS, worker_id=default_worker_id(index), kinds=args.kinds,
+                           lease_seconds=args.lease, stop_event=stop_event)
+               for index in range(args.threads)]
+    threads = [threading.Thread(target=worker.run, args=(args.max_jobs, args.exit_when_empty),
+                                name=f"queue-worker-{index}") for index, worker in enumerate(workers)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        for thread in threads:
+            thread.join(timeout=0.5)  # 메인 스레드가 신호를 받을 수 있도록 짧게 기다림
+
+    main.StockExchangeScraper.get_instance().close_browser()
+    print(json.dumps(job_queue.stats(), ensure_ascii=False))
+    return 0
+
+
+def cmd_enqueue(args):
+    """작업 큐에 크롤링 / 백필 / 전체 종목 갱신 작업 추가"""
+    import main
+    from batch_crawler import load_watchlist
+    from job_queue import JOB_UNIVERSE, JOB_BACKFILL
+
+    job_queue = _job_queue(args)
+    if args.kind == JOB_UNIVERSE:
+        added = main.enqueue_universe_refresh(job_queue)
+    else:
+        stock_codes = list(dict.fromkeys(args.codes + (load_watchlist(args.watchlist) if args.watchlist else [])))
+        if not stock_codes:
+            logger.error("❌ 작업에 넣을 종목 코드가 없습니다. (종목 코드 또는 --watchlist 지정)")
+            return 2
+        if args.kind == JOB_BACKFILL:
+            added = main.enqueue_backfill(job_queue, stock_codes, since=args.since, max_pages=args.max_pages,
+                                          chunk_size=args.chunk_size or main.BACKFILL_JOB_CHUNK_SIZE)
+        else:
+            added = main.enqueue_crawl(job_queue, stock_codes, chunk_size=args.chunk_size or main.CRAWL_JOB_CHUNK_SIZE)
+    print(json.dumps({"added": added, "queue": job_queue.stats()}, ensure_ascii=False))
+    return 0
+
+
+def cmd_jobs(args):
+    """작업 큐 상태 출력 (임대 만료 작업 재대기, 오래된 완료 작업 정리)"""
+    job_queue = _job_queue(args)
+    job_queue.requeue_expired()
+    if args.purge_days is not None:
+        logger.info("🧹 [QUEUE] 완료된 작업 %s건 삭제", job_queue.purge(args.purge_days * 86400))
+    print(json.dumps(job_queue.stats(), ensure_ascii=False))
+    return 0
+
+
+def cmd_universe(args):
+    """KOSPI/KOSDAQ 전체 종목 목록 갱신"""
+    main = _scraper_setup(args)
+    result = main.get_kospi_stock_codes()
+    print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+def cmd_export(args):
+    """SQLite에 저장된 시세 이력을 CSV / JSON lines로 내보내기"""
+    from query import QuoteHistory
+
+    if not args.code and not args.date:
+        logger.error("❌ --code 또는 --date를 지정해야 합니다.")
+        return 2
+
+    with QuoteHistory(args.db) as history:
+        if args.date:
+            df = history.on_date(args.date)
+        elif args.daily:
+            df = history.daily(args.code, args.start, args.end)
+        else:
+            df = history.symbol_range(args.code, args.start, args.end)
+
+    df["date"] = df["date"].dt.strftime("%Y-%m-%d")
+    output = args.output or sys.stdout
+    if args.format == "csv":
+        df.to_csv(output, index=False, encoding="utf-8-sig" if args.output else None)
+    else:
+        df.to_json(output, orient="records", lines=True, force_ascii=False)
+        if not args.output:
+            print()
+    logger.info("✅ [EXPORT] %s건 내보내기 완료", len(df))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="주식/환율 크롤러 (GUI 없이 실행)")
+    parser.add_argument("--log-level", default="INFO", choices=LOG_LEVELS, help="로그 레벨 (기본 INFO)")
+    parser.add_argument("--base-url", help="네이버 금융 대신 사용할 주소 (모의 서버 등)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    crawl = subparsers.add_parser("crawl", help="종목 코드 크롤링 후 저장")
+    crawl.add_argument("codes", nargs="*", help="종목 코드 (예: 005930 000660)")
+    crawl.add_argument("--watchlist", help="종목 코드 목록 파일 (예: stocks.txt)")
+    crawl.add_argument("--engine", choices=("http", "selenium"), help="크롤링 엔진 (기본 http, 실패 시 Selenium 폴백)")
+    crawl.add_argument("--workers", type=int, default=DEFAULT_CONCURRENCY, help="동시 크롤링 종목 수")
+    crawl.add_argument("--rate", type=float, default=DEFAULT_RATE, help="초당 최대 요청 수")
+    crawl.add_argument("--timeout", type=float, default=DEFAULT_SYMBOL_TIMEOUT, help="종목당 최대 처리 시간 (초)")
+    crawl.add_argument("--storage", nargs="+", choices=("csv", "sqlite"), help="저장소 (기본: main.STORAGE_BACKENDS)")
+    crawl.add_argument("--no-save", action="store_true", help="저장하지 않고 결과만 출력")
+    crawl.add_argument("--json", action="store_true", help="결과를 JSON lines로 출력")
+    crawl.set_defaults(func=cmd_crawl)
+
+    daemon = subparsers.add_parser("daemon", help="스케줄러를 백그라운드 서비스로 실행")
+    daemon.add_argument("--watchlist", help="모든 자동 크롤링 작업에 사용할 종목 코드 파일 (기본: 작업별 설정)")
+    daemon.add_argument("--join-timeout", type=float, default=30, help="종료 시 진행 중인 작업을 기다릴 시간 (초)")
+    daemon.add_argument("--metrics-port", type=int, default=METRICS_PORT, help="Prometheus 메트릭 포트")
+    daemon.add_argument("--metrics-file", default=METRICS_JSONL_FILE, help="JSON lines 메트릭 파일 (빈 값이면 사용 안 함)")
+    daemon.add_argument("--queue", nargs="?", const=JOB_QUEUE_FILE,
+                        help=f"직접 크롤링하지 않고 작업 큐에 넣기 (기본 파일: {JOB_QUEUE_FILE})")
+    daemon.add_argument("--shared-fs", action="store_true", help="여러 호스트가 공유 파일시스템의 큐를 쓸 때 (WAL 대신 롤백 저널)")
+    daemon.set_defaults(func=cmd_daemon)
+
+    worker = subparsers.add_parser("worker", help="작업 큐 워커 실행 (여러 프로세스/호스트에서 동시에 실행 가능)")
+    worker.add_argument("--queue", default=JOB_QUEUE_FILE, help="작업 큐 SQLite 파일")
+    worker.add_argument("--shared-fs", action="store_true",
+                        help="여러 호스트가 공유 파일시스템의 큐/결과 DB를 쓸 때 (WAL 대신 롤백 저널)")
+    worker.add_argument("--db", default=SQLITE_FILENAME, help="크롤링/백필 결과를 기록할 SQLite 파일")
+    worker.add_argument("--threads", type=int, default=1, help="이 프로세스에서 동시에 실행할 작업 수")
+    worker.add_argument("--kinds", nargs="+", choices=JOB_KINDS, help="처리할 작업 종류 (기본: 전체)")
+    worker.add_argument("--lease", type=float, default=JOB_LEASE_SECONDS, help="작업 임대 시간 (초)")
+    worker.add_argument("--max-jobs", type=int, help="스레드당 이 개수만큼 처리하면 종료")
+    worker.add_argument("--exit-when-empty", action="store_true", help="대기 중인 작업이 없으면 종료")
+    worker.set_defaults(func=cmd_worker)
+
+    enqueue = subparsers.add_parser("enqueue", help="작업 큐에 작업 추가")
+    enqueue.add_argument("kind", choices=JOB_KINDS, help="작업 종류")
+    enqueue.add_argument("codes", nargs="*", help="종목 코드")
+    enqueue.add_argument("--watchlist", help="종목 코드 목록 파일 (예: stocks.txt)")
+    enqueue.add_argument("--chunk-size", type=int, help="작업 하나에 넣을 종목 수")
+    enqueue.add_argument("--since", help="백필: 이 날짜(YYYY-MM-DD)까지만")
+    enqueue.add_argument("--max-pages", type=int, help="백필: 종목당 최대 페이지 수")
+    enqueue.add_argument("--queue", default=JOB_QUEUE_FILE, help="작업 큐 SQLite 파일")
+    enqueue.add_argument("--shared-fs", action="store_true", help="여러 호스트가 공유 파일시스템의 큐를 쓸 때 (WAL 대신 롤백 저널)")
+    enqueue.set_defaults(func=cmd_enqueue)
+
+    jobs = subparsers.add_parser("jobs", help="작업 큐 상태 (종류별/상태별 건수)")
+    jobs.add_argument("--queue", default=JOB_QUEUE_FILE, help="작업 큐 SQLite 파일")
+    jobs.add_argument("--shared-fs", action="store_true", help="여러 호스트가 공유 파일시스템의 큐를 쓸 때 (WAL 대신 롤백 저널)")
+    jobs.add_argument("--purge-days", type=float, help="이 일수보다 오래된 완료 작업 삭제")
+    jobs.set_defaults(func=cmd_jobs)
+
+    poll = subparsers.add_parser("poll", help="장중 실시간 시세 폴링 (바뀐 틱만 저장)")
+    poll.add_argument("codes", nargs="*", help="종목 코드")
+    poll.add_argument("--watchlist", help="종목 코드 목록 파일 (예: stocks.txt)")
+    poll.add_argument("--interval", type=float, default=5, help="폴링 주기 (초)")
+    poll.add_argument("--batch-size", type=int, default=50, help="요청 1회당 종목 수")
+    poll.add_argument("--duration", type=float, help="이 시간(초)이 지나면 종료")
+    poll.add_argument("--any-time", action="store_true", help="장 운영 시간과 관계없이 폴링")
+    poll.add_argument("--db", default="stock_exchange_data.db", help="SQLite 파일")
+    poll.set_defaults(func=cmd_poll)
+
+    universe = subparsers.add_parser("universe", help="KOSPI/KOSDAQ 전체 종목 목록 갱신")
+    universe.set_defaults(func=cmd_universe)
+
+    export = subparsers.add_parser("export", help="저장된 시세 이력 내보내기")
+    export.add_argument("--code", help="종목 코드")
+    export.add_argument("--date", help="특정 날짜 전체 종목 (YYYY-MM-DD)")
+    export.add_argument("--start", help="시작 날짜 (YYYY-MM-DD)")
+    export.add_argument("--end", help="끝 날짜 (YYYY-MM-DD)")
+    export.add_argument("--daily", action="store_true", help="일별 데이터 + VWAP/수익률/달러 환산가")
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    export.add_argument("--output", help="출력 파일 (기본: 표준 출력)")
+    export.add_argument("--db", default="stock_exchange_data.db", help="SQLite 파일")
+    export.set_defaults(func=cmd_export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    setup_logging(args.log_level)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import logging
+import queue
+import threading
+from batch_crawler import TokenBucket, DEFAULT_CONCURRENCY, DEFAULT_RATE
+
+logger = logging.getLogger(__name__)
+
+# 종목별 진행 상태
+STATUS_QUEUED = "대기"
+STATUS_RUNNING = "크롤링 중"
+STATUS_DONE = "완료"
+STATUS_FAILED = "실패"
+STATUS_CANCELLED = "취소됨"
+
+# 결과 큐 이벤트 종류
+EVENT_STATUS = "status"  # (EVENT_STATUS, 종목코드, 상태, 주식 데이터 또는 None)
+EVENT_EXCHANGE = "exchange"  # (EVENT_EXCHANGE, None, None, 환율 데이터)
+
+
+class CrawlWorker:
+    """백그라운드 스레드에서 종목을 크롤링하고 결과를 스레드 안전한 큐로 전달
+
+    - submit()은 바로 반환하며, 작업 스레드가 종목을 하나씩 꺼내 크롤링/저장
+    - 상태 변화(대기 → 크롤링 중 → 완료/실패/취소됨)는 events 큐에 쌓이므로
+      GUI는 이벤트 루프에서 큐를 주기적으로 비우기만 하면 됨 (Tk 위젯은 메인 스레드에서만 접근)
+    - cancel(): 아직 시작하지 않은 종목은 건너뛰고, 진행 중인 종목은 결과를 버림 (저장하지 않음)
+    """
+
+    def __init__(self, scraper, storage=None, max_workers=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE):
+        self.scraper = scraper
+        self.storage = storage
+        self.events = queue.Queue()
+        self._jobs = queue.Queue()
+        self._bucket = TokenBucket(rate, capacity=max(1, max_workers)) if rate is not None else None
+        self._last_exchange = None
+        self._saved_snapshot = None  # 마지막으로 저장한 시장 지표 스냅샷 시각 (같은 스냅샷은 다시 저장하지 않음)
+        self._cancelled = set()
+        self._active = set()  # 대기/진행 중인 종목 (같은 종목을 중복으로 넣지 않음)
+        self._lock = threading.Lock()
+        self._storage_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads = [threading.Thread(target=self._run, name=f"gui-crawl-{index}", daemon=True)
+                         for index in range(max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, stock_codes):
+        """종목 코드들을 작업 큐에 추가 (이미 대기/진행 중인 종목은 무시), 추가한 종목 수 반환"""
+        added = 0
+        for stock_code in stock_codes:
+            with self._lock:
+                if stock_code in self._active:
+                    continue
+                self._active.add(stock_code)
+                self._cancelled.discard(stock_code)
+            self.events.put((EVENT_STATUS, stock_code, STATUS_QUEUED, None))
+            self._jobs.put(stock_code)
+            added += 1
+        return added
+
+    def cancel(self, stock_codes=None):
+        """지정한 종목(없으면 대기/진행 중인 전체) 취소"""
+        with self._lock:
+            targets = set(self._active) if stock_codes is None else set(stock_codes) & self._active
+            self._cancelled |= targets
+        return len(targets)
+
+    def pending(self):
+        with self._lock:
+            return len(self._active)
+
+    def _is_cancelled(self, stock_code):
+        with self._lock:
+            return stock_code in self._cancelled
+
+    def _finish(self, stock_code, status, stock_data=None):
+        with self._lock:
+            self._active.discard(stock_code)
+            self._cancelled.discard(stock_code)
+        self.events.put((EVENT_STATUS, stock_code, status, stock_data))
+
+    def _market_snapshot(self):
+        """시장 지표 스냅샷 (TTL 캐시라 종목마다 호출해도 크롤링은 TTL마다 한 번), 환율이 바뀌면 이벤트 전달"""
+        try:
+            self.scraper.get_market_snapshot()
+        except Exception as e:
+            logger.error("❌ [GUI] 시장 지표 크롤링 오류: %s", e)
+        exchange_data = self.scraper.exchange_data or {}
+        with self._lock:
+            changed = exchange_data != self._last_exchange
+            self._last_exchange = exchange_data
+        if changed and exchange_data:
+            self.events.put((EVENT_EXCHANGE, None, None, dict(exchange_data)))
+        return self.scraper.market_snapshot
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            stock_code = self._jobs.get()
+            if stock_code is None or self._stop_event.is_set():
+                break
+
+            if self._is_cancelled(stock_code) or \
+                    (self._bucket is not None and not self._bucket.acquire(self._stop_event)):
+                self._finish(stock_code, STATUS_CANCELLED)
+                continue
+
+            self.events.put((EVENT_STATUS, stock_code, STATUS_RUNNING, None))
+            try:
+                stock_data = self.scraper.fetch_stock_data(stock_code)
+            except Exception as e:
+                logger.error("❌ [GUI] [%s] 크롤링 오류: %s", stock_code, e)
+                stock_data = None
+
+            if self._is_cancelled(stock_code):
+                self._finish(stock_code, STATUS_CANCELLED)
+            elif stock_data is None:
+                self._finish(stock_code, STATUS_FAILED)
+            else:
+                snapshot = self._market_snapshot()
+                self._save(self.scraper.link_market_snapshot(stock_data, snapshot), snapshot)
+                self._finish(stock_code, STATUS_DONE, stock_data)
+
+    def _save(self, row, snapshot=None):
+        if self.storage is None:
+            return
+        try:
+            with self._storage_lock:  # 저장소 버퍼(add/flush)는 스레드 안전하지 않음
+                self.storage.write([row])
+                if snapshot and snapshot[0]["시각"] != self._saved_snapshot:
+                    self.storage.write_market(snapshot)
+                    self._saved_snapshot = snapshot[0]["시각"]
+        except Exception as e:
+            logger.error("❌ [GUI] [%s] 저장 오류: %s", row.get("종목코드"), e)
+
+    def stop(self):
+        """대기 중인 작업을 모두 취소하고 작업 스레드 종료"""
+        self.cancel()
+        self._stop_event.set()
+        for _ in self._threads:
+            self._jobs.put(None)
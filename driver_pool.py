@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger(__name__)
+
+# WebDriver 풀 기본 설정
+DRIVER_POOL_SIZE = 2  # 동시에 띄울 최대 Chrome 세션 수
+DRIVER_MAX_PAGES = 50  # 세션당 최대 페이지 수 (초과 시 재시작)
+DRIVER_WAIT_TIMEOUT = 15  # WebDriverWait 최대 대기 시간 (초)
+DRIVER_POLL_FREQUENCY = 0.1  # 준비 조건 확인 주기 (초)
+CHECKOUT_TIMEOUT = 60  # 빈 세션을 기다릴 최대 시간 (초)
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36"
+
+
+def create_chrome_driver(driver_path):
+    """헤드리스 Chrome WebDriver 생성"""
+    options = Options()
+    options.page_load_strategy = "eager"  # DOMContentLoaded까지만 대기 (광고/이미지 로딩 안 기다림)
+    options.add_argument("--headless")  # 브라우저 창 안 띄움
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-popup-blocking")  # 팝업 차단 방지
+    options.add_argument(f"user-agent={USER_AGENT}")
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})  # 이미지 차단
+    return webdriver.Chrome(service=Service(driver_path), options=options)
+
+
+class DriverSession:
+    """풀에서 빌려주는 WebDriver 세션 (driver + wait + 사용 페이지 수)"""
+
+    def __init__(self, driver, wait_timeout=DRIVER_WAIT_TIMEOUT):
+        self.driver = driver
+        self.wait = WebDriverWait(driver, wait_timeout, poll_frequency=DRIVER_POLL_FREQUENCY)
+        self.pages = 0
+        self.broken = False
+
+    def get(self, url):
+        """페이지 이동 (사용 페이지 수 기록)"""
+        self.pages += 1
+        self.driver.get(url)
+
+    def is_alive(self):
+        """브라우저가 아직 응답하는지 확인"""
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except WebDriverException:
+            return False
+
+    def reset(self):
+        """다음 사용자를 위해 쿠키/스토리지 초기화"""
+        self.driver.delete_all_cookies()
+        try:
+            self.driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except WebDriverException:
+            pass  # about:blank 등 스토리지 접근이 안 되는 페이지
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except WebDriverException:
+            pass
+
+
+class WebDriverPool:
+    """재사용 가능한 헤드리스 WebDriver 세션 풀 (빌려가기/반납 방식)
+
+    - 세션은 처음 필요할 때 생성 (최대 size개)
+    - max_pages 페이지를 넘기거나 브라우저가 죽으면 세션을 버리고 다음에 새로 생성
+    - 반납 시 쿠키/스토리지 초기화
+    """
+
+    def __init__(self, driver_path, size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES,
+                 checkout_timeout=CHECKOUT_TIMEOUT, driver_factory=None):
+        self.driver_path = driver_path
+        self.size = size
+        self.max_pages = max_pages
+        self.checkout_timeout = checkout_timeout
+        self.driver_factory = driver_factory or create_chrome_driver
+        self._idle = []  # 최근에 쓴 (워밍된) 세션부터 재사용하는 스택
+        self._created = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """세션 빌려가기 (없으면 생성, 풀이 가득 차면 반납될 때까지 대기)"""
+        deadline = time.monotonic() + self.checkout_timeout
+        with self._condition:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"{self.checkout_timeout}초 동안 사용 가능한 WebDriver 세션이 없음")
+                self._condition.wait(remaining)
+
+        try:
+            logger.info("🚀 [POOL] WebDriver 세션 생성 (%s/%s)", self._created, self.size)
+            return DriverSession(self.driver_factory(self.driver_path))
+        except Exception:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, session):
+        """세션 반납 (수명이 다했거나 고장난 세션은 종료)"""
+        if session.broken or session.pages >= self.max_pages or not session.is_alive():
+            logger.info("♻️ [POOL] WebDriver 세션 재시작 (페이지 %s개 사용)", session.pages)
+            self._discard(session)
+            return
+
+        try:
+            session.reset()
+        except WebDriverException:
+            self._discard(session)
+            return
+
+        with self._condition:
+            self._idle.append(session)
+            self._condition.notify()
+
+    def _discard(self, session):
+        session.quit()
+        with self._condition:
+            self._created -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def session(self):
+        """`with pool.session() as session:` 형태로 세션 빌려쓰기"""
+        session = self.acquire()
+        try:
+            yield session
+        except WebDriverException:
+            session.broken = True
+            raise
+        finally:
+            self.release(session)
+
+    def close_all(self):
+        """대기 중인 모든 세션 종료"""
+        with self._condition:
+            sessions, self._idle = self._idle, []
+        for session in sessions:
+            self._discard(session)
@@ -0,0 +1,335 @@
+import sys
+import queue
+import logging
+import threading
+import tkinter as tk
+from tkinter import ttk
+from tkinter import messagebox
+from symbol_index import SymbolIndex, RANK_EXACT_CODE, RANK_EXACT_NAME
+from crawl_worker import (CrawlWorker, EVENT_EXCHANGE, STATUS_QUEUED, STATUS_RUNNING, STATUS_DONE, STATUS_FAILED,
+                          STATUS_CANCELLED)
+from storage import create_storage
+from main import (StockExchangeScraper, register_jobs, STOCK_CODES_FILE, SEARCH_DEBOUNCE_MS, SEARCH_RESULT_LIMIT,
+                  STORAGE_BACKENDS)
+
+logger = logging.getLogger("gui")
+
+# 결과 표 설정
+GUI_POLL_MS = 100  # 결과 큐 확인 주기 (ms)
+GUI_MAX_EVENTS_PER_POLL = 200  # 한 번에 화면에 반영할 최대 이벤트 수 (많아도 이벤트 루프를 오래 붙잡지 않도록)
+GUI_CRAWL_WORKERS = 4  # GUI에서 동시에 크롤링할 종목 수
+QUOTE_COLUMNS = (  # (컬럼 id, 제목, 너비, 데이터 키)
+    ("code", "종목코드", 70, "종목코드"),
+    ("name", "종목명", 120, "종목명"),
+    ("price", "현재가", 80, "현재가"),
+    ("change", "등락가", 70, "등락가"),
+    ("rate", "등락률", 70, "등락률"),
+    ("volume", "거래량", 100, "거래량"),
+    ("date", "기준 날짜", 170, "기준 날짜"),
+    ("status", "상태", 80, None),
+)
+STATUS_COLORS = {STATUS_QUEUED: "#6c757d", STATUS_RUNNING: "#0d6efd", STATUS_DONE: "#000000",
+                 STATUS_FAILED: "#dc3545", STATUS_CANCELLED: "#adb5bd"}
+
+
+def _sort_key(value):
+    """표시 문자열 정렬 키 ("55,700", "-0.63%" 같은 숫자는 숫자로, 나머지는 문자열로)"""
+    text = str(value).replace(",", "").replace("%", "").replace("+", "").strip()
+    try:
+        return 0, float(text), ""
+    except ValueError:
+        return 1, 0.0, str(value)
+
+
+# ✅ GUI 클래스
+class StockCrawlerGUI:
+    def __init__(self):
+        """GUI 초기화"""
+
+        self.root = tk.Tk()
+        self.root.title("📈 주식 크롤링 프로그램")
+        self.root.geometry("900x720")
+        self.root.resizable(False, False)
+
+        # ✅ 실행 상태 변수
+        self.is_running = False
+        self.stop_event = threading.Event()
+
+        # ✅ 크롤링은 백그라운드 작업 스레드에서 실행하고 결과는 큐로 받음 (창이 멈추지 않도록)
+        self.worker = CrawlWorker(StockExchangeScraper.get_instance(), create_storage(STORAGE_BACKENDS),
+                                  max_workers=GUI_CRAWL_WORKERS)
+        self._sort_state = {}  # 컬럼 id -> 내림차순 여부
+
+        # ✅ 종목 검색 인덱스 (시작 시 한 번 읽고, 파일이 바뀌면 자동으로 다시 읽음)
+        self.symbol_index = SymbolIndex(STOCK_CODES_FILE)
+        self._search_after_id = None
+        self._last_query = ""
+
+        # ✅ 스타일 적용
+        self.configure_styles()
+
+        # ✅ GUI 구성 요소 생성
+        self.create_widgets()
+
+        # ✅ 결과 큐 확인 시작 후 GUI 실행
+        self.root.after(GUI_POLL_MS, self.poll_results)
+        self.root.protocol("WM_DELETE_WINDOW", self.exit_program)
+        self.root.mainloop()
+
+        # ✅ GUI 위젯의 속성들을 미리 선언 (가독성과 코드 유지보수를 위해 사용)
+        self.scrollbar = None  # 리스트박스의 스크롤바
+        self.listbox = None  # 주식 검색 결과를 표시하는 리스트박스
+        self.btn_search = None  # 검색 버튼
+        self.stock_entry = None  # 주식 검색 입력 필드
+        self.btn_exit = None  # 프로그램 종료 버튼
+        self.btn_stop = None  # 자동 실행 중지 버튼
+        self.btn_start = None  # 자동 실행 시작 버튼
+        self.lbl_status = None  # 실행 상태 표시 라벨
+        self.tree = None  # 종목별 시세/상태 결과 표
+        self.lbl_exchange = None  # 환율 표시 라벨
+
+    @staticmethod
+    def configure_styles():
+        """GUI 스타일을 설정"""
+        style = ttk.Style()
+        style.theme_use("clam")  # ✅ 모던한 테마 적용
+
+        # ✅ 버튼 스타일 설정
+        style.configure("TButton", font=("Arial", 11), padding=5)
+
+        # ✅ 실행 상태 라벨 스타일
+        style.configure("Status.TLabel", font=("Arial", 12, "bold"))
+
+        # ✅ 입력 필드 스타일
+        style.configure("TEntry", padding=5, font=("Arial", 11))
+
+        # ✅ 프레임 배경색 설정
+        style.configure("TFrame", background="#f8f9fa")
+
+    def create_widgets(self):
+        """GUI 위젯 생성 및 배치"""
+        # ✅ 실행 상태 라벨
+        self.lbl_status = ttk.Label(self.root, text="🔴 실행 안 됨", style="Status.TLabel", foreground="red")
+        self.lbl_status.pack(pady=10)
+
+        # ✅ 버튼 프레임
+        button_frame = ttk.Frame(self.root)
+        button_frame.pack(pady=5)
+
+        self.btn_start = ttk.Button(button_frame, text="▶ 자동 실행 시작", command=self.start_scheduler)
+        self.btn_start.grid(row=0, column=0, padx=5)
+
+        self.btn_stop = ttk.Button(button_frame, text="⏸ 실행 중지", command=self.stop_scheduler, state=tk.DISABLED)
+        self.btn_stop.grid(row=0, column=1, padx=5)
+
+        self.btn_exit = ttk.Button(button_frame, text="⛔ 완전 종료", command=self.exit_program)
+        self.btn_exit.grid(row=0, column=2, padx=5)
+
+        # ✅ 주식 검색 필드
+        search_frame = ttk.Frame(self.root)
+        search_frame.pack(pady=5)
+
+        ttk.Label(search_frame, text="🔍 주식 종목 검색:", font=("Arial", 10, "bold")).grid(row=0, column=0, padx=5)
+        self.stock_entry = ttk.Entry(search_frame, width=25)
+        self.stock_entry.grid(row=0, column=1, padx=5)
+
+        self.btn_search = ttk.Button(search_frame, text="검색", command=self.search_and_crawl)
+        self.btn_search.grid(row=0, column=2, padx=5)
+
+        # ✅ 입력할 때마다 검색 결과 갱신 (엔터는 검색 버튼과 동일)
+        self.stock_entry.bind("<KeyRelease>", self.on_search_typed)
+        self.stock_entry.bind("<Return>", lambda event: self.search_and_crawl())
+
+        # ✅ 검색된 주식 리스트
+        listbox_frame = ttk.Frame(self.root)
+        listbox_frame.pack(pady=10)
+
+        self.listbox = tk.Listbox(listbox_frame, height=8, width=50)
+        self.listbox.grid(row=0, column=0, sticky="nsew")
+
+        self.scrollbar = ttk.Scrollbar(listbox_frame, orient="vertical", command=self.listbox.yview)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.listbox.config(yscrollcommand=self.scrollbar.set)
+
+        self.listbox.bind("<<ListboxSelect>>", self.select_stock)
+
+        # ✅ 환율 + 결과 표 조작 버튼
+        result_bar = ttk.Frame(self.root)
+        result_bar.pack(fill="x", padx=10)
+        self.lbl_exchange = ttk.Label(result_bar, text="💱 USD/KRW: -", font=("Arial", 10, "bold"))
+        self.lbl_exchange.pack(side="left")
+        ttk.Button(result_bar, text="전체 취소", command=self.cancel_all).pack(side="right", padx=2)
+        ttk.Button(result_bar, text="선택 취소", command=self.cancel_selected).pack(side="right", padx=2)
+        ttk.Button(result_bar, text="🔄 전체 새로고침", command=self.refresh_all).pack(side="right", padx=2)
+
+        # ✅ 종목별 시세 결과 표 (제목을 누르면 정렬)
+        tree_frame = ttk.Frame(self.root)
+        tree_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        self.tree = ttk.Treeview(tree_frame, columns=[column for column, *_ in QUOTE_COLUMNS], show="headings",
+                                 height=12)
+        for column, title, width, _ in QUOTE_COLUMNS:
+            self.tree.heading(column, text=title, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=width, anchor="e" if column in ("price", "change", "rate", "volume")
+                             else "w")
+        for status, color in STATUS_COLORS.items():
+            self.tree.tag_configure(status, foreground=color)
+        tree_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=tree_scrollbar.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        tree_scrollbar.pack(side="right", fill="y")
+
+    def start_scheduler(self):
+        """스케줄러 실행"""
+        if self.is_running:
+            messagebox.showwarning("경고", "이미 실행 중입니다!")
+            return
+
+        self.is_running = True
+        self.stop_event.clear()
+
+        self.btn_start.config(state=tk.DISABLED)
+        self.btn_stop.config(state=tk.NORMAL)
+        self.lbl_status.config(text="🔵 실행 중...", foreground="blue")
+
+        # ✅ run_scheduler()를 실행할 때, 현재 GUI 인스턴스를 전달
+        thread = threading.Thread(target=run_scheduler, args=(self,), daemon=True)
+        thread.start()
+        messagebox.showinfo("알림", "백그라운드에서 자동 실행이 시작되었습니다!")
+
+    def stop_scheduler(self):
+        """스케줄러 정지"""
+        self.is_running = False
+        self.stop_event.set()
+
+        self.btn_start.config(state=tk.NORMAL)
+        self.btn_stop.config(state=tk.DISABLED)
+        self.lbl_status.config(text="🔴 실행 중지됨", foreground="red")
+        messagebox.showinfo("알림", "스케줄러 실행이 중지되었습니다!")
+
+    def exit_program(self):
+        """프로그램 종료"""
+        self.is_running = False
+        self.stop_event.set()
+        self.worker.stop()
+        logger.info("🛑 프로그램 완전 종료")
+        sys.exit(0)  # 시스템 종료
+
+    def on_search_typed(self, event=None):
+        """입력이 잠시 멈추면 검색 결과 갱신 (키 입력마다 검색하지 않도록 지연)"""
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+        self._search_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self.update_search_results)
+
+    def update_search_results(self):
+        """현재 입력값으로 종목을 검색해 리스트박스 갱신"""
+        self._search_after_id = None
+        query = self.stock_entry.get().strip()
+        if query == self._last_query:
+            return
+        self._last_query = query
+
+        self.listbox.delete(0, tk.END)
+        for name, code, _ in self.symbol_index.search(query, limit=SEARCH_RESULT_LIMIT):
+            self.listbox.insert(tk.END, f"{name} ({code})")
+
+    def search_and_crawl(self):
+        """주식 검색 후 크롤링 실행"""
+        selected_stock = self.stock_entry.get().strip()
+        matched = self.symbol_index.search(selected_stock, limit=SEARCH_RESULT_LIMIT)
+
+        if not matched:
+            if not self.symbol_index.entries:
+                messagebox.showerror("파일 오류", f"{STOCK_CODES_FILE} 파일이 없습니다.")
+            else:
+                messagebox.showwarning("검색 실패", "해당 종목을 찾을 수 없습니다.")
+        elif len(matched) > 1 and matched[0][2] not in (RANK_EXACT_CODE, RANK_EXACT_NAME):
+            self.listbox.delete(0, tk.END)
+            for name, code, _ in matched:
+                self.listbox.insert(tk.END, f"{name} ({code})")
+        else:
+            stock_code = matched[0][1]
+            self.stock_entry.delete(0, tk.END)
+            self.stock_entry.insert(0, stock_code)
+            self._last_query = stock_code
+            self.crawl(stock_code)
+
+    def select_stock(self, event=None):
+        """리스트에서 선택한 주식 종목 크롤링"""
+        try:
+            selected = self.listbox.get(self.listbox.curselection())
+            stock_code = selected.split("(")[-1].strip(")")
+            self.stock_entry.delete(0, tk.END)
+            self.stock_entry.insert(0, stock_code)
+            self._last_query = stock_code
+            self.crawl(stock_code)
+        except (IndexError, tk.TclError):
+            return  # 리스트에서 아무것도 선택하지 않았을 때 오류 방지
+
+    def crawl(self, *stock_codes):
+        """종목을 백그라운드 크롤링 작업에 추가 (바로 반환, 결과는 poll_results에서 표에 반영)"""
+        self.worker.submit(stock_codes)
+
+    def refresh_all(self):
+        """표에 있는 모든 종목 다시 크롤링"""
+        self.crawl(*self.tree.get_children())
+
+    def cancel_selected(self):
+        """표에서 선택한 종목 크롤링 취소"""
+        self.worker.cancel(self.tree.selection())
+
+    def cancel_all(self):
+        """대기/진행 중인 모든 종목 크롤링 취소"""
+        self.worker.cancel()
+
+    def poll_results(self):
+        """작업 스레드가 보낸 이벤트를 표에 반영 (Tk 이벤트 루프에서 GUI_POLL_MS마다 실행)"""
+        for _ in range(GUI_MAX_EVENTS_PER_POLL):
+            try:
+                kind, stock_code, status, data = self.worker.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == EVENT_EXCHANGE:
+                self.lbl_exchange.config(text=f"💱 {data.get('통화', 'USD/KRW')}: {data.get('현재 환율', '-')} "
+                                              f"({data.get('변동률', '')})")
+            else:
+                self.update_row(stock_code, status, data)
+
+        pending = self.worker.pending()
+        if not self.is_running:
+            if pending:
+                self.lbl_status.config(text=f"🔄 크롤링 중... ({pending}개 남음)", foreground="blue")
+            elif self.lbl_status.cget("text").startswith("🔄"):
+                self.lbl_status.config(text="🔴 실행 안 됨", foreground="red")
+        self.root.after(GUI_POLL_MS, self.poll_results)
+
+    def update_row(self, stock_code, status, stock_data=None):
+        """종목 행 추가/갱신 (데이터가 없는 상태 변경은 기존 시세를 그대로 두고 상태만 바꿈)"""
+        if self.tree.exists(stock_code):
+            values = list(self.tree.item(stock_code, "values"))
+        else:
+            values = [stock_code] + [""] * (len(QUOTE_COLUMNS) - 1)
+            self.tree.insert("", 0, iid=stock_code, values=values)
+
+        if stock_data:
+            for index, (_, _, _, key) in enumerate(QUOTE_COLUMNS):
+                if key is not None:
+                    values[index] = stock_data.get(key, "")
+        values[-1] = status
+        self.tree.item(stock_code, values=values, tags=(status,))
+
+    def sort_by(self, column):
+        """컬럼 제목을 누르면 정렬 (다시 누르면 반대 순서)"""
+        descending = not self._sort_state.get(column, True)
+        self._sort_state[column] = descending
+        rows = [(self.tree.set(item, column), item) for item in self.tree.get_children("")]
+        rows.sort(key=lambda row: _sort_key(row[0]), reverse=descending)
+        for index, (_, item) in enumerate(rows):
+            self.tree.move(item, "", index)
+
+
+
+
+# ✅ 스케줄러 실행 함수
+def run_scheduler(gui_instance):
+    """스케줄러 백그라운드 실행 (GUI에서 중지하면 stop_event로 종료)"""
+    register_jobs().run(gui_instance.stop_event)
@@ -0,0 +1,307 @@
+import hashlib
+import threading
+import requests
+from lxml import html as lxml_html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from metrics import metrics, STAGE_NAVIGATE, STAGE_EXTRACT
+
+# 네이버 금융 기본 주소 (테스트용 로컬 서버로 교체 가능)
+NAVER_FINANCE_URL = "https://finance.naver.com"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36"
+NAVER_ENCODING = "euc-kr"  # 네이버 금융 페이지 기본 인코딩
+REQUEST_TIMEOUT = 5  # 요청당 최대 대기 시간 (초)
+POOL_SIZE = 10  # keep-alive 커넥션 풀 크기
+
+# 시장 지표 (환율 페이지의 모든 통화 + 국내증시 페이지의 지수)
+MARKET_KIND_FX = "환율"
+MARKET_KIND_INDEX = "지수"
+MARKET_INDICES = ("KOSPI", "KOSDAQ")
+EXCHANGE_PAIR = "USD/KRW"  # 예전 형식(통화/현재 환율/변동률)으로 제공하는 기준 환율
+
+
+class HttpEngineError(Exception):
+    """HTTP 엔진에서 페이지를 가져오거나 파싱하지 못했을 때 발생 (Selenium 폴백 대상)"""
+
+
+def _visible_text(elements):
+    """Selenium의 `.text`처럼 화면에 보이는 span 텍스트만 이어 붙이기 (.blind 제외)"""
+    parts = []
+    for element in elements:
+        if "blind" in element.get("class", "").split():
+            continue
+        text = element.text_content().strip()
+        if text:
+            parts.append(text)
+    return "".join(parts)
+
+
+def _clean_text(element):
+    """요소 텍스트의 공백/줄바꿈을 한 칸으로 정리"""
+    return " ".join(element.text_content().split())
+
+
+def parse_stock_page(page_html):
+    """종목 페이지(item/main.nhn) HTML에서 주식 데이터 추출
+
+    Selenium 경로와 같은 CSS 선택자/XPath를 사용하며, 데이터가 없는 페이지면 None 반환
+    """
+    # ✅ 페이지 내에 데이터가 있는지 확인
+    if "종목명" not in page_html:
+        return None
+
+    try:
+        tree = lxml_html.fromstring(page_html)
+
+        # ✅ 종목명 / 날짜
+        stock_name = _clean_text(tree.cssselect(".wrap_company h2 a")[0])
+        date_element = _clean_text(tree.cssselect(".description .date")[0])
+    except (IndexError, ValueError) as e:
+        raise HttpEngineError(f"필수 요소 파싱 실패: {e}") from e
+
+    # ✅ 현재가 (상승/하락 구분)
+    price_elements_up = tree.cssselect(".no_today em.no_up span")
+    price_elements_down = tree.cssselect(".no_today em.no_down span")
+    if price_elements_up:
+        current_price = _visible_text(price_elements_up)
+    elif price_elements_down:
+        current_price = _visible_text(price_elements_down)
+    else:
+        current_price = "N/A"
+
+    # ✅ 등락가 및 변동률 (하락이면 음수로 변환)
+    change_number, change_percent = "N/A", "N/A"
+    up_elements = tree.cssselect(".no_exday em.no_up")
+    down_elements = tree.cssselect(".no_exday em.no_down")
+    if len(up_elements) >= 2:
+        change_number = _visible_text(up_elements[0].cssselect("span:not(.ico)"))
+        change_percent = _visible_text(up_elements[1].cssselect("span:not(.ico)"))
+    elif len(down_elements) >= 2:
+        change_number = "-" + _visible_text(down_elements[0].cssselect("span:not(.ico)"))
+        change_percent = "-" + _visible_text(down_elements[1].cssselect("span:not(.ico)"))
+
+    # ✅ 거래량
+    volume_elements = tree.xpath("//span[contains(text(), '거래량')]/following-sibling::em/span")
+    if not volume_elements:
+        raise HttpEngineError("거래량 요소를 찾을 수 없음")
+    volume = _visible_text(volume_elements)
+
+    return {
+        "기준 날짜": date_element,
+        "종목명": stock_name,
+        "현재가": current_price,
+        "등락가": change_number,
+        "등락률": change_percent,
+        "거래량": volume
+    }
+
+
+def _signed(value, direction):
+    """변동 방향 텍스트(상승/하락)에 맞춰 부호 붙이기 ("1.10", "하락" → "-1.10")"""
+    value = value.strip().lstrip("+-")
+    if "하락" in direction:
+        return f"-{value}"
+    if "상승" in direction:
+        return f"+{value}"
+    return value
+
+
+def _currency_pair(item):
+    """#exchangeList 항목의 통화쌍 ("...marketindexCd=FX_USDKRW" → "USD/KRW")"""
+    link = item.cssselect("a.head")
+    code = link[0].get("href", "").rsplit("FX_", 1)[-1] if link else ""
+    if len(code) == 6:
+        return f"{code[:3]}/{code[3:]}"
+    classes = link[0].get("class", "").split() if link else []
+    return f"{classes[-1].upper()}/KRW" if len(classes) > 1 else "N/A"
+
+
+def parse_exchange_list(page_html):
+    """시장지표 페이지(/marketindex/) HTML에서 #exchangeList의 모든 통화 환율 추출
+
+    통화마다 {"구분": "환율", "종목": "USD/KRW", "현재값", "변동", "변동률"} (JPY는 100엔 기준, 변동률은 페이지에 없어 빈 값)
+    """
+    tree = lxml_html.fromstring(page_html)
+    rates = []
+    for item in tree.cssselect("#exchangeList > li"):
+        try:
+            value = item.cssselect(".value")[0].text_content().strip()
+            change_element = item.cssselect(".change")[0]
+        except IndexError:
+            continue
+
+        # ✅ 변동 방향 (.change 바로 다음 형제 요소의 텍스트)
+        direction_element = change_element.getnext()
+        direction = direction_element.text_content().strip() if direction_element is not None else ""
+        rates.append({
+            "구분": MARKET_KIND_FX,
+            "종목": _currency_pair(item),
+            "현재값": value,
+            "변동": _signed(change_element.text_content(), direction),
+            "변동률": ""
+        })
+
+    if not rates:
+        raise HttpEngineError("환율 요소를 찾을 수 없음")
+    return rates
+
+
+def parse_exchange_page(page_html):
+    """시장지표 페이지(/marketindex/) HTML에서 USD/KRW 환율 데이터 추출"""
+    return to_exchange_data(parse_exchange_list(page_html))
+
+
+def to_exchange_data(rates):
+    """환율 목록에서 USD/KRW를 예전 형식 ({"통화", "현재 환율", "변동률"})으로 변환 (없으면 None)"""
+    for rate in rates or ():
+        if rate["종목"] == EXCHANGE_PAIR:
+            return {"통화": rate["종목"], "현재 환율": rate["현재값"], "변동률": rate["변동"]}
+    return None
+
+
+def parse_index_page(page_html):
+    """국내증시 페이지(/sise/) HTML에서 KOSPI/KOSDAQ 지수 추출
+
+    지수마다 {"구분": "지수", "종목": "KOSPI", "현재값": "2,589.14", "변동": "+12.34", "변동률": "+0.48%"}
+    """
+    tree = lxml_html.fromstring(page_html)
+    indices = []
+    for name in MARKET_INDICES:
+        now_elements = tree.xpath(f'//*[@id="{name}_now"]')
+        change_elements = tree.xpath(f'//*[@id="{name}_change"]')
+        if not now_elements or not change_elements:
+            raise HttpEngineError(f"{name} 지수 요소를 찾을 수 없음")
+
+        # "12.34 +0.48%<span class="blind">상승</span>" → 변동 / 변동률 / 방향
+        change_element = change_elements[0]
+        direction = "".join(element.text_content() for element in change_element.cssselect(".blind"))
+        parts = (change_element.text or "").split()
+        change = parts[0] if parts else "N/A"
+        change_rate = parts[1] if len(parts) > 1 else "N/A"
+        if not direction and change_rate.startswith("-"):
+            direction = "하락"
+        indices.append({
+            "구분": MARKET_KIND_INDEX,
+            "종목": name,
+            "현재값": now_elements[0].text_content().strip(),
+            "변동": _signed(change, direction),
+            "변동률": _signed(change_rate, direction)
+        })
+    return indices
+
+
+def _copy(parsed):
+    """캐시된 파싱 결과를 호출한 쪽에서 수정해도 캐시가 바뀌지 않도록 복사"""
+    if isinstance(parsed, list):
+        return [dict(item) for item in parsed]
+    return dict(parsed) if parsed is not None else None
+
+
+class NaverHttpClient:
+    """keep-alive 커넥션 풀을 사용하는 네이버 금융 HTTP 클라이언트"""
+
+    def __init__(self, base_url=NAVER_FINANCE_URL, pool_size=POOL_SIZE, timeout=REQUEST_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+        retry = Retry(total=2, backoff_factor=0.2, status_forcelist=(500, 502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"User-Agent": USER_AGENT})
+
+        # 페이지별 (ETag, Last-Modified, 본문 해시, 파싱 결과) → 바뀌지 않은 페이지는 다시 파싱하지 않음
+        self._pages = {}
+        self._page_lock = threading.Lock()
+
+    def _get(self, path, params=None, headers=None):
+        """GET 요청 후 응답 반환 (네트워크/HTTP 오류는 HttpEngineError)"""
+        url = f"{self.base_url}{path}"
+        with metrics.stage(STAGE_NAVIGATE, (params or {}).get("code")) as timer:
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+                # urllib3가 자동으로 재시도한 횟수
+                retries = getattr(response.raw, "retries", None)
+                timer.retries = len(retries.history) if retries is not None else 0
+                response.raise_for_status()
+            except requests.RequestException as e:
+                raise HttpEngineError(f"요청 실패 ({url}): {e}") from e
+        return response
+
+    @staticmethod
+    def _decode(response):
+        # 헤더에 charset이 없으면 requests가 ISO-8859-1로 가정하므로 EUC-KR로 보정
+        encoding = response.encoding
+        if not encoding or encoding.lower() == "iso-8859-1":
+            encoding = NAVER_ENCODING
+        return response.content.decode(encoding, errors="replace")
+
+    def fetch(self, path, params=None):
+        """페이지 HTML을 가져와 문자열로 반환 (네트워크/HTTP 오류는 HttpEngineError)"""
+        return self._decode(self._get(path, params))
+
+    def _fetch_parsed(self, path, parse, params=None):
+        """페이지를 가져와 parse(page_html) 결과 반환 (내용이 바뀌지 않았으면 파싱 생략)
+
+        - 이전 응답의 ETag / Last-Modified로 조건부 요청 → 304면 이전 파싱 결과 재사용
+        - 200이어도 본문 해시가 이전과 같으면 파싱하지 않고 이전 결과 재사용
+        """
+        key = (path, tuple(sorted((params or {}).items())))
+        with self._page_lock:
+            cached = self._pages.get(key)
+
+        headers = {}
+        if cached is not None:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = self._get(path, params, headers)
+        if response.status_code == 304 and cached is not None:
+            metrics.increment("http_page_unchanged_total", reason="not_modified")
+            return _copy(cached["parsed"])
+
+        digest = hashlib.blake2b(response.content, digest_size=16).digest()
+        if cached is not None and cached["digest"] == digest:
+            metrics.increment("http_page_unchanged_total", reason="same_hash")
+            parsed = cached["parsed"]
+        else:
+            with metrics.stage(STAGE_EXTRACT, (params or {}).get("code")):
+                parsed = parse(self._decode(response))
+
+        with self._page_lock:
+            self._pages[key] = {"etag": response.headers.get("ETag"),
+                                "last_modified": response.headers.get("Last-Modified"),
+                                "digest": digest, "parsed": parsed}
+        return _copy(parsed)
+
+    def get_stock_data(self, stock_code):
+        """종목 페이지를 HTTP로 가져와 주식 데이터 dict 반환 (데이터 없으면 None)"""
+        return self._fetch_parsed("/item/main.nhn", parse_stock_page, params={"code": stock_code})
+
+    def get_exchange_rates(self):
+        """시장지표 페이지를 HTTP로 가져와 모든 통화의 환율 목록 반환"""
+        return self._fetch_parsed("/marketindex/", parse_exchange_list)
+
+    def get_exchange_rate(self):
+        """시장지표 페이지를 HTTP로 가져와 USD/KRW 환율 데이터 dict 반환"""
+        exchange_data = to_exchange_data(self.get_exchange_rates())
+        if exchange_data is None:
+            raise HttpEngineError(f"{EXCHANGE_PAIR} 환율을 찾을 수 없음")
+        return exchange_data
+
+    def get_market_indices(self):
+        """국내증시 페이지를 HTTP로 가져와 KOSPI/KOSDAQ 지수 목록 반환"""
+        return self._fetch_parsed("/sise/", parse_index_page)
+
+    def clear_page_cache(self):
+        """페이지별 조건부 요청/파싱 결과 캐시 비우기 (다음 요청은 전체 응답을 받아 다시 파싱)"""
+        with self._page_lock:
+            self._pages.clear()
+
+    def close(self):
+        """커넥션 풀 정리"""
+        self.session.close()
@@ -0,0 +1,182 @@
+import datetime
+import json
+import logging
+import threading
+import time
+from http_scraper import NaverHttpClient, HttpEngineError
+from batch_crawler import crawl_batch, load_watchlist, TokenBucket
+from storage import TickStorage, SQLITE_FILENAME
+from scheduler import TradingCalendar, KST, now_kst
+from metrics import metrics, setup_logging, STAGE_POLL, STAGE_PERSIST
+
+logger = logging.getLogger(__name__)
+
+# 네이버 금융 종목 페이지가 실시간 시세를 받아오는 JSON API (여러 종목을 한 번에 요청)
+NAVER_POLLING_URL = "https://polling.finance.naver.com"
+REALTIME_PATH = "/api/realtime"
+REALTIME_BATCH_SIZE = 50  # 요청 1회당 종목 수
+REALTIME_CONCURRENCY = 4  # 동시에 보낼 요청 수
+REALTIME_RATE = 5.0  # 초당 최대 요청 수
+POLL_INTERVAL = 5  # 폴링 주기 (초)
+
+# 정규장 시간 (한국 시간)
+MARKET_OPEN = "09:00"
+MARKET_CLOSE = "15:30"
+
+_FALLING = ("4", "5")  # rf(등락 구분): 1 상한, 2 상승, 3 보합, 4 하한, 5 하락
+
+
+def is_market_open(now=None, calendar=None):
+    """거래일 정규장 시간인지 확인 (calendar가 없으면 주말만 제외)"""
+    now = now or now_kst()
+    trading_day = calendar.is_trading_day(now.date()) if calendar is not None else now.weekday() < 5
+    return trading_day and MARKET_OPEN <= now.strftime("%H:%M") < MARKET_CLOSE
+
+
+def _market_time(now, hhmm):
+    hour, minute = map(int, hhmm.split(":"))
+    return now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+
+def parse_realtime_response(text):
+    """실시간 시세 API 응답(JSON)에서 틱 dict 목록 추출
+
+    - ts: 응답 시각 (한국 시간, "YYYY-MM-DD HH:MM:SS.mmm")
+    - change / change_rate: 하락이면 음수
+    """
+    try:
+        payload = json.loads(text)
+        result = payload["result"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise HttpEngineError(f"실시간 시세 응답 파싱 실패: {e}") from e
+    if payload.get("resultCode") != "success":
+        raise HttpEngineError(f"실시간 시세 응답 오류: {payload.get('resultCode')}")
+
+    if result.get("time"):
+        ts = datetime.datetime.fromtimestamp(result["time"] / 1000, KST)
+    else:
+        ts = now_kst()
+    ts = ts.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]  # 1초 미만 주기에서도 (code, ts)가 겹치지 않도록 밀리초까지
+
+    ticks = []
+    for area in result.get("areas") or []:
+        for data in area.get("datas") or []:
+            if data.get("nv") is None:
+                continue  # 거래 정지 등으로 현재가 없음
+            sign = -1 if str(data.get("rf")) in _FALLING else 1
+            ticks.append({
+                "code": data["cd"],
+                "name": data.get("nm"),
+                "ts": ts,
+                "price": int(data["nv"]),
+                "change": sign * abs(int(data.get("cv") or 0)),
+                "change_rate": sign * abs(float(data.get("cr") or 0)),
+                "volume": int(data.get("aq") or 0),
+                "market_status": data.get("ms"),
+            })
+    return ticks
+
+
+class IntradayPoller:
+    """관심 종목의 실시간 시세를 짧은 주기로 폴링해 바뀐 틱만 저장
+
+    - 종목을 REALTIME_BATCH_SIZE개씩 묶어 한 번에 요청 (100종목 이상도 주기당 요청 몇 건)
+    - 종목별 마지막 (현재가, 거래량)을 메모리에 두고 값이 바뀐 틱만 기록
+      → 저장량은 폴링 주기가 아니라 실제 체결 변화에 비례
+    """
+
+    def __init__(self, http_client=None, store=None, interval=POLL_INTERVAL, batch_size=REALTIME_BATCH_SIZE,
+                 max_workers=REALTIME_CONCURRENCY, rate=REALTIME_RATE, stop_event=None, calendar=None):
+        self.http_client = http_client or NaverHttpClient(base_url=NAVER_POLLING_URL)
+        self.store = store or TickStorage(SQLITE_FILENAME)
+        self.calendar = calendar or TradingCalendar()
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.bucket = TokenBucket(rate, capacity=max(1, max_workers)) if rate is not None else None
+        self.stop_event = stop_event or threading.Event()
+        self.last_ticks = {}  # 종목코드 -> (현재가, 거래량)
+
+    def _fetch_chunk(self, codes):
+        try:
+            page = self.http_client.fetch(REALTIME_PATH, params={"query": "SERVICE_ITEM:" + ",".join(codes)})
+            return parse_realtime_response(page)
+        except HttpEngineError as e:
+            logger.error("❌ [POLL] 실시간 시세 요청 실패 (%s 외 %s종목): %s", codes[0], len(codes) - 1, e)
+            return None
+
+    def load_last_ticks(self, codes):
+        """오늘 이미 저장된 마지막 틱으로 비교 기준 복원 (재시작해도 같은 틱을 다시 기록하지 않음)"""
+        today = now_kst().strftime("%Y-%m-%d")
+        for code, tick in self.store.latest(codes, since=today).items():
+            self.last_ticks[code] = (tick["price"], tick["volume"])
+
+    def poll_once(self, codes):
+        """한 번 폴링해서 가격/거래량이 바뀐 틱 목록을 저장하고 반환"""
+        chunks = [tuple(codes[i:i + self.batch_size]) for i in range(0, len(codes), self.batch_size)]
+        with metrics.stage(STAGE_POLL) as timer:
+            results = crawl_batch(chunks, self._fetch_chunk, max_workers=min(self.max_workers, len(chunks)),
+                                  timeout=self.interval, stop_event=self.stop_event, bucket=self.bucket)
+            timer.ok = all(result is not None for result in results)
+
+            changed, polled = [], 0
+            for ticks in results:
+                for tick in ticks or []:
+                    polled += 1
+                    key = (tick["price"], tick["volume"])
+                    if self.last_ticks.get(tick["code"]) != key:
+                        self.last_ticks[tick["code"]] = key
+                        changed.append(tick)
+
+            if changed:
+                with metrics.stage(STAGE_PERSIST):
+                    self.store.insert(changed)
+
+        metrics.increment("intraday_ticks_total", polled - len(changed), result="unchanged")
+        metrics.increment("intraday_ticks_total", len(changed), result="changed")
+        logger.debug("📡 [POLL] %s종목 중 %s건 변경", polled, len(changed))
+        return changed
+
+    def run(self, codes, market_hours=True, duration=None):
+        """stop_event가 설정될 때까지 interval초마다 폴링 (저장한 틱 수 반환)
+
+        market_hours=True면 장 시작 전에는 개장까지 기다리고 장 마감 후에는 종료
+        """
+        codes = list(dict.fromkeys(codes))
+        if not codes:
+            logger.warning("⚠️ [POLL] 폴링할 종목 코드가 없음")
+            return 0
+
+        if market_hours:
+            now = now_kst()
+            if not self.calendar.is_trading_day(now.date()) or now.strftime("%H:%M") >= MARKET_CLOSE:
+                logger.info("💤 [POLL] 오늘 정규장이 끝났거나 휴일이라 폴링하지 않음")
+                return 0
+            wait_seconds = (_market_time(now, MARKET_OPEN) - now).total_seconds()
+            if wait_seconds > 0:
+                logger.info("⌛ [POLL] 장 시작(%s)까지 %.0f초 대기", MARKET_OPEN, wait_seconds)
+                if self.stop_event.wait(wait_seconds):
+                    return 0
+
+        self.load_last_ticks(codes)
+        logger.info("🚀 [POLL] %s종목 %s초 주기 폴링 시작", len(codes), self.interval)
+        deadline = time.monotonic() + duration if duration is not None else None
+        saved = 0
+        while not self.stop_event.is_set():
+            if market_hours and not is_market_open(calendar=self.calendar):
+                logger.info("🛑 [POLL] 장 마감으로 폴링 종료")
+                break
+            started = time.monotonic()
+            saved += len(self.poll_once(codes))
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            # ✅ 요청/저장에 걸린 시간을 빼고 대기해 주기를 일정하게 유지
+            self.stop_event.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+        logger.info("✅ [POLL] 폴링 종료: 틱 %s건 저장", saved)
+        return saved
+
+
+if __name__ == "__main__":
+    setup_logging()
+    IntradayPoller().run(load_watchlist("stocks.txt"))
@@ -0,0 +1,288 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from metrics import metrics
+from storage import SQLITE_JOURNAL_MODE, SHARED_FS_JOURNAL_MODE
+
+logger = logging.getLogger(__name__)
+
+# 작업 큐 파일 (여러 워커 프로세스가 공유, 크롤링 결과는 기존 저장소에 기록)
+JOB_QUEUE_FILE = "crawl_jobs.db"
+
+# 작업 종류
+JOB_CRAWL = "crawl"  # 종목 묶음 크롤링 (payload: {"codes": [...]})
+JOB_UNIVERSE = "universe_refresh"  # 전체 종목 목록 갱신
+JOB_BACKFILL = "backfill"  # 종목 묶음 과거 시세 백필 (payload: {"codes": [...], "since", "max_pages"})
+
+# 작업 상태
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# 임대(lease) 설정: 워커는 JOB_HEARTBEAT_INTERVAL마다 임대를 연장하고,
+# 연장되지 않은 채 JOB_LEASE_SECONDS가 지나면 (워커가 죽은 것으로 보고) 다른 워커가 가져갈 수 있도록 다시 대기열로
+JOB_LEASE_SECONDS = 60
+JOB_HEARTBEAT_INTERVAL = 15
+JOB_MAX_ATTEMPTS = 5  # 실패/임대 만료가 이 횟수를 넘으면 failed로 남김
+JOB_RETRY_DELAY = 30  # 실패 후 다시 시도하기까지 기본 대기 시간 (초, 시도마다 두 배)
+WORKER_POLL_INTERVAL = 2  # 대기 중인 작업이 없을 때 다시 확인하는 주기 (초)
+
+# SQLite 저널 모드 (여러 호스트가 공유 파일시스템으로 같은 큐를 쓸 때는 SHARED_FS_JOURNAL_MODE, storage.py 참고)
+JOB_QUEUE_JOURNAL_MODE = SQLITE_JOURNAL_MODE
+
+
+class JobInterrupted(Exception):
+    """워커 종료 요청으로 작업을 끝내지 못했을 때 발생 (시도 횟수를 늘리지 않고 다시 대기열로)"""
+
+
+def default_worker_id(index=0):
+    """호스트명:PID:스레드 번호 (여러 호스트/프로세스가 같은 큐를 써도 겹치지 않도록)"""
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+class JobQueue:
+    """SQLite 기반 영속 작업 큐 (여러 프로세스/호스트의 워커가 임대 방식으로 작업을 나눠 가져감)
+
+    - claim(): 대기 중인 작업 하나를 임대 시각과 함께 가져감 (BEGIN IMMEDIATE로 같은 작업을 두 워커가 가져가지 않음)
+    - heartbeat(): 임대 연장, 다른 워커가 이미 가져갔으면 False
+    - 임대가 만료된 작업은 다음 claim()에서 자동으로 다시 대기열로 (워커가 죽어도 작업이 사라지지 않음)
+    - dedup_key가 같은 작업이 대기/실행 중이면 다시 넣지 않음 (여러 호스트의 스케줄러가 같은 작업을 넣어도 한 번만)
+    - 기본 WAL 모드는 한 호스트 전용, 여러 호스트에서 쓰려면 journal_mode=SHARED_FS_JOURNAL_MODE로
+      잠금(fcntl)을 지원하는 공유 파일시스템에 두고 호스트 시계를 맞춰야 함 (시각은 time.time() 기준)
+    """
+
+    def __init__(self, filename=JOB_QUEUE_FILE, max_attempts=JOB_MAX_ATTEMPTS, retry_delay=JOB_RETRY_DELAY,
+                 journal_mode=JOB_QUEUE_JOURNAL_MODE):
+        self.filename = filename
+        self.journal_mode = journal_mode
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS jobs ("
+                    "id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, payload TEXT NOT NULL, "
+                    "status TEXT NOT NULL, priority INTEGER NOT NULL DEFAULT 0, dedup_key TEXT, "
+                    "attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL, "
+                    "worker TEXT, lease_until REAL, available_at REAL NOT NULL, "
+                    "created_at REAL NOT NULL, updated_at REAL NOT NULL, result TEXT, error TEXT)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, priority, available_at)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_until)")
+                conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active_key ON jobs (dedup_key) "
+                             f"WHERE status IN ('{STATUS_QUEUED}', '{STATUS_RUNNING}')")
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.filename, timeout=30)
+        conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        return conn
+
+    def enqueue(self, kind, payload=None, priority=0, dedup_key=None, delay=0):
+        """작업 추가 후 id 반환 (같은 dedup_key 작업이 대기/실행 중이면 추가하지 않고 None)"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO jobs (kind, payload, status, priority, dedup_key, max_attempts, "
+                    "available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (kind, json.dumps(payload or {}, ensure_ascii=False), STATUS_QUEUED, priority, dedup_key,
+                     self.max_attempts, now + delay, now, now))
+        finally:
+            conn.close()
+
+        if cursor.rowcount == 0:
+            logger.debug("♻️ [QUEUE] 이미 대기/실행 중인 작업이라 건너뜀: %s", dedup_key)
+            return None
+        metrics.increment("queue_jobs_total", kind=kind, event="enqueued")
+        return cursor.lastrowid
+
+    @staticmethod
+    def _requeue_expired(conn, now):
+        """임대가 만료된 실행 중 작업을 다시 대기열로 (시도 횟수를 다 쓴 작업은 failed)"""
+        count = conn.execute(
+            f"UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN '{STATUS_FAILED}' "
+            f"ELSE '{STATUS_QUEUED}' END, error = 'lease expired (' || IFNULL(worker, '') || ')', "
+            f"worker = NULL, lease_until = NULL, updated_at = ? WHERE status = '{STATUS_RUNNING}' AND lease_until < ?",
+            (now, now)).rowcount
+        if count:
+            logger.warning("⚠️ [QUEUE] 임대가 만료된 작업 %s건 다시 대기열로", count)
+            metrics.increment("queue_jobs_total", count, event="lease_expired")
+        return count
+
+    def requeue_expired(self):
+        """임대가 만료된 작업을 다시 대기열로 (claim()에서도 자동으로 실행됨)"""
+        conn = self._connect()
+        try:
+            with conn:
+                return self._requeue_expired(conn, time.time())
+        finally:
+            conn.close()
+
+    def claim(self, worker_id, kinds=None, lease_seconds=JOB_LEASE_SECONDS):
+        """대기 중인 작업 하나를 임대해서 반환 (우선순위 높은 것 → 먼저 들어온 것, 없으면 None)
+
+        반환값: {"id", "kind", "payload", "attempts"}
+        """
+        now = time.time()
+        where, params = f"status = '{STATUS_QUEUED}' AND available_at <= ?", [now]
+        if kinds:
+            where += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params.extend(kinds)
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")  # 조회 → 임대까지 하나의 쓰기 트랜잭션으로
+                self._requeue_expired(conn, now)
+                row = conn.execute(f"SELECT id, kind, payload, attempts FROM jobs WHERE {where} "
+                                   "ORDER BY priority DESC, id LIMIT 1", params).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, lease_until = ?, "
+                             "updated_at = ? WHERE id = ?",
+                             (STATUS_RUNNING, worker_id, now + lease_seconds, now, row[0]))
+        finally:
+            conn.close()
+        return {"id": row[0], "kind": row[1], "payload": json.loads(row[2]), "attempts": row[3] + 1}
+
+    def _update_owned(self, job_id, worker_id, sql, params):
+        """이 워커가 아직 임대 중인 작업만 갱신 (임대가 만료되어 다른 워커가 가져갔으면 False)"""
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(f"{sql} WHERE id = ? AND worker = ? AND status = '{STATUS_RUNNING}'",
+                                      (*params, job_id, worker_id))
+        finally:
+            conn.close()
+        return cursor.rowcount == 1
+
+    def heartbeat(self, job_id, worker_id, lease_seconds=JOB_LEASE_SECONDS):
+        """임대 연장 (False면 임대를 잃은 것)"""
+        now = time.time()
+        return self._update_owned(job_id, worker_id, "UPDATE jobs SET lease_until = ?, updated_at = ?",
+                                  (now + lease_seconds, now))
+
+    def complete(self, job_id, worker_id, result=None):
+        """작업 완료 기록"""
+        return self._update_owned(job_id, worker_id,
+                                  "UPDATE jobs SET status = ?, result = ?, error = NULL, worker = NULL, "
+                                  "lease_until = NULL, updated_at = ?",
+                                  (STATUS_DONE, json.dumps(result, ensure_ascii=False), time.time()))
+
+    def fail(self, job_id, worker_id, error):
+        """작업 실패 기록 (시도 횟수가 남았으면 retry_delay × 2^(시도-1)초 뒤 다시 대기열로)"""
+        now = time.time()
+        return self._update_owned(
+            job_id, worker_id,
+            f"UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN '{STATUS_FAILED}' "
+            f"ELSE '{STATUS_QUEUED}' END, available_at = ? + ? * (1 << MIN(attempts - 1, 10)), error = ?, "
+            "worker = NULL, lease_until = NULL, updated_at = ?",
+            (now, self.retry_delay, str(error), now))
+
+    def release(self, job_id, worker_id):
+        """작업을 끝내지 못하고 반납 (종료 요청 등, 시도 횟수는 늘리지 않음)"""
+        return self._update_owned(job_id, worker_id,
+                                  "UPDATE jobs SET status = ?, attempts = attempts - 1, worker = NULL, "
+                                  "lease_until = NULL, updated_at = ?", (STATUS_QUEUED, time.time()))
+
+    def stats(self):
+        """작업 종류별 상태 건수 {종류: {상태: 건수}}"""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT kind, status, COUNT(*) FROM jobs GROUP BY kind, status").fetchall()
+        finally:
+            conn.close()
+        result = {}
+        for kind, status, count in rows:
+            result.setdefault(kind, {})[status] = count
+        return result
+
+    def purge(self, older_than_seconds):
+        """끝난(done) 작업 중 오래된 것 삭제 (삭제한 건수 반환)"""
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute("DELETE FROM jobs WHERE status = ? AND updated_at < ?",
+                                    (STATUS_DONE, time.time() - older_than_seconds)).rowcount
+        finally:
+            conn.close()
+
+
+class QueueWorker:
+    """작업 큐에서 작업을 하나씩 임대해 handlers[종류](job, stop_event)로 실행
+
+    - 실행하는 동안 별도 스레드가 임대를 연장 (heartbeat)
+    - 핸들러가 예외를 던지면 fail() → 시도 횟수가 남았으면 잠시 뒤 다시 실행
+    - JobInterrupted 또는 종료 요청 중 중단된 작업은 release()로 반납
+    """
+
+    def __init__(self, job_queue, handlers, worker_id=None, kinds=None, lease_seconds=JOB_LEASE_SECONDS,
+                 heartbeat_interval=JOB_HEARTBEAT_INTERVAL, poll_interval=WORKER_POLL_INTERVAL, stop_event=None):
+        self.job_queue = job_queue
+        self.handlers = handlers
+        self.worker_id = worker_id or default_worker_id()
+        self.kinds = list(kinds or handlers)
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = min(heartbeat_interval, lease_seconds / 3)  # 임대가 끝나기 전에 여러 번 연장
+        self.poll_interval = poll_interval
+        self.stop_event = stop_event or threading.Event()
+        self.processed = 0
+
+    def _heartbeat(self, job, finished):
+        while not finished.wait(self.heartbeat_interval):
+            if not self.job_queue.heartbeat(job["id"], self.worker_id, self.lease_seconds):
+                logger.warning("⚠️ [WORKER] [%s] 작업 #%s 임대를 잃음 (다른 워커가 다시 실행할 수 있음)",
+                               self.worker_id, job["id"])
+                return
+
+    def run_job(self, job):
+        """임대한 작업 하나 실행 후 결과 기록"""
+        logger.info("📌 [WORKER] [%s] 작업 #%s (%s) 시작 (시도 %s회)", self.worker_id, job["id"], job["kind"],
+                    job["attempts"])
+        finished = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, finished),
+                                     name=f"heartbeat-{job['id']}", daemon=True)
+        heartbeat.start()
+        try:
+            result = self.handlers[job["kind"]](job, self.stop_event)
+        except JobInterrupted as e:
+            logger.info("⏸️ [WORKER] [%s] 작업 #%s 반납: %s", self.worker_id, job["id"], e)
+            self.job_queue.release(job["id"], self.worker_id)
+            metrics.increment("queue_jobs_total", kind=job["kind"], event="released")
+        except Exception as e:
+            logger.error("❌ [WORKER] [%s] 작업 #%s 실패: %s", self.worker_id, job["id"], e)
+            self.job_queue.fail(job["id"], self.worker_id, e)
+            metrics.increment("queue_jobs_total", kind=job["kind"], event="failed")
+        else:
+            if self.job_queue.complete(job["id"], self.worker_id, result):
+                logger.info("✅ [WORKER] [%s] 작업 #%s 완료: %s", self.worker_id, job["id"], result)
+            metrics.increment("queue_jobs_total", kind=job["kind"], event="done")
+        finally:
+            finished.set()
+            heartbeat.join()
+        self.processed += 1
+
+    def run(self, max_jobs=None, exit_when_empty=False):
+        """stop_event가 설정될 때까지 작업 처리 (max_jobs개 처리 또는 exit_when_empty면 큐가 비었을 때 종료)"""
+        logger.info("🚀 [WORKER] [%s] 시작 (작업 종류: %s)", self.worker_id, ", ".join(self.kinds))
+        while not self.stop_event.is_set():
+            if max_jobs is not None and self.processed >= max_jobs:
+                break
+            job = self.job_queue.claim(self.worker_id, self.kinds, self.lease_seconds)
+            if job is None:
+                if exit_when_empty:
+                    break
+                self.stop_event.wait(self.poll_interval)
+                continue
+            self.run_job(job)
+        logger.info("🛑 [WORKER] [%s] 종료 (처리 %s건)", self.worker_id, self.processed)
+        return self.processed
@@ -1,523 +1,586 @@
 import os
-import sys
-import time
-import pandas as pd
+import logging
 import datetime
-import schedule
 import threading
-import tkinter as tk
-from tkinter import ttk
-from tkinter import messagebox
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from http_scraper import (NaverHttpClient, HttpEngineError, parse_exchange_list, parse_index_page, to_exchange_data,
+                          MARKET_KIND_FX, MARKET_KIND_INDEX)
+from cache import TTLCache
+from universe import UniverseBuilder
+from storage import (create_storage, CsvAppendStorage, STORAGE_CSV, STORAGE_SQLITE, MARKET_REF_COLUMN, SQLITE_FILENAME,
+                     SQLITE_JOURNAL_MODE)
+from scheduler import Scheduler, load_job_specs, now_kst, SCHEDULE_FILE
+from job_queue import JobInterrupted, JOB_CRAWL, JOB_UNIVERSE, JOB_BACKFILL
+from batch_crawler import crawl_batch, load_watchlist, DEFAULT_CONCURRENCY, DEFAULT_RATE, DEFAULT_SYMBOL_TIMEOUT
+from metrics import (metrics, setup_logging, JsonLinesSink, MetricsServer, METRICS_JSONL_FILE, METRICS_PORT,
+                     STAGE_NAVIGATE, STAGE_WAIT, STAGE_EXTRACT, STAGE_PERSIST, STAGE_FX_FETCH, STAGE_SYMBOL)
+
+# tkinter / selenium / pandas는 실제로 필요한 곳에서 import
+# (import만으로 Chrome을 띄우거나 스케줄을 등록하지 않으므로 라이브러리/CLI에서 바로 사용 가능)
+
+logger = logging.getLogger("main")
+
+# 로그 레벨 (종목별 상세 로그는 DEBUG)
+LOG_LEVEL = logging.INFO
 
 # ChromeDriver 경로 설정
 CHROME_DRIVER_PATH = "C:/resource/chromedriver-win64/chromedriver-win64/chromedriver.exe"
 
+# 크롤링 엔진 설정 ("http": requests + lxml, 실패 시 Selenium 폴백 / "selenium": Chrome만 사용)
+ENGINE_HTTP = "http"
+ENGINE_SELENIUM = "selenium"
+DEFAULT_ENGINE = ENGINE_HTTP
+
+# 저장소 설정 (CSV: 기존 stock_exchange_data.csv에 이어 쓰기 / SQLite: (날짜, 종목코드) 인덱스)
+STORAGE_BACKENDS = (STORAGE_CSV, STORAGE_SQLITE)
+
+# 종목 검색 설정
+STOCK_CODES_FILE = "kospi_stock_codes.csv"
+SEARCH_DEBOUNCE_MS = 150  # 입력이 멈춘 뒤 검색까지 대기 시간 (ms)
+SEARCH_RESULT_LIMIT = 50  # 리스트박스에 표시할 최대 검색 결과 수
+UNIVERSE_REFRESH_CRON = "30 8 * * *"  # 전체 종목 목록 갱신 시각 (거래일 장 시작 전)
+
+# 자동 크롤링 작업 (cron 표현식 "분 시 일 월 요일", 거래일에만 실행)
+# schedule_jobs.json이 있으면 그 파일의 작업 목록을 대신 사용 (작업별 종목 코드 파일 지정 가능)
+WATCHLIST_FILE = "stocks.txt"
+AUTO_CRAWL_JOBS = (
+    {"name": "auto_crawl_open", "cron": "0,30 9 * * *", "watchlist": WATCHLIST_FILE},
+    {"name": "auto_crawl_close", "cron": "0 15 * * *", "watchlist": WATCHLIST_FILE},
+    {"name": "auto_crawl_evening", "cron": "0 18 * * *", "watchlist": WATCHLIST_FILE},
+)
+
+# 작업 큐 설정 (스케줄러/CLI가 작업을 넣고 여러 워커 프로세스가 나눠서 처리)
+CRAWL_JOB_CHUNK_SIZE = 50  # 크롤링 작업 하나에 넣을 종목 수
+BACKFILL_JOB_CHUNK_SIZE = 10  # 백필 작업 하나에 넣을 종목 수
+# CSV 이어 쓰기 잠금은 프로세스 안에서만 유효하므로 여러 워커 프로세스는 SQLite(WAL)에만 기록
+JOB_STORAGE_BACKENDS = (STORAGE_SQLITE,)
+# 워커가 결과를 기록할 SQLite 파일과 저널 모드 (cli.py worker --db / --shared-fs로 변경)
+JOB_SQLITE_FILENAME = SQLITE_FILENAME
+JOB_SQLITE_JOURNAL_MODE = SQLITE_JOURNAL_MODE
+
+# 장마감 스냅샷 재사용 (오늘 장마감 데이터를 받은 종목은 그날 다시 크롤링하지 않음)
+CLOSED_SESSION_MARK = "장마감"
+
+# 시장 지표 캐시 설정 (환율 전체 + KOSPI/KOSDAQ 지수를 실행당 한 번만 크롤링, 같은 실행/검색 사이에는 재사용)
+EXCHANGE_CACHE_TTL = 300  # 초
+MARKET_CACHE_KEY = "market_snapshot"
+MARKET_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"  # 스냅샷 시각 (주식 행은 이 값으로 스냅샷을 참조)
+
+# Selenium 폴백용 시장 지표 페이지 (구분 -> (주소, 준비 완료 판단 선택자))
+MARKET_PAGES = {
+    MARKET_KIND_FX: ("https://finance.naver.com/marketindex/", "#exchangeList .value"),
+    MARKET_KIND_INDEX: ("https://finance.naver.com/sise/", "#KOSDAQ_change"),
+}
+
+# ✅ Selenium 경로용 추출 스크립트
+# 필요한 요소가 아직 없으면 false를 반환하므로 WebDriverWait 조건으로 그대로 사용하고,
+# 준비되면 모든 필드를 dict로 한 번에 반환 (.blind는 화면에 안 보이는 텍스트라 제외)
+STOCK_EXTRACT_SCRIPT = """
+const visibleText = (elements) => Array.from(elements)
+    .filter((el) => !el.classList.contains("blind"))
+    .map((el) => el.textContent.trim())
+    .filter((text) => text)
+    .join("");
+const nameElement = document.querySelector(".wrap_company h2 a");
+const volumeSnapshot = document.evaluate(
+    "//span[contains(text(), '거래량')]/following-sibling::em/span",
+    document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+
+if (!nameElement || volumeSnapshot.snapshotLength === 0) {
+    if (document.readyState !== "loading" && !document.documentElement.innerHTML.includes("종목명")) {
+        return {empty: true};
+    }
+    return false;
+}
+
+const volumeElements = [];
+for (let i = 0; i < volumeSnapshot.snapshotLength; i++) {
+    volumeElements.push(volumeSnapshot.snapshotItem(i));
+}
+
+let currentPrice = "N/A";
+const priceUp = document.querySelectorAll(".no_today em.no_up span");
+const priceDown = document.querySelectorAll(".no_today em.no_down span");
+if (priceUp.length) {
+    currentPrice = visibleText(priceUp);
+} else if (priceDown.length) {
+    currentPrice = visibleText(priceDown);
+}
+
+let changeNumber = "N/A";
+let changePercent = "N/A";
+const upElements = document.querySelectorAll(".no_exday em.no_up");
+const downElements = document.querySelectorAll(".no_exday em.no_down");
+if (upElements.length >= 2) {
+    changeNumber = visibleText(upElements[0].querySelectorAll("span:not(.ico)"));
+    changePercent = visibleText(upElements[1].querySelectorAll("span:not(.ico)"));
+} else if (downElements.length >= 2) {
+    changeNumber = "-" + visibleText(downElements[0].querySelectorAll("span:not(.ico)"));
+    changePercent = "-" + visibleText(downElements[1].querySelectorAll("span:not(.ico)"));
+}
+
+const dateElement = document.querySelector(".description .date");
+return {
+    "기준 날짜": dateElement ? dateElement.textContent.replace(/\\s+/g, " ").trim() : "N/A",
+    "종목명": nameElement.textContent.trim(),
+    "현재가": currentPrice,
+    "등락가": changeNumber,
+    "등락률": changePercent,
+    "거래량": visibleText(volumeElements)
+};
+"""
+
+# 시장 지표 페이지는 요소가 준비되면 page_source를 HTTP 경로와 같은 파서로 추출
+MARKET_READY_SCRIPT = "return document.querySelector(arguments[0]) !== null;"
+
 # ✅ StockExchangeScraper: 객체
 class StockExchangeScraper:
-    _instance = None  # 싱글톤 인스턴스 저장
-
-    def __new__(cls):
-        """싱글톤 패턴 적용: 인스턴스가 없을 때만 생성"""
-        if cls._instance is None:
-            cls._instance = super(StockExchangeScraper, cls).__new__(cls)
-            cls._instance._initialize()
-        return cls._instance
-
-    def __init__(self):
-        self.exchange_data = None
-
-    def _initialize(self):
-        """WebDriver 설정 및 실행"""
-        options = Options()
-        options.add_experimental_option("detach", True)  # 브라우저 자동 종료 방지
-        options.add_argument("--start-maximized")  # 창 최대화
-        options.add_argument("--disable-popup-blocking")  # 팝업 차단 방지
-        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36")
-
-        self.driver = webdriver.Chrome(service=Service(CHROME_DRIVER_PATH), options=options)
-        self.wait = WebDriverWait(self.driver, 15)  # 최대 15초 대기
+    # 모든 인스턴스가 공유하는 HTTP 세션 / WebDriver 풀 (처음 필요할 때 준비)
+    http_client = None
+    driver_pool = None
+    exchange_cache = TTLCache(EXCHANGE_CACHE_TTL)  # 시장 지표(환율/지수)는 배치/검색 간에 공유
+    closed_quotes = {}  # 종목코드 -> 오늘 장마감 주식 데이터
+    _shared_lock = threading.Lock()
+
+    def __init__(self, engine=None):
+        """엔진 설정 (Chrome 세션은 Selenium 경로가 필요할 때 풀에서 빌려씀)"""
+        self.engine = engine or DEFAULT_ENGINE
+        self.exchange_data = None  # USD/KRW (예전 형식: 통화/현재 환율/변동률)
+        self.market_snapshot = None  # 시장 지표 스냅샷 행 목록 (모든 통화 + 지수, 같은 "시각")
         self.stock_data_list = []  # 여러 개의 주식 데이터를 저장할 리스트
 
-    @classmethod
-    def get_instance(cls):
-        """싱글톤 인스턴스 반환"""
-        return cls()
-
-    def get_stock_data(self, stock_code):
-        """네이버 금융에서 특정 종목 주식 데이터 크롤링"""
-        stock_url = f"https://finance.naver.com/item/main.nhn?code={stock_code}"
-        print(f"🔍 크롤링 시작: {stock_code} ({stock_url})")
-        self.driver.get(stock_url)
-        time.sleep(3)
-
-        try:
-            # ✅ 페이지 내에 데이터가 있는지 확인
-            if "종목명" not in self.driver.page_source:
-                print(f"⚠️ [{stock_code}] 페이지에 데이터가 없음 (비상장/관리종목 가능성)")
-                return
-
-            print(f"✅ [INFO] [{stock_code}] 페이지 로딩 완료. 데이터 추출 시작...")
-
-            # ✅ 종목명 가져오기
-            stock_name = self.wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".wrap_company h2 a"))
-            ).text
-            print(f"🔎 [DEBUG] 종목명 추출 성공: {stock_name}")
-
-            # ✅ 날짜 데이터 가져오기
-            date_element = self.wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".description .date"))
-            ).text.strip()
-            print(f"🔎 [DEBUG] 기준 날짜 추출 성공: {date_element}")
-
-            # ✅ 현재가 가져오기 (상승/하락 구분)
-            price_elements_up = self.driver.find_elements(By.CSS_SELECTOR, ".no_today em.no_up span")
-            price_elements_down = self.driver.find_elements(By.CSS_SELECTOR, ".no_today em.no_down span")
-
-            if price_elements_up:
-                print(f"🔎 [DEBUG] 상승장에서 현재가 추출 시도...")
-                current_price = "".join([span.text for span in price_elements_up])
-            elif price_elements_down:
-                print(f"🔎 [DEBUG] 하락장에서 현재가 추출 시도...")
-                current_price = "".join([span.text for span in price_elements_down])
-            else:
-                print(f"⚠️ [WARN] 현재가를 찾을 수 없음!")
-                current_price = "N/A"
-
-            print(f"🔎 [DEBUG] 현재가 추출 성공: {current_price}")
-
-            # ✅ 등락가 및 변동률 가져오기 (상승/하락 모두 고려)
-            # 등락가 및 변동률 기본값 설정 (초기화)
-            change_number = "N/A"
-            change_percent = "N/A"
-            try:
-                # 상승장인 경우
-                up_elements = self.driver.find_elements(By.CSS_SELECTOR, ".no_exday em.no_up")
-                down_elements = self.driver.find_elements(By.CSS_SELECTOR, ".no_exday em.no_down")
-
-                if up_elements:
-                    # 상승 등락가
-                    change_number_element = up_elements[0].find_elements(By.CSS_SELECTOR, "span:not(.ico)")
-                    change_number = "".join([span.text for span in change_number_element if span.text.strip()])
+        cls = type(self)
+        with cls._shared_lock:
+            if cls.http_client is None:
+                cls.http_client = NaverHttpClient()
 
-                    # 상승 변동률
-                    change_percent_element = up_elements[1].find_elements(By.CSS_SELECTOR, "span:not(.ico)")
-                    change_percent = "".join([span.text for span in change_percent_element if span.text.strip()])
-
-                    print(f"🔎 [DEBUG] 상승 등락가: {change_number}")
-                    print(f"🔎 [DEBUG] 상승 변동률: {change_percent}")
-
-                elif down_elements:
-                    # 하락 등락가
-                    change_number_element = down_elements[0].find_elements(By.CSS_SELECTOR, "span:not(.ico)")
-                    change_number = "".join([span.text for span in change_number_element if span.text.strip()])
-                    change_number = "-" + change_number  # 하락이면 음수로 변환
-
-                    # 하락 변동률
-                    change_percent_element = down_elements[1].find_elements(By.CSS_SELECTOR, "span:not(.ico)")
-                    change_percent = "".join([span.text for span in change_percent_element if span.text.strip()])
-                    change_percent = "-" + change_percent  # 하락이면 음수로 변환
+    @classmethod
+    def get_driver_pool(cls):
+        """WebDriver 풀 (Selenium 경로가 처음 필요할 때 selenium을 import하고 생성)"""
+        with cls._shared_lock:
+            if cls.driver_pool is None:
+                from driver_pool import WebDriverPool, DRIVER_POOL_SIZE, DRIVER_MAX_PAGES
+                cls.driver_pool = WebDriverPool(CHROME_DRIVER_PATH, size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES)
+            return cls.driver_pool
 
-                    print(f"🔎 [DEBUG] 하락 등락가: {change_number}")
-                    print(f"🔎 [DEBUG] 하락 변동률: {change_percent}")
+    @classmethod
+    def get_instance(cls, engine=None):
+        """스크래퍼 인스턴스 생성 (HTTP 세션과 WebDriver 풀은 공유)"""
+        return cls(engine)
 
-                else:
-                    print("⚠️ [WARN] 등락 데이터 없음")
-                    change_number, change_percent = "N/A", "N/A"
-
-            except Exception as e:
-                print(f"❌ [ERROR] 등락 데이터 크롤링 오류: {e}")
-
-            # ✅ 거래량 가져오기
-            volume_elements = self.wait.until(
-                EC.presence_of_all_elements_located(
-                    (By.XPATH, "//span[contains(text(), '거래량')]/following-sibling::em/span"))
-            )
-            volume = "".join([span.text for span in volume_elements])
-            print(f"🔎 [DEBUG] 거래량 추출 성공: {volume}")
-
-            stock_data = {
-                "기준 날짜": date_element,  # 날짜 추가
-                "종목명": stock_name,
-                "현재가": current_price,
-                "등락가": change_number,
-                "등락률": change_percent,
-                "거래량": volume
-            }
+    def get_stock_data(self, stock_code):
+        """네이버 금융에서 특정 종목 주식 데이터 크롤링 후 stock_data_list에 추가"""
+        stock_data = self.fetch_stock_data(stock_code)
+        if stock_data:
             self.stock_data_list.append(stock_data)
-            print(f"📊 {stock_name} 데이터 수집 완료: {stock_data}")
 
-        except Exception as e:
-            print(f"❌ [ERROR] 주식 데이터 크롤링 오류 ({stock_code}): {e}")
+    def fetch_stock_data(self, stock_code):
+        """특정 종목 주식 데이터 dict 반환 (HTTP 엔진 실패 시 Selenium 폴백, 데이터 없으면 None)
 
-    def get_exchange_rate(self):
-        """네이버 금융에서 환율 데이터 크롤링"""
-        exchange_url = "https://finance.naver.com/marketindex/"
-        self.driver.get(exchange_url)
-        time.sleep(2)
+        stock_data_list를 건드리지 않으므로 여러 스레드에서 동시에 호출 가능
+        오늘 장이 마감된 종목은 크롤링하지 않고 장마감 데이터를 그대로 반환
+        """
+        closed = self._closed_quote(stock_code)
+        if closed is not None:
+            logger.debug("⏭️ [%s] 오늘 장마감 데이터가 있어 크롤링 건너뜀", stock_code)
+            metrics.increment("crawl_skipped_total", reason="session_closed")
+            return closed
 
-        try:
-            # ✅ WebDriverWait으로 요소가 나타날 때까지 대기
-            exchange_rate_element = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "#exchangeList .value"))
-            )
-            change_element = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "#exchangeList .change"))
-            )
-
-            # ✅ WebElement에서 `.text` 값을 추출
-            exchange_rate = exchange_rate_element.text.strip()
-            change = change_element.text.strip()
-
-
-            # ✅ JavaScript로 변동 방향 (하락/상승) 요소 가져오기
-            change_direction = self.driver.execute_script(
-                """
-                return document.querySelector("#exchangeList .change").nextElementSibling.textContent.trim();
-                """
-            )
-            print(f"변동 방향: {change_direction}")  # 디버깅 확인용
-
-
-            # ✅ 변동 방향에 따라 부호 추가
-            if "하락" in change_direction:
-                change = f"-{change}"  # 하락이면 음수
-            elif "상승" in change_direction:
-                change = f"+{change}"  # 상승이면 양수
-
-            self.exchange_data = {
-                "통화": "USD/KRW",
-                "현재 환율": exchange_rate,
-                "변동률": change
-            }
-            print(f"💰 환율 데이터 수집 완료: {self.exchange_data}")
+        with metrics.stage(STAGE_SYMBOL, stock_code) as timer:
+            stock_data = self._fetch_stock_data(stock_code)
+            timer.ok = stock_data is not None
+        self._remember_if_closed(stock_code, stock_data)
+        return stock_data
 
-        except Exception as e:
-            print(f"❌ 환율 데이터 크롤링 오류: {e}")
+    @classmethod
+    def _closed_quote(cls, stock_code):
+        """오늘(KST) 장마감 데이터 복사본 (없거나 날짜가 지났으면 None)"""
+        stock_data = cls.closed_quotes.get(stock_code)
+        if stock_data is None or not stock_data["기준 날짜"].startswith(now_kst().strftime("%Y.%m.%d")):
+            return None
+        return dict(stock_data)
 
-    def save_to_csv(self, filename="stock_exchange_data.csv"):
-        """크롤링한 데이터를 CSV 파일로 저장"""
-        if self.stock_data_list:
-            df = pd.DataFrame(self.stock_data_list)
-
-            # ✅ 환율 데이터 추가 (모든 주식 데이터 행에 동일하게 추가)
-            for key, value in self.exchange_data.items():
-                df[key] = value
-
-            # ✅ 기존 CSV 파일 확인 후 이어서 저장 (Append 모드)
-            if os.path.exists(filename):
-                try:
-                    existing_df = pd.read_csv(filename, encoding="utf-8-sig")
-                    df = pd.concat([existing_df, df], ignore_index=True)
-                except (FileNotFoundError, pd.errors.EmptyDataError, pd.errors.ParserError):
-                    print("⚠️ 기존 CSV 파일이 손상되었거나 비어 있습니다. 새로 생성합니다.")
-
-            df.to_csv(filename, index=False, encoding="utf-8-sig")
-            print(f"✅ CSV 저장 완료: {filename}")
+    @classmethod
+    def _remember_if_closed(cls, stock_code, stock_data):
+        """기준 날짜가 '오늘(KST) ... (장마감)'이면 기록 (장 시작 전 받은 전날 장마감 데이터는 제외)"""
+        if not stock_data:
+            return
+        date_text = stock_data.get("기준 날짜") or ""
+        if CLOSED_SESSION_MARK in date_text and date_text.startswith(now_kst().strftime("%Y.%m.%d")):
+            cls.closed_quotes[stock_code] = dict(stock_data)
         else:
-            print("⚠️ 저장할 데이터가 없습니다.")
-
-    def close_browser(self):
-        """WebDriver 종료"""
-        self.driver.quit()
-        print("🛑 WebDriver 종료 완료")
-
-
-
-# ✅ GUI 클래스
-class StockCrawlerGUI:
-    def __init__(self):
-        """GUI 초기화"""
-
-        self.root = tk.Tk()
-        self.root.title("📈 주식 크롤링 프로그램")
-        self.root.geometry("800x550")
-        self.root.resizable(False, False)
-
-        # ✅ 실행 상태 변수
-        self.is_running = False
-        self.stop_event = threading.Event()
-
-        # ✅ 스타일 적용
-        self.configure_styles()
-
-        # ✅ GUI 구성 요소 생성
-        self.create_widgets()
+            cls.closed_quotes.pop(stock_code, None)
 
-        # ✅ GUI 실행
-        self.root.mainloop()
-
-        # ✅ GUI 위젯의 속성들을 미리 선언 (가독성과 코드 유지보수를 위해 사용)
-        self.scrollbar = None  # 리스트박스의 스크롤바
-        self.listbox = None  # 주식 검색 결과를 표시하는 리스트박스
-        self.btn_search = None  # 검색 버튼
-        self.stock_entry = None  # 주식 검색 입력 필드
-        self.btn_exit = None  # 프로그램 종료 버튼
-        self.btn_stop = None  # 자동 실행 중지 버튼
-        self.btn_start = None  # 자동 실행 시작 버튼
-        self.lbl_status = None  # 실행 상태 표시 라벨
-
-    @staticmethod
-    def configure_styles():
-        """GUI 스타일을 설정"""
-        style = ttk.Style()
-        style.theme_use("clam")  # ✅ 모던한 테마 적용
-
-        # ✅ 버튼 스타일 설정
-        style.configure("TButton", font=("Arial", 11), padding=5)
-
-        # ✅ 실행 상태 라벨 스타일
-        style.configure("Status.TLabel", font=("Arial", 12, "bold"))
-
-        # ✅ 입력 필드 스타일
-        style.configure("TEntry", padding=5, font=("Arial", 11))
-
-        # ✅ 프레임 배경색 설정
-        style.configure("TFrame", background="#f8f9fa")
+    def _fetch_stock_data(self, stock_code):
+        if self.engine == ENGINE_HTTP:
+            logger.debug("🔍 [HTTP] 크롤링 시작: %s", stock_code)
+            try:
+                stock_data = self.http_client.get_stock_data(stock_code)
+            except HttpEngineError as e:
+                logger.warning("⚠️ [HTTP] [%s] 크롤링 실패, Selenium으로 재시도: %s", stock_code, e)
+                metrics.increment("crawl_fallback_total", target="stock")
+            else:
+                if stock_data is None:
+                    logger.warning("⚠️ [%s] 페이지에 데이터가 없음 (비상장/관리종목 가능성)", stock_code)
+                else:
+                    stock_data["종목코드"] = stock_code
+                    logger.debug("📊 %s 데이터 수집 완료: %s", stock_data['종목명'], stock_data)
+                return stock_data
 
-    def create_widgets(self):
-        """GUI 위젯 생성 및 배치"""
-        # ✅ 실행 상태 라벨
-        self.lbl_status = ttk.Label(self.root, text="🔴 실행 안 됨", style="Status.TLabel", foreground="red")
-        self.lbl_status.pack(pady=10)
+        # ✅ 풀에서 WebDriver 세션을 빌려 Selenium으로 크롤링
+        with self.get_driver_pool().session() as session:
+            stock_data = self._get_stock_data_selenium(session, stock_code)
+        if stock_data:
+            stock_data["종목코드"] = stock_code
+        return stock_data
 
-        # ✅ 버튼 프레임
-        button_frame = ttk.Frame(self.root)
-        button_frame.pack(pady=5)
+    def _get_stock_data_selenium(self, session, stock_code):
+        """Selenium(Chrome)으로 특정 종목 주식 데이터 크롤링
 
-        self.btn_start = ttk.Button(button_frame, text="▶ 자동 실행 시작", command=self.start_scheduler)
-        self.btn_start.grid(row=0, column=0, padx=5)
+        고정 sleep 대신 주입한 스크립트가 필요한 요소를 모두 찾을 때까지 대기하고,
+        모든 필드를 한 번의 execute_script 호출로 dict로 받아옴
+        """
+        from selenium.common.exceptions import TimeoutException
 
-        self.btn_stop = ttk.Button(button_frame, text="⏸ 실행 중지", command=self.stop_scheduler, state=tk.DISABLED)
-        self.btn_stop.grid(row=0, column=1, padx=5)
+        stock_url = f"https://finance.naver.com/item/main.nhn?code={stock_code}"
+        logger.debug("🔍 크롤링 시작: %s (%s)", stock_code, stock_url)
 
-        self.btn_exit = ttk.Button(button_frame, text="⛔ 완전 종료", command=self.exit_program)
-        self.btn_exit.grid(row=0, column=2, padx=5)
+        try:
+            with metrics.stage(STAGE_NAVIGATE, stock_code):
+                session.get(stock_url)
+            with metrics.stage(STAGE_WAIT, stock_code):
+                stock_data = session.wait.until(lambda driver: driver.execute_script(STOCK_EXTRACT_SCRIPT))
 
-        # ✅ 주식 검색 필드
-        search_frame = ttk.Frame(self.root)
-        search_frame.pack(pady=5)
+            # ✅ 페이지 내에 데이터가 있는지 확인
+            if stock_data.get("empty"):
+                logger.warning("⚠️ [%s] 페이지에 데이터가 없음 (비상장/관리종목 가능성)", stock_code)
+                return
 
-        ttk.Label(search_frame, text="🔍 주식 종목 검색:", font=("Arial", 10, "bold")).grid(row=0, column=0, padx=5)
-        self.stock_entry = ttk.Entry(search_frame, width=25)
-        self.stock_entry.grid(row=0, column=1, padx=5)
+            logger.debug("📊 %s 데이터 수집 완료: %s", stock_data['종목명'], stock_data)
+            return stock_data
 
-        self.btn_search = ttk.Button(search_frame, text="검색", command=self.search_and_crawl)
-        self.btn_search.grid(row=0, column=2, padx=5)
+        except TimeoutException:
+            logger.error("❌ [ERROR] 주식 데이터 로딩 시간 초과 (%s)", stock_code)
+        except Exception as e:
+            logger.error("❌ [ERROR] 주식 데이터 크롤링 오류 (%s): %s", stock_code, e)
 
-        # ✅ 검색된 주식 리스트
-        listbox_frame = ttk.Frame(self.root)
-        listbox_frame.pack(pady=10)
+    def get_market_snapshot(self, force=False):
+        """환율(모든 통화) + KOSPI/KOSDAQ 지수 스냅샷 가져오기
 
-        self.listbox = tk.Listbox(listbox_frame, height=8, width=50)
-        self.listbox.grid(row=0, column=0, sticky="nsew")
+        EXCHANGE_CACHE_TTL초 동안은 캐시된 값 재사용 (force=True면 새로 크롤링)
+        스냅샷 행은 모두 같은 "시각"을 가지며 exchange_data(USD/KRW)도 함께 갱신
+        """
+        if force:
+            self.exchange_cache.invalidate(MARKET_CACHE_KEY)
 
-        self.scrollbar = ttk.Scrollbar(listbox_frame, orient="vertical", command=self.listbox.yview)
-        self.scrollbar.grid(row=0, column=1, sticky="ns")
-        self.listbox.config(yscrollcommand=self.scrollbar.set)
+        snapshot = self.exchange_cache.get_or_load(MARKET_CACHE_KEY, self._fetch_market_snapshot)
+        if snapshot is not None:
+            self.market_snapshot = [dict(row) for row in snapshot]
+            self.exchange_data = to_exchange_data(snapshot)
+        return self.market_snapshot
 
-        self.listbox.bind("<<ListboxSelect>>", self.select_stock)
+    def get_exchange_rate(self, force=False):
+        """환율 데이터 가져오기 (시장 지표 스냅샷에서 USD/KRW를 exchange_data로 꺼냄)"""
+        self.get_market_snapshot(force)
 
-    def start_scheduler(self):
-        """스케줄러 실행"""
-        if self.is_running:
-            messagebox.showwarning("경고", "이미 실행 중입니다!")
-            return
+    @classmethod
+    def invalidate_exchange_rate(cls):
+        """캐시된 시장 지표 스냅샷 무효화 (다음 호출 시 새로 크롤링)"""
+        cls.exchange_cache.invalidate(MARKET_CACHE_KEY)
 
-        self.is_running = True
-        self.stop_event.clear()
+    @classmethod
+    def exchange_cache_stats(cls):
+        """시장 지표 캐시 히트/미스 통계"""
+        return cls.exchange_cache.stats()
 
-        self.btn_start.config(state=tk.DISABLED)
-        self.btn_stop.config(state=tk.NORMAL)
-        self.lbl_status.config(text="🔵 실행 중...", foreground="blue")
+    @staticmethod
+    def link_market_snapshot(stock_data, snapshot):
+        """주식 데이터에 시장 지표 스냅샷 시각만 붙인 저장용 행 (환율 값은 스냅샷에 한 번만 저장)"""
+        row = dict(stock_data)
+        if snapshot:
+            row[MARKET_REF_COLUMN] = snapshot[0]["시각"]
+        return row
+
+    def _fetch_market_snapshot(self):
+        """환율 페이지와 국내증시 페이지를 한 번씩 크롤링해 같은 시각의 스냅샷으로 묶음 (환율이 없으면 None)"""
+        with metrics.stage(STAGE_FX_FETCH) as timer:
+            rates = self._fetch_market_rows(MARKET_KIND_FX, self.http_client.get_exchange_rates, parse_exchange_list)
+            indices = self._fetch_market_rows(MARKET_KIND_INDEX, self.http_client.get_market_indices, parse_index_page)
+            timer.ok = rates is not None
+
+        if rates is None:
+            return None  # 캐시하지 않고 다음 호출에서 다시 시도
+        if indices is None:
+            logger.warning("⚠️ 지수 데이터 없이 환율만 저장합니다.")
+
+        snapshot_time = datetime.datetime.now().strftime(MARKET_TIME_FORMAT)
+        snapshot = [{"시각": snapshot_time, **row} for row in rates + (indices or [])]
+        logger.debug("💰 시장 지표 수집 완료: %s", snapshot)
+        return snapshot
+
+    def _fetch_market_rows(self, kind, fetch, parse):
+        """시장 지표(환율/지수) 행 목록 크롤링 (HTTP 엔진 실패 시 Selenium 폴백)"""
+        if self.engine == ENGINE_HTTP:
+            try:
+                return fetch()
+            except HttpEngineError as e:
+                logger.warning("⚠️ [HTTP] %s 크롤링 실패, Selenium으로 재시도: %s", kind, e)
+                metrics.increment("crawl_fallback_total", target="exchange" if kind == MARKET_KIND_FX else "index")
 
-        # ✅ run_scheduler()를 실행할 때, 현재 GUI 인스턴스를 전달
-        thread = threading.Thread(target=run_scheduler, args=(self,), daemon=True)
-        thread.start()
-        messagebox.showinfo("알림", "백그라운드에서 자동 실행이 시작되었습니다!")
+        with self.get_driver_pool().session() as session:
+            return self._get_market_rows_selenium(session, kind, parse)
 
-    def stop_scheduler(self):
-        """스케줄러 정지"""
-        self.is_running = False
-        self.stop_event.set()
+    def _get_market_rows_selenium(self, session, kind, parse):
+        """Selenium(Chrome)으로 시장 지표 크롤링 (요소가 준비되면 HTTP 경로와 같은 파서로 추출)"""
+        from selenium.common.exceptions import TimeoutException
 
-        self.btn_start.config(state=tk.NORMAL)
-        self.btn_stop.config(state=tk.DISABLED)
-        self.lbl_status.config(text="🔴 실행 중지됨", foreground="red")
-        messagebox.showinfo("알림", "스케줄러 실행이 중지되었습니다!")
+        url, ready_selector = MARKET_PAGES[kind]
 
-    def exit_program(self):
-        """프로그램 종료"""
-        self.is_running = False
-        self.stop_event.set()
-        print("🛑 프로그램 완전 종료")
-        sys.exit(0)  # 시스템 종료
+        try:
+            with metrics.stage(STAGE_NAVIGATE):
+                session.get(url)
+            with metrics.stage(STAGE_WAIT):
+                session.wait.until(lambda driver: driver.execute_script(MARKET_READY_SCRIPT, ready_selector))
+            with metrics.stage(STAGE_EXTRACT):
+                return parse(session.driver.page_source)
+
+        except TimeoutException:
+            logger.error("❌ %s 데이터 로딩 시간 초과", kind)
+        except Exception as e:
+            logger.error("❌ %s 데이터 크롤링 오류: %s", kind, e)
 
-    def search_and_crawl(self):
-        """주식 검색 후 크롤링 실행"""
-        selected_stock = self.stock_entry.get()
+    def build_rows(self):
+        """주식 데이터 행에 시장 지표 스냅샷 시각을 붙여 저장할 행 목록 생성"""
+        return [self.link_market_snapshot(stock_data, self.market_snapshot) for stock_data in self.stock_data_list]
 
-        try:
-            stock_df = pd.read_csv("kospi_stock_codes.csv", dtype={'종목코드': str})
-        except FileNotFoundError:
-            messagebox.showerror("파일 오류", "kospi_stock_codes.csv 파일이 없습니다.")
+    def save(self, storage=None):
+        """크롤링한 데이터를 저장소에 한 번에 기록 (기본: STORAGE_BACKENDS 설정)"""
+        if not self.stock_data_list:
+            logger.warning("⚠️ 저장할 데이터가 없습니다.")
             return
 
-        matched_rows = stock_df[stock_df["종목명"].str.contains(selected_stock, na=False)]
+        storage = storage or create_storage(STORAGE_BACKENDS)
+        with metrics.stage(STAGE_PERSIST):
+            count = storage.write(self.build_rows())
+            if self.market_snapshot:
+                storage.write_market(self.market_snapshot)  # ✅ 시장 지표는 실행당 한 번 (같은 시각은 중복 저장 안 함)
+        logger.info("✅ 데이터 저장 완료: %s건", count)
 
-        if matched_rows.empty:
-            messagebox.showwarning("검색 실패", "해당 종목을 찾을 수 없습니다.")
-        elif len(matched_rows) > 1:
-            self.listbox.delete(0, tk.END)
-            for _, row in matched_rows.iterrows():
-                self.listbox.insert(tk.END, f"{row['종목명']} ({row['종목코드']})")
+    def save_to_csv(self, filename="stock_exchange_data.csv"):
+        """크롤링한 데이터를 CSV 파일 끝에 이어서 저장 (기존 파일은 다시 읽지 않음)"""
+        if self.stock_data_list:
+            with metrics.stage(STAGE_PERSIST):
+                storage = CsvAppendStorage(filename)
+                storage.write(self.build_rows())
+                if self.market_snapshot:
+                    storage.write_market(self.market_snapshot)
+            logger.info("✅ CSV 저장 완료: %s", filename)
         else:
-            stock_code = matched_rows.iloc[0]["종목코드"]
-            self.stock_entry.delete(0, tk.END)
-            self.stock_entry.insert(0, stock_code)
-            messagebox.showinfo("검색 성공", f"종목 코드: {stock_code}")
-            crawl_and_save(stock_code)
-
-    def select_stock(self, event=None):
-        """리스트에서 선택한 주식 종목 크롤링"""
-        try:
-            selected = self.listbox.get(self.listbox.curselection())
-            stock_code = selected.split("(")[-1].strip(")")
-            self.stock_entry.delete(0, tk.END)
-            self.stock_entry.insert(0, stock_code)
-            messagebox.showinfo("선택 완료", f"선택된 종목 코드: {stock_code}")
-            crawl_and_save(stock_code)
-        except IndexError:
-            return  # 리스트에서 아무것도 선택하지 않았을 때 오류 방지
+            logger.warning("⚠️ 저장할 데이터가 없습니다.")
 
+    def close_browser(self):
+        """풀에 대기 중인 WebDriver 세션 모두 종료"""
+        if self.driver_pool is not None:
+            self.driver_pool.close_all()
+        logger.info("🛑 WebDriver 종료 완료")
 
 
-# ✅ KOSPI 주식 코드 크롤링
+
+# ✅ KOSPI/KOSDAQ 전체 종목 코드 수집
 def get_kospi_stock_codes():
-    """네이버 금융에서 KOSPI 주식 코드 목록 크롤링"""
-    url = "https://finance.naver.com/sise/sise_market_sum.nhn?sosok=0"
-    options = Options()
-    options.add_argument("--headless")  # 브라우저 창 안 띄움
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36")
-
-    driver = webdriver.Chrome(service=Service(CHROME_DRIVER_PATH), options=options)
-    driver.get(url)
-    time.sleep(3)
-
-    stock_data = []
-    try:
-        rows = driver.find_elements(By.CSS_SELECTOR, "#contentarea table.type_2 tbody tr")
-        for row in rows:
-            try:
-                name = row.find_element(By.CSS_SELECTOR, "td:nth-child(2) a").text
-                stock_code = row.find_element(By.CSS_SELECTOR, "td:nth-child(2) a").get_attribute("href").split("=")[-1]
-                stock_data.append({"종목명": name, "종목코드": stock_code})
-            except NoSuchElementException:
-                print("⚠️ 일부 주식 코드 요소를 찾을 수 없습니다. 건너뜀.")
-                continue
-    except TimeoutException:
-        print("❌ 페이지 로딩 시간이 초과되었습니다.")
-    except WebDriverException as e:
-        print(f"❌ Selenium WebDriver 오류 발생: {e}")
-    except Exception as e:
-        print(f"❌ 알 수 없는 오류 발생: {e}")
-
-    driver.quit()
-
-    df = pd.DataFrame(stock_data)
-    df.to_csv("kospi_stock_codes.csv", index=False, encoding="utf-8-sig")
-    print("✅ KOSPI 주식 코드 리스트 저장 완료: kospi_stock_codes.csv")
+    """네이버 금융에서 KOSPI/KOSDAQ 전체 종목 목록을 병렬로 수집해 변경분만 반영"""
+    scraper = StockExchangeScraper.get_instance()
+    return UniverseBuilder(http_client=scraper.http_client, filename=STOCK_CODES_FILE).refresh()
 
 
 # ✅ 크롤링 & CSV 저장 함수 (중복 제거)
 def crawl_and_save(stock_code):
     scraper = StockExchangeScraper.get_instance()
 
-    print(f"📌 [{stock_code}] 주식 데이터 크롤링 시작...")
+    logger.info("📌 [%s] 주식 데이터 크롤링 시작...", stock_code)
     scraper.get_stock_data(stock_code)
-    print(f"✅ [{stock_code}] 주식 데이터 크롤링 완료!")
+    logger.info("✅ [%s] 주식 데이터 크롤링 완료!", stock_code)
 
-    print("📌 환율 데이터 크롤링 시작...")
-    scraper.get_exchange_rate()
-    print("✅ 환율 데이터 크롤링 완료!")
+    logger.info("📌 시장 지표(환율/지수) 크롤링 시작...")
+    scraper.get_market_snapshot()
+    logger.info("✅ 시장 지표(환율/지수) 크롤링 완료!")
 
-    print("📌 CSV 저장 시작...")
-    scraper.save_to_csv()
-    print("✅ CSV 저장 완료!")
+    logger.info("📌 데이터 저장 시작...")
+    scraper.save()
+    logger.info("✅ 데이터 저장 완료!")
 
 
 
 # 자동화를 위해서 종목코드 stocks.txt에 기입해야함
-def auto_crawl():
-    """stocks.txt에서 종목 코드를 불러와 자동으로 크롤링"""
-    scraper = StockExchangeScraper.get_instance()  # ✅ 싱글톤 객체 가져오기
+def auto_crawl(max_workers=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, timeout=DEFAULT_SYMBOL_TIMEOUT,
+               watchlist=WATCHLIST_FILE, job_queue=None):
+    """stocks.txt에서 종목 코드를 불러와 동시에(배치) 크롤링 (job_queue를 지정하면 작업 큐에 넣기만 함)"""
     now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"📌 [AUTO] {now} - 스케줄 실행 중...")
+    logger.info("📌 [AUTO] %s - 스케줄 실행 중...", now)
 
-    if not os.path.exists("stocks.txt"):
-        print(f"⚠️ [{now}] stocks.txt 파일이 없음! 자동 크롤링 건너뜀")
+    if not os.path.exists(watchlist):
+        logger.warning("⚠️ [%s] %s 파일이 없음! 자동 크롤링 건너뜀", now, watchlist)
         return
 
-    with open("stocks.txt", "r", encoding="utf-8") as file:
-        stock_codes = [line.strip() for line in file.readlines() if line.strip()]
+    stock_codes = load_watchlist(watchlist)
 
     if not stock_codes:
-        print(f"⚠️ [{now}] stocks.txt에 종목 코드가 없음! 자동 크롤링 건너뜀")
+        logger.warning("⚠️ [%s] %s에 종목 코드가 없음! 자동 크롤링 건너뜀", now, watchlist)
+        return
+
+    if job_queue is not None:
+        enqueue_crawl(job_queue, stock_codes)
         return
 
-    for stock_code in stock_codes:
-        print(f"🔍 [{now}] {stock_code} 크롤링 시작...")
-        scraper.get_stock_data(stock_code)  # ✅ 종목별 주가 크롤링
-        scraper.get_exchange_rate()  # ✅ 환율 데이터도 함께 가져오기
-
-        if scraper.stock_data_list:
-            # ✅ 모든 데이터에 환율 정보 추가
-            for data in scraper.stock_data_list:
-                for key, value in scraper.exchange_data.items():
-                    data[key] = value
-
-            # ✅ 데이터 저장
-            scraper.save_to_csv()  # 👉 기존의 중복된 CSV 저장 로직 대신 save_to_csv() 함수 호출
-
-            # ✅ 리스트 초기화 (다음 종목을 위해)
-            scraper.stock_data_list = []
-
-    print(f"✅ [{now}] 자동 크롤링 완료!")
-
-# ✅ 스케줄러 실행 함수
-def run_scheduler(gui_instance):
-    """스케줄러 백그라운드 실행"""
-    while gui_instance.is_running:  # ✅ GUI에서 상태 확인
-        if gui_instance.stop_event.is_set():  # ✅ 종료 신호 감지 시 루프 종료
-            break
-        print(f"⌛ [SCHEDULER] {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - 실행 대기 중...")
-        schedule.run_pending()
-        time.sleep(30)
-
-# ✅ 스케줄 등록
-schedule.every().day.at("09:00").do(auto_crawl)
-schedule.every().day.at("09:30").do(auto_crawl)
-schedule.every().day.at("15:00").do(auto_crawl)
-schedule.every().day.at("18:00").do(auto_crawl)
-
-# 종목 코드 CSV 파일이 없으면 크롤링 실행
-if not os.path.exists("kospi_stock_codes.csv"):
-    print("Kospi Code CSV 파일 없음으로 크롤링 시작")
-    get_kospi_stock_codes()
-else:
-    print("Kospi Code CSV 파일 존재 확인")
-
-# ✅ 실행 상태 변수
-is_running = False
-stop_event = threading.Event()
-
-# ✅ GUI 실행
+    crawl_codes(stock_codes, max_workers=max_workers, rate=rate, timeout=timeout)
+    logger.info("💾 [CACHE] 시장 지표 캐시: %s", StockExchangeScraper.exchange_cache_stats())
+    logger.info("📈 [METRICS] 단계별 소요 시간: %s", metrics.snapshot()["stages"])
+
+
+def crawl_codes(stock_codes, max_workers=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, timeout=DEFAULT_SYMBOL_TIMEOUT,
+                engine=None, storage=None, save=True):
+    """여러 종목을 배치로 크롤링하고 시장 지표 스냅샷과 함께 한 번에 저장 (저장한 행 목록 반환)"""
+    scraper = StockExchangeScraper.get_instance(engine)  # ✅ 스크래퍼 객체 가져오기 (WebDriver 풀 공유)
+
+    # ✅ 종목별 주가를 동시에 크롤링 (결과는 입력 순서 유지)
+    logger.info("🔍 %s개 종목 배치 크롤링 시작 (동시 %s개, 초당 %s건)", len(stock_codes), max_workers, rate)
+    results = crawl_batch(stock_codes, scraper.fetch_stock_data, max_workers=max_workers, rate=rate, timeout=timeout)
+    scraper.stock_data_list = [stock_data for stock_data in results if stock_data]
+
+    rows = []
+    if scraper.stock_data_list:
+        scraper.get_market_snapshot()  # ✅ 환율/지수는 배치당 한 번만 가져오기
+        rows = scraper.build_rows()
+        if save:
+            scraper.save(storage)  # ✅ 실행당 한 번에 기록
+
+        # ✅ 리스트 초기화 (다음 실행을 위해)
+        scraper.stock_data_list = []
+
+    logger.info("✅ 배치 크롤링 완료! (%s/%s개 성공)", len(rows), len(stock_codes))
+    return rows
+
+
+# ✅ 스케줄 등록 (import 시가 아니라 자동 실행을 시작할 때 등록)
+def register_jobs(scheduler=None, watchlist=None, schedule_file=SCHEDULE_FILE, job_queue=None):
+    """전체 종목 갱신 / 자동 크롤링 작업을 스케줄러에 등록 (기존 작업은 지우고 다시 등록)
+
+    watchlist를 지정하면 모든 자동 크롤링 작업이 그 파일을 사용
+    job_queue를 지정하면 직접 크롤링하지 않고 작업 큐에 넣기만 함 (실행은 워커 프로세스가 담당)
+    """
+    scheduler = scheduler or Scheduler()
+    scheduler.clear()
+    if job_queue is not None:
+        scheduler.add_job("universe_refresh", UNIVERSE_REFRESH_CRON, enqueue_universe_refresh, job_queue=job_queue)
+    else:
+        scheduler.add_job("universe_refresh", UNIVERSE_REFRESH_CRON, get_kospi_stock_codes)  # 전체 종목 목록 갱신
+    for spec in load_job_specs(schedule_file, AUTO_CRAWL_JOBS):
+        scheduler.add_job(spec["name"], spec["cron"], auto_crawl, spec.get("trading_days_only", True),
+                          watchlist=watchlist or spec.get("watchlist", WATCHLIST_FILE), job_queue=job_queue)
+    return scheduler
+
+
+# ✅ 작업 큐: 종목을 묶음(chunk) 단위 작업으로 나눠 넣고, 워커가 임대해서 실행
+def _chunks(stock_codes, chunk_size):
+    stock_codes = list(dict.fromkeys(stock_codes))
+    return [stock_codes[i:i + chunk_size] for i in range(0, len(stock_codes), chunk_size)]
+
+
+def enqueue_crawl(job_queue, stock_codes, chunk_size=CRAWL_JOB_CHUNK_SIZE, priority=0):
+    """종목 크롤링 작업을 chunk_size개씩 나눠 큐에 추가 (추가한 작업 수 반환, 대기/실행 중인 같은 묶음은 제외)"""
+    job_ids = [job_queue.enqueue(JOB_CRAWL, {"codes": codes}, priority, f"{JOB_CRAWL}:{','.join(codes)}")
+               for codes in _chunks(stock_codes, chunk_size)]
+    added = sum(job_id is not None for job_id in job_ids)
+    logger.info("📥 [QUEUE] 크롤링 작업 %s개 추가 (%s개 종목)", added, len(stock_codes))
+    return added
+
+
+def enqueue_universe_refresh(job_queue, priority=1):
+    """전체 종목 목록 갱신 작업 추가 (크롤링보다 먼저 실행되도록 우선순위 높게)"""
+    added = job_queue.enqueue(JOB_UNIVERSE, {}, priority, JOB_UNIVERSE) is not None
+    logger.info("📥 [QUEUE] 전체 종목 목록 갱신 작업 %s", "추가" if added else "이미 대기 중")
+    return int(added)
+
+
+def enqueue_backfill(job_queue, stock_codes, since=None, max_pages=None, chunk_size=BACKFILL_JOB_CHUNK_SIZE,
+                     priority=-1):
+    """과거 시세 백필 작업을 chunk_size개씩 나눠 추가 (실시간 크롤링보다 나중에 실행되도록 우선순위 낮게)"""
+    job_ids = [job_queue.enqueue(JOB_BACKFILL, {"codes": codes, "since": since, "max_pages": max_pages}, priority,
+                                 f"{JOB_BACKFILL}:{','.join(codes)}")
+               for codes in _chunks(stock_codes, chunk_size)]
+    added = sum(job_id is not None for job_id in job_ids)
+    logger.info("📥 [QUEUE] 백필 작업 %s개 추가 (%s개 종목)", added, len(stock_codes))
+    return added
+
+
+def run_crawl_job(job, stop_event):
+    """크롤링 작업 실행 (한 종목도 성공하지 못하면 예외 → 나중에 다시 시도)"""
+    codes = job["payload"]["codes"]
+    storage = create_storage(JOB_STORAGE_BACKENDS, sqlite_filename=JOB_SQLITE_FILENAME,
+                             sqlite_journal_mode=JOB_SQLITE_JOURNAL_MODE)
+    rows = crawl_codes(codes, storage=storage)
+    if not rows:
+        raise RuntimeError(f"{len(codes)}개 종목 모두 크롤링 실패")
+    return {"requested": len(codes), "saved": len(rows)}
+
+
+def run_universe_job(job, stop_event):
+    """전체 종목 목록 갱신 작업 실행"""
+    return get_kospi_stock_codes()
+
+
+def run_backfill_job(job, stop_event):
+    """백필 작업 실행 (작업마다 체크포인트 파일을 따로 두어 다시 실행되면 이어서 진행)"""
+    from backfill import HistoryBackfiller, Checkpoint, CHECKPOINT_FILE
+    from storage import OhlcvStorage
+
+    payload = job["payload"]
+    name, ext = os.path.splitext(CHECKPOINT_FILE)
+    backfiller = HistoryBackfiller(http_client=StockExchangeScraper.get_instance().http_client,
+                                   store=OhlcvStorage(JOB_SQLITE_FILENAME, JOB_SQLITE_JOURNAL_MODE),
+                                   checkpoint=Checkpoint(f"{name}_job{job['id']}{ext}"),
+                                   since=payload.get("since"), max_pages=payload.get("max_pages"),
+                                   stop_event=stop_event)
+    summary = backfiller.run(payload["codes"])
+    if stop_event.is_set():
+        raise JobInterrupted("종료 요청으로 백필 중단 (체크포인트부터 이어서 실행)")
+    failed = [code for code, saved in summary.items() if saved is None]
+    if failed:
+        raise RuntimeError(f"백필 실패 종목: {failed}")
+    return {"codes": len(summary), "saved": sum(summary.values())}
+
+
+JOB_HANDLERS = {
+    JOB_CRAWL: run_crawl_job,
+    JOB_UNIVERSE: run_universe_job,
+    JOB_BACKFILL: run_backfill_job,
+}
+
+
+def start_metrics(jsonl_file=METRICS_JSONL_FILE, port=METRICS_PORT):
+    """단계별 측정값 기록 시작: JSON lines 파일 + Prometheus 텍스트 엔드포인트 (None이면 사용 안 함)"""
+    if jsonl_file:
+        metrics.add_sink(JsonLinesSink(jsonl_file))
+    if port is not None:
+        try:
+            MetricsServer(metrics, port=port).start()
+        except OSError as e:
+            logger.warning("⚠️ [METRICS] 메트릭 엔드포인트를 열 수 없음 (포트 %s): %s", port, e)
+
+
+def ensure_universe():
+    """종목 코드 CSV 파일이 없으면 전체 종목 수집"""
+    if not os.path.exists(STOCK_CODES_FILE):
+        logger.info("Kospi Code CSV 파일 없음으로 크롤링 시작")
+        get_kospi_stock_codes()
+    else:
+        logger.info("Kospi Code CSV 파일 존재 확인")
+
+
+# ✅ GUI 실행 (헤드리스 환경에서는 cli.py 사용)
 if __name__ == "__main__":
-    StockCrawlerGUI()
\ No newline at end of file
+    setup_logging(LOG_LEVEL)
+    start_metrics()
+    ensure_universe()
+
+    from gui import StockCrawlerGUI
+    StockCrawlerGUI()
@@ -0,0 +1,203 @@
+import bisect
+import http.server
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# 크롤링 단계 이름
+STAGE_NAVIGATE = "navigate"  # 페이지 요청 (HTTP 요청 / Selenium 페이지 이동)
+STAGE_WAIT = "wait"  # Selenium 요소 대기 (추출 스크립트 포함)
+STAGE_EXTRACT = "extract"  # HTML 파싱
+STAGE_NORMALIZE = "normalize"  # 표시 문자열 → 숫자/날짜 변환
+STAGE_PERSIST = "persist"  # 저장소 기록
+STAGE_FX_FETCH = "fx_fetch"  # 시장 지표(환율/지수) 크롤링 (캐시 미스일 때만)
+STAGE_SYMBOL = "symbol"  # 종목 1개 전체 (HTTP + 폴백 포함)
+STAGE_POLL = "poll"  # 장중 폴링 1회 (관심 종목 전체 시세 요청 + 변경분 저장)
+
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # 초
+METRICS_PORT = 9108  # Prometheus 텍스트 엔드포인트 기본 포트
+METRICS_JSONL_FILE = "crawl_metrics.jsonl"
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+
+def setup_logging(level=logging.INFO):
+    """콘솔 로그 설정 (DEBUG로 설정해야 종목별 상세 로그 출력)"""
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+
+
+class StageTimer:
+    """stage() 블록 안에서 결과를 표시하는 객체 (예외 없이 실패한 경우 ok=False로 설정)"""
+
+    def __init__(self):
+        self.ok = True
+        self.retries = 0
+
+
+class JsonLinesSink:
+    """단계별 측정값을 한 줄에 하나씩 JSON으로 이어 쓰는 파일"""
+
+    def __init__(self, filename=METRICS_JSONL_FILE):
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._file = open(filename, "a", encoding="utf-8", buffering=1)
+
+    def write(self, event):
+        line = json.dumps(event, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Metrics:
+    """단계별 소요 시간 히스토그램과 성공/실패/재시도 카운터 (스레드 안전)"""
+
+    def __init__(self, buckets=STAGE_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.sinks = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}  # stage -> [버킷별 개수..., 초과 개수, 합계, 개수]
+            self._counters = {}  # (이름, 정렬된 라벨) -> 값
+            self._gauges = {}
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        return sink
+
+    def observe(self, stage, seconds, ok=True, code=None, retries=0):
+        """단계 소요 시간 기록"""
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                # 버킷별 개수 + 마지막 버킷 초과 개수, 합계, 전체 개수
+                histogram = self._histograms[stage] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            histogram[bisect.bisect_left(self.buckets, seconds)] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+            self._add(("crawl_stage_total", (("result", "ok" if ok else "error"), ("stage", stage))), 1)
+            if retries:
+                self._add(("crawl_retries_total", (("stage", stage),)), retries)
+            if code is not None and stage == STAGE_SYMBOL:
+                self._gauges[("crawl_symbol_last_seconds", (("code", code),))] = seconds
+
+        if self.sinks:
+            event = {"ts": round(time.time(), 3), "stage": stage, "seconds": round(seconds, 6), "ok": ok}
+            if code is not None:
+                event["code"] = code
+            if retries:
+                event["retries"] = retries
+            for sink in self.sinks:
+                sink.write(event)
+
+    def _add(self, key, amount):
+        self._counters[key] = self._counters.get(key, 0) + amount
+
+    def increment(self, name, amount=1, **labels):
+        """카운터 증가 (예: 폴백 횟수)"""
+        with self._lock:
+            self._add((name, tuple(sorted(labels.items()))), amount)
+
+    @contextmanager
+    def stage(self, stage, code=None):
+        """`with metrics.stage("navigate", code):` 블록 소요 시간 기록 (예외가 나면 실패로 기록)"""
+        timer = StageTimer()
+        started = time.perf_counter()
+        try:
+            yield timer
+        except BaseException:
+            timer.ok = False
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - started, timer.ok, code, timer.retries)
+
+    def snapshot(self):
+        """현재 값을 dict로 반환 ({stages: {stage: {count, sum, ...}}, counters: {...}})"""
+        with self._lock:
+            stages = {stage: {"count": values[-1], "seconds": round(values[-2], 6),
+                              "mean_seconds": round(values[-2] / values[-1], 6) if values[-1] else 0.0}
+                      for stage, values in self._histograms.items()}
+            counters = {_format_key(name, labels): value for (name, labels), value in self._counters.items()}
+        return {"stages": stages, "counters": counters}
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 형식으로 출력"""
+        with self._lock:
+            histograms = {stage: list(values) for stage, values in self._histograms.items()}
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+
+        lines = ["# TYPE crawl_stage_seconds histogram"]
+        for stage, values in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f'crawl_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'crawl_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {values[-1]}')
+            lines.append(f'crawl_stage_seconds_sum{{stage="{stage}"}} {values[-2]:.6f}')
+            lines.append(f'crawl_stage_seconds_count{{stage="{stage}"}} {values[-1]}')
+
+        for kind, values in (("counter", counters), ("gauge", gauges)):
+            for name in sorted({name for name, _ in values}):
+                lines.append(f"# TYPE {name} {kind}")
+                for (key_name, labels), value in sorted(values.items()):
+                    if key_name == name:
+                        lines.append(f"{_format_key(name, labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_key(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class MetricsServer:
+    """GET /metrics 로 Prometheus 텍스트를 돌려주는 로컬 HTTP 서버 (백그라운드 스레드)"""
+
+    def __init__(self, registry, host="127.0.0.1", port=METRICS_PORT):
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self._thread.start()
+        logger.info("📈 [METRICS] 메트릭 엔드포인트: %s", self.url)
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# 프로세스 전체에서 공유하는 메트릭
+metrics = Metrics()
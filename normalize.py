@@ -0,0 +1,129 @@
+import pandas as pd
+
+# 표시용 문자열 컬럼(CSV) → 정규화된 컬럼
+SOURCE_COLUMNS = {
+    "기준 날짜": "date",
+    "종목코드": "code",
+    "종목명": "name",
+    "현재가": "price",
+    "등락가": "change",
+    "등락률": "change_rate",
+    "거래량": "volume",
+    "통화": "currency",
+    "현재 환율": "exchange_rate",
+    "변동률": "exchange_change",
+    "시장 스냅샷": "market_ts",
+}
+
+# 시장 지표 스냅샷(환율/지수) 표시 문자열 컬럼 → 정규화된 컬럼
+MARKET_SOURCE_COLUMNS = {
+    "시각": "ts",
+    "구분": "kind",
+    "종목": "symbol",
+    "현재값": "value",
+    "변동": "change",
+    "변동률": "change_rate",
+}
+
+# 정규화 후 컬럼 순서와 dtype
+NORMALIZED_DTYPES = {
+    "date": "datetime64[ns]",
+    "time": "string",
+    "session": "category",
+    "code": "category",
+    "name": "category",
+    "price": "Int64",
+    "change": "Int64",
+    "change_rate": "float32",
+    "volume": "Int64",
+    "currency": "category",
+    "exchange_rate": "float32",
+    "exchange_change": "float32",
+    "market_ts": "string",
+}
+
+# "2025.02.11 기준(장마감)", "2025.02.11 10:23 기준(장중)"
+_DATE_PATTERN = r"(?P<date>\d{4}\.\d{2}\.\d{2})(?:\s+(?P<time>\d{1,2}:\d{2}))?(?:\s*기준)?(?:\s*\((?P<session>[^)]*)\))?"
+
+
+def _convert_unique(series, convert):
+    """고유값만 변환한 뒤 원래 길이로 펼침 (날짜/환율처럼 같은 값이 반복되는 컬럼에서 빠름)"""
+    codes, uniques = pd.factorize(series)
+    converted = convert(pd.Series(uniques, dtype="string"))
+    result = converted.reindex(codes)  # 결측값(-1)은 NA
+    result.index = series.index
+    return result
+
+
+def _numeric(series):
+    """"55,700" / "-0.63%" / "+1.10" / "N/A" 같은 표시 문자열을 숫자로 변환 (변환 불가는 NA)"""
+    def convert(values):
+        return pd.to_numeric(values.str.replace(r"[,%+\s]", "", regex=True), errors="coerce")
+    return _convert_unique(series, convert)
+
+
+def normalize_quotes(df):
+    """크롤링 결과(표시 문자열) DataFrame을 숫자/날짜 타입 DataFrame으로 변환
+
+    한 행씩이 아니라 배치 전체를 한 번에(벡터 연산으로) 변환
+    - 가격/등락가/거래량: Int64, 등락률/환율: float32
+    - 기준 날짜: date(datetime64) + time + session(장마감/장중 등)
+    - 종목명/종목코드/통화/session: category
+    """
+    source = df.rename(columns=SOURCE_COLUMNS)
+    result = pd.DataFrame(index=source.index)
+
+    if "date" in source:
+        parts = _convert_unique(source["date"], lambda values: values.str.extract(_DATE_PATTERN))
+        result["date"] = pd.to_datetime(parts["date"], format="%Y.%m.%d", errors="coerce")
+        result["time"] = parts["time"].astype("string")
+        result["session"] = parts["session"].astype("category")
+
+    for column in ("code", "name", "currency"):
+        if column in source:
+            result[column] = source[column].astype("string").str.strip().astype("category")
+
+    for column in ("price", "change", "volume"):
+        if column in source:
+            result[column] = _numeric(source[column]).round().astype("Int64")
+
+    for column in ("change_rate", "exchange_rate", "exchange_change"):
+        if column in source:
+            result[column] = _numeric(source[column]).astype("float32")
+
+    if "market_ts" in source:
+        # 환율 대신 시장 지표 스냅샷 시각만 참조 (빈 값은 NA)
+        result["market_ts"] = source["market_ts"].astype("string").str.strip().replace("", pd.NA)
+
+    if "code" in result:
+        # CSV에서 숫자로 읽히면 앞자리 0이 사라지므로 6자리로 맞춤
+        result["code"] = result["code"].astype("string").str.zfill(6).astype("category")
+
+    return result[[c for c in NORMALIZED_DTYPES if c in result]]
+
+
+def normalize_records(rows):
+    """dict 목록(stock_data_list 등)을 정규화된 DataFrame으로 변환"""
+    return normalize_quotes(pd.DataFrame(rows))
+
+
+def normalize_market_records(rows):
+    """시장 지표 스냅샷 행(dict) 목록을 정규화된 DataFrame으로 변환 (현재값/변동/변동률은 float64)"""
+    source = pd.DataFrame(rows).rename(columns=MARKET_SOURCE_COLUMNS)
+    result = pd.DataFrame(index=source.index)
+    for column in ("ts", "kind", "symbol"):
+        result[column] = source[column].astype("string").str.strip() if column in source else pd.NA
+    for column in ("value", "change", "change_rate"):
+        result[column] = _numeric(source[column]).astype("float64") if column in source else float("nan")
+    return result
+
+
+def load_history(filename="stock_exchange_data.csv"):
+    """저장된 CSV 이력을 읽어 정규화된(작은 dtype) DataFrame으로 반환"""
+    raw = pd.read_csv(filename, dtype=str, encoding="utf-8-sig", keep_default_na=False)
+    return normalize_quotes(raw)
+
+
+def memory_usage(df):
+    """DataFrame 메모리 사용량 (바이트, 문자열 포함)"""
+    return int(df.memory_usage(deep=True).sum())
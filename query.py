@@ -0,0 +1,178 @@
+import csv
+import datetime
+import logging
+import os
+import sqlite3
+import pandas as pd
+from normalize import NORMALIZED_DTYPES
+from http_scraper import EXCHANGE_PAIR
+from storage import (SqliteStorage, QUOTE_TABLE_COLUMNS, MARKET_TABLE_COLUMNS, SQLITE_FILENAME, MARKET_CSV_FILENAME,
+                     CSV_ENCODING)
+from universe import UNIVERSE_FILE
+
+logger = logging.getLogger(__name__)
+
+QUERY_MMAP_SIZE = 256 * 1024 * 1024  # 읽기 연결에서 메모리 맵으로 읽을 최대 크기 (바이트)
+VWAP_WINDOW = 20  # VWAP 이동 구간 (거래일 수)
+IMPORT_CHUNK_SIZE = 50000  # CSV 이력 가져오기 배치 크기
+
+# 환율 컬럼은 참조하는 시장 지표 스냅샷의 USD/KRW 값 (스냅샷 참조가 없는 예전 행은 행에 저장된 값)
+_MARKET_COLUMNS = {"currency": "m.symbol", "exchange_rate": "m.value", "exchange_change": "m.change"}
+_COLUMN_LIST = ", ".join(f'COALESCE({_MARKET_COLUMNS[name]}, q."{name}") AS "{name}"' if name in _MARKET_COLUMNS
+                         else f'q."{name}"' for name, _ in QUOTE_TABLE_COLUMNS)
+_FROM = "stock_quotes q LEFT JOIN market_snapshots m ON m.ts = q.market_ts AND m.symbol = ?"
+# 같은 날 스냅샷은 시각 순, 시각이 없는 장마감 스냅샷은 그날의 마지막
+_ORDER_BY = "ORDER BY code, date, time IS NULL, time"
+
+
+def _iso_date(value):
+    """date/datetime/"2025.02.11"/"2025-02-11"을 ISO 날짜 문자열로 변환"""
+    if value is None:
+        return None
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime("%Y-%m-%d")
+    return str(value).strip().replace(".", "-")
+
+
+def _typed(df):
+    """SQLite에서 읽은 DataFrame을 normalize.py와 같은 dtype으로 변환"""
+    df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d", errors="coerce")
+    for name, dtype in NORMALIZED_DTYPES.items():
+        if name != "date" and name in df:
+            df[name] = df[name].astype(dtype)
+    return df
+
+
+def add_aggregates(daily, window=VWAP_WINDOW):
+    """종목별 일별 데이터(날짜 오름차순)에 집계 컬럼 추가 (종목별 groupby 벡터 연산)
+
+    - usd_price: 현재가 / 현재 환율
+    - daily_return: 전일 대비 수익률
+    - vwap: 최근 window 거래일 (종가 × 거래량) 합 / 거래량 합
+    """
+    result = daily.copy()
+    price = result["price"].astype("float64")
+    volume = result["volume"].astype("float64").fillna(0)
+    codes = result["code"]
+
+    result["usd_price"] = (price / result["exchange_rate"].astype("float64")).astype("float32")
+    result["daily_return"] = (price / price.groupby(codes, observed=True).shift(1) - 1).astype("float32")
+
+    # ✅ 누적합 차이로 종목별 이동 합계 계산 (rolling + apply 없이)
+    def rolling_sum(values):
+        cumulative = values.groupby(codes, observed=True).cumsum()
+        return cumulative - cumulative.groupby(codes, observed=True).shift(window).fillna(0)
+
+    turnover = rolling_sum((price * volume).fillna(0))
+    volume_sum = rolling_sum(volume)
+    result["vwap"] = (turnover / volume_sum.where(volume_sum > 0)).astype("float32")
+    return result
+
+
+class QuoteHistory:
+    """SQLite에 저장된 시세 이력 조회 (인덱스 범위 검색으로 필요한 행만 읽음)
+
+    - (code, date, time) 인덱스: 종목별 기간 조회
+    - (date, code) 인덱스: 특정 날짜 전체 종목 조회
+    """
+
+    def __init__(self, filename=SQLITE_FILENAME, mmap_size=QUERY_MMAP_SIZE):
+        SqliteStorage(filename)  # 테이블/인덱스가 없으면 생성
+        self.filename = filename
+        self.conn = sqlite3.connect(f"file:{filename}?mode=ro", uri=True)
+        self.conn.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+
+    def _query(self, where, params):
+        sql = f"SELECT {_COLUMN_LIST} FROM {_FROM} WHERE {where} {_ORDER_BY}"
+        return _typed(pd.read_sql_query(sql, self.conn, params=(EXCHANGE_PAIR, *params)))
+
+    def symbol_range(self, code, start=None, end=None):
+        """종목 X의 start ~ end (양 끝 포함) 스냅샷 전체"""
+        return self._query("code = ? AND date BETWEEN ? AND ?",
+                           (str(code).zfill(6), _iso_date(start) or "0000-00-00", _iso_date(end) or "9999-99-99"))
+
+    def on_date(self, date):
+        """특정 날짜의 전체 종목 스냅샷"""
+        return self._query("date = ?", (_iso_date(date),))
+
+    def daily(self, code, start=None, end=None, window=VWAP_WINDOW):
+        """종목 X의 일별(그날 마지막 스냅샷) 데이터에 VWAP/일간 수익률/달러 환산가 추가
+
+        window만큼 이전 거래일도 함께 읽어 start 첫날부터 집계 값이 채워지도록 함
+        """
+        start = _iso_date(start)
+        if start is not None:
+            warmup = self.conn.execute(
+                "SELECT date FROM stock_quotes WHERE code = ? AND date < ? GROUP BY date ORDER BY date DESC "
+                "LIMIT 1 OFFSET ?", (str(code).zfill(6), start, window)).fetchone()
+            snapshots = self.symbol_range(code, warmup[0] if warmup else None, end)
+        else:
+            snapshots = self.symbol_range(code, None, end)
+
+        daily = snapshots.groupby(["code", "date"], observed=True, sort=False).tail(1).reset_index(drop=True)
+        daily = add_aggregates(daily, window)
+        if start is not None:
+            daily = daily[daily["date"] >= pd.Timestamp(start)].reset_index(drop=True)
+        return daily
+
+    def market(self, symbol=None, start=None, end=None):
+        """시장 지표 스냅샷(환율/지수) 이력 (symbol: "USD/KRW", "KOSPI" 등, 없으면 전체), 시각 순"""
+        where = "ts BETWEEN ? AND ?"
+        params = [_iso_date(start) or "0000-00-00", f"{_iso_date(end) or '9999-99-99'} 24:00:00"]  # end 당일 포함
+        if symbol is not None:
+            where += " AND symbol = ?"
+            params.append(symbol)
+        sql = f"SELECT {', '.join(MARKET_TABLE_COLUMNS)} FROM market_snapshots WHERE {where} ORDER BY ts, symbol"
+        df = pd.read_sql_query(sql, self.conn, params=params)
+        df["ts"] = pd.to_datetime(df["ts"], errors="coerce")
+        return df
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _code_by_name(universe_filename):
+    """종목 목록 파일에서 {종목명: 종목코드} (종목코드 컬럼이 없던 예전 CSV 행 보완용)"""
+    if not os.path.exists(universe_filename):
+        return {}
+    with open(universe_filename, "r", encoding="utf-8-sig", newline="") as file:
+        return {row["종목명"]: row["종목코드"].zfill(6) for row in csv.DictReader(file) if row.get("종목코드")}
+
+
+def import_csv_history(csv_filename="stock_exchange_data.csv", sqlite_filename=SQLITE_FILENAME,
+                       universe_filename=UNIVERSE_FILE, market_csv_filename=MARKET_CSV_FILENAME):
+    """SQLite 저장소가 비어 있으면 기존 CSV 이력(시장 지표 스냅샷 파일 포함)을 가져옴 (가져온 주식 행 수 반환)"""
+    storage = SqliteStorage(sqlite_filename)
+    code_by_name = _code_by_name(universe_filename)
+    conn = sqlite3.connect(sqlite_filename)
+    try:
+        if conn.execute("SELECT 1 FROM stock_quotes LIMIT 1").fetchone():
+            logger.warning("⚠️ [QUERY] stock_quotes에 이미 데이터가 있어 CSV 가져오기를 건너뜀")
+            return 0
+    finally:
+        conn.close()
+
+    count = 0
+    with open(csv_filename, "r", encoding=CSV_ENCODING, newline="") as file:
+        chunk = []
+        for row in csv.DictReader(file):
+            if not row.get("종목코드") and row.get("종목명") in code_by_name:
+                row["종목코드"] = code_by_name[row["종목명"]]
+            chunk.append(row)
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                count += storage.write(chunk)
+                chunk = []
+        count += storage.write(chunk)
+
+    if market_csv_filename and os.path.exists(market_csv_filename):
+        with open(market_csv_filename, "r", encoding=CSV_ENCODING, newline="") as file:
+            market_count = storage.write_market(list(csv.DictReader(file)))
+        logger.info("✅ [QUERY] 시장 지표 스냅샷 %s건 가져오기 완료", market_count)
+    logger.info("✅ [QUERY] CSV 이력 %s건 가져오기 완료", count)
+    return count
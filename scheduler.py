@@ -0,0 +1,237 @@
+import datetime
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+HOLIDAY_FILE = "krx_holidays.txt"  # KRX 휴장일 목록 (한 줄에 YYYY-MM-DD, `#` 뒤는 주석)
+SCHEDULE_FILE = "schedule_jobs.json"  # 자동 크롤링 작업 설정 (없으면 main.AUTO_CRAWL_JOBS 사용)
+MAX_LOOKAHEAD_DAYS = 366  # 다음 실행 시각을 찾을 최대 기간
+
+# 한국 시간: cron 시각과 거래일 판단은 서버 시간대(UTC 등)와 상관없이 KST 기준
+KST = datetime.timezone(datetime.timedelta(hours=9))
+
+# cron 필드: (이름, 최소값, 최대값)
+_CRON_FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+
+
+def _parse_cron_field(text, low, high):
+    """cron 필드 하나("*", "*/15", "9-15", "0,30", "1-5/2")를 허용 값 집합으로 변환"""
+    values = set()
+    for part in text.split(","):
+        range_text, _, step_text = part.partition("/")
+        step = int(step_text) if step_text else 1
+        if range_text == "*":
+            start, end = low, high
+        elif "-" in range_text:
+            start, end = map(int, range_text.split("-", 1))
+        else:
+            start = int(range_text)
+            end = high if step_text else start
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"cron 필드 범위 오류: {part!r} ({low}~{high})")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def now_kst():
+    return datetime.datetime.now(KST)
+
+
+class CronExpression:
+    """5필드 cron 표현식 ("분 시 일 월 요일", 요일은 0=일요일 ~ 6=토요일, 7도 일요일)"""
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 표현식은 5개 필드여야 합니다: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_cron_field(text, low, high) for text, (_, low, high) in zip(fields, _CRON_FIELDS))
+        self.weekdays = {weekday % 7 for weekday in weekdays}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, date):
+        weekday = (date.weekday() + 1) % 7  # cron은 일요일이 0
+        if self._any_day or self._any_weekday:
+            return date.day in self.days and weekday in self.weekdays
+        return date.day in self.days or weekday in self.weekdays  # 둘 다 지정하면 cron처럼 OR
+
+    def next_after(self, after, day_filter=None):
+        """after 이후(초과) 가장 가까운 실행 시각 (day_filter(date)가 False인 날은 건너뜀)"""
+        start = after.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        date = start.date()
+        for _ in range(MAX_LOOKAHEAD_DAYS + 1):
+            if date.month in self.months and self._day_matches(date) and (day_filter is None or day_filter(date)):
+                for hour in sorted(self.hours):
+                    for minute in sorted(self.minutes):
+                        run_at = datetime.datetime.combine(date, datetime.time(hour, minute), tzinfo=after.tzinfo)
+                        if run_at >= start:
+                            return run_at
+            date += datetime.timedelta(days=1)
+        return None
+
+    def __str__(self):
+        return self.expression
+
+
+class TradingCalendar:
+    """주말과 휴장일 파일에 적힌 날짜를 제외한 거래일 달력 (파일이 바뀌면 다시 읽음)"""
+
+    def __init__(self, filename=HOLIDAY_FILE):
+        self.filename = filename
+        self._holidays = frozenset()
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _reload(self):
+        try:
+            mtime = os.path.getmtime(self.filename)
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+
+        holidays = set()
+        if mtime is not None:
+            with open(self.filename, "r", encoding="utf-8") as file:
+                for line in file:
+                    text = line.split("#", 1)[0].strip()
+                    if text:
+                        holidays.add(datetime.date.fromisoformat(text))
+        else:
+            logger.warning("⚠️ [CALENDAR] 휴장일 파일 없음: %s (주말만 제외)", self.filename)
+        self._holidays = frozenset(holidays)
+        self._mtime = mtime
+
+    def is_holiday(self, date):
+        with self._lock:
+            self._reload()
+            return date in self._holidays
+
+    def is_trading_day(self, date):
+        """평일이면서 휴장일이 아닌 날"""
+        if isinstance(date, datetime.datetime):
+            date = date.date()
+        return date.weekday() < 5 and not self.is_holiday(date)
+
+
+class Job:
+    """cron 표현식으로 실행되는 작업 (이전 실행이 끝나지 않았으면 이번 실행은 건너뜀)"""
+
+    def __init__(self, name, cron, func, kwargs=None, trading_days_only=True):
+        self.name = name
+        self.cron = cron if isinstance(cron, CronExpression) else CronExpression(cron)
+        self.func = func
+        self.kwargs = kwargs or {}
+        self.trading_days_only = trading_days_only
+        self.next_run = None
+        self.last_run = None
+        self._running = threading.Lock()
+
+    @property
+    def running(self):
+        return self._running.locked()
+
+    def __str__(self):
+        next_run = self.next_run.strftime("%Y-%m-%d %H:%M") if self.next_run else "-"
+        return f"{self.name} [{self.cron}] 다음 실행 {next_run}"
+
+
+class Scheduler:
+    """다음 실행 시각까지 정확히 대기하는 스케줄러
+
+    - 고정 주기로 깨어나 확인하지 않고 가장 빠른 작업 시각까지 stop_event.wait() → 중지 시 바로 종료
+    - trading_days_only 작업은 주말/휴장일을 건너뛰고 다음 거래일로 예약
+    - 작업은 각자 스레드에서 실행하며, 이전 실행이 아직 진행 중이면 이번 실행은 건너뜀 (겹침 방지)
+    - 기본 시계는 KST (UTC 서버에서도 "0 9 * * 1-5"는 한국 시간 9시, 거래일도 한국 날짜로 판단)
+    """
+
+    def __init__(self, calendar=None, clock=None):
+        self.calendar = calendar or TradingCalendar()
+        self.clock = clock or now_kst
+        self.jobs = []
+        self._threads = []
+
+    def add_job(self, name, cron, func, trading_days_only=True, **kwargs):
+        """작업 등록 (kwargs는 실행 시 func에 전달, 예: watchlist="stocks.txt")"""
+        job = Job(name, cron, func, kwargs, trading_days_only)
+        self._schedule(job, self.clock())
+        self.jobs.append(job)
+        return job
+
+    def clear(self):
+        self.jobs = []
+
+    def _schedule(self, job, after):
+        day_filter = self.calendar.is_trading_day if job.trading_days_only else None
+        job.next_run = job.cron.next_after(after, day_filter)
+
+    def _start(self, job, now):
+        if not job._running.acquire(blocking=False):
+            logger.warning("⚠️ [SCHEDULER] [%s] 이전 실행이 아직 진행 중이라 %s 실행을 건너뜀",
+                           job.name, now.strftime("%H:%M"))
+            return
+
+        def target():
+            try:
+                logger.info("📌 [SCHEDULER] [%s] 실행 시작", job.name)
+                job.func(**job.kwargs)
+            except Exception as e:
+                logger.error("❌ [SCHEDULER] [%s] 실행 오류: %s", job.name, e)
+            finally:
+                job._running.release()
+
+        job.last_run = now
+        thread = threading.Thread(target=target, name=f"job-{job.name}", daemon=True)
+        self._threads = [t for t in self._threads if t.is_alive()] + [thread]
+        thread.start()
+
+    def run_pending(self):
+        """실행 시각이 된 작업을 시작하고 다음 실행 시각을 예약"""
+        now = self.clock()
+        for job in self.jobs:
+            if job.next_run is not None and job.next_run <= now:
+                self._start(job, now)
+                self._schedule(job, now)
+
+    def seconds_until_next(self):
+        """가장 빠른 작업까지 남은 시간 (초, 예약된 작업이 없으면 None)"""
+        next_runs = [job.next_run for job in self.jobs if job.next_run is not None]
+        if not next_runs:
+            return None
+        return max(0.0, (min(next_runs) - self.clock()).total_seconds())
+
+    def run(self, stop_event, join_timeout=None):
+        """stop_event가 설정될 때까지 작업 실행 (중지 시 진행 중인 작업을 join_timeout초까지 기다림)"""
+        for job in self.jobs:
+            logger.info("🗓️ [SCHEDULER] %s", job)
+
+        while not stop_event.is_set():
+            delay = self.seconds_until_next()
+            if delay is None:
+                logger.warning("⚠️ [SCHEDULER] 예약된 작업이 없어 종료")
+                break
+            if delay > 0:
+                logger.debug("⌛ [SCHEDULER] 다음 작업까지 %.1f초 대기", delay)
+                if stop_event.wait(delay):
+                    break
+            self.run_pending()
+
+        if join_timeout:
+            for thread in self._threads:
+                thread.join(join_timeout)
+
+
+def load_job_specs(filename=SCHEDULE_FILE, default=()):
+    """작업 설정 파일 읽기: [{"name", "cron", "watchlist", "trading_days_only"}] (파일이 없으면 default)"""
+    if not os.path.exists(filename):
+        return [dict(spec) for spec in default]
+    with open(filename, "r", encoding="utf-8") as file:
+        specs = json.load(file)
+    for spec in specs:
+        CronExpression(spec["cron"])  # 잘못된 표현식은 시작할 때 바로 알림
+    return specs
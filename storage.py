@@ -0,0 +1,481 @@
+import csv
+import io
+import logging
+import os
+import sqlite3
+import threading
+from metrics import metrics, STAGE_NORMALIZE
+
+logger = logging.getLogger(__name__)
+
+# 저장소 종류
+STORAGE_CSV = "csv"
+STORAGE_SQLITE = "sqlite"
+
+CSV_FILENAME = "stock_exchange_data.csv"
+MARKET_CSV_FILENAME = "market_snapshots.csv"
+SQLITE_FILENAME = "stock_exchange_data.db"
+# SQLite 저널 모드: WAL은 공유 메모리 인덱스(-shm)를 쓰므로 한 호스트 안의 프로세스끼리만 안전
+# 여러 호스트가 공유 파일시스템(NFS 등)으로 같은 DB를 쓸 때는 롤백 저널(DELETE) 사용 (cli.py --shared-fs)
+SQLITE_JOURNAL_MODE = "WAL"
+SHARED_FS_JOURNAL_MODE = "DELETE"
+CSV_ENCODING = "utf-8-sig"
+
+# 주식 행이 참조하는 시장 지표 스냅샷 시각 컬럼 (환율/지수 값은 주식 행마다 복사하지 않고 별도로 한 번만 저장)
+MARKET_REF_COLUMN = "시장 스냅샷"
+
+# 저장 컬럼 순서 (CSV 헤더에 없는 컬럼은 뒤에 추가됨, 통화/현재 환율/변동률은 예전 파일 호환용)
+STOCK_COLUMNS = ["기준 날짜", "종목명", "현재가", "등락가", "등락률", "거래량", "통화", "현재 환율", "변동률", "종목코드",
+                 MARKET_REF_COLUMN]
+MARKET_COLUMNS = ["시각", "구분", "종목", "현재값", "변동", "변동률"]
+
+# 같은 스냅샷 판단 기준: (기준 날짜, 종목코드) → 같은 날 장마감 스냅샷은 한 번만 저장
+DEDUP_KEY_COLUMNS = ("기준 날짜", "종목코드")
+MARKET_KEY_COLUMNS = ("시각", "종목")
+# CSV 중복 판단에 읽는 파일 끝부분 크기: 스냅샷은 시간순으로 이어 쓰므로 같은 날 중복은 최근 행에만 있음
+# (약 8천 행, 전체 시장 하루치보다 넉넉함 → 파일이 커져도 첫 저장 비용이 일정)
+CSV_DEDUP_TAIL_BYTES = 1024 * 1024
+
+# SQLite stock_quotes 테이블 컬럼 (normalize.normalize_quotes 결과와 같은 이름)
+# 버전 1: 정규화된 컬럼 / 버전 2: (code, date, time) 고유 인덱스로 중복 없이 저장
+# 버전 3: 환율은 market_snapshots 테이블에 따로 저장하고 주식 행은 market_ts로 참조
+#        (currency/exchange_rate/exchange_change는 버전 3 이전에 저장된 행에만 값이 있음)
+SQLITE_SCHEMA_VERSION = 3
+QUOTE_TABLE_COLUMNS = [
+    ("date", "TEXT"),
+    ("time", "TEXT"),
+    ("session", "TEXT"),
+    ("code", "TEXT"),
+    ("name", "TEXT"),
+    ("price", "INTEGER"),
+    ("change", "INTEGER"),
+    ("change_rate", "REAL"),
+    ("volume", "INTEGER"),
+    ("currency", "TEXT"),
+    ("exchange_rate", "REAL"),
+    ("exchange_change", "REAL"),
+    ("market_ts", "TEXT"),
+]
+MARKET_TABLE_COLUMNS = ["ts", "kind", "symbol", "value", "change", "change_rate"]
+
+_file_locks = {}
+_file_locks_guard = threading.Lock()
+
+
+def dedup_key(row, key_columns=DEDUP_KEY_COLUMNS):
+    """행의 (기준 날짜, 종목코드) 키 (종목코드는 6자리로 맞춤, 하나라도 없으면 None → 중복 판단 안 함)"""
+    values = [str(row.get(column) or "").strip() for column in key_columns]
+    if any(not value or value == "N/A" for value in values):
+        return None
+    return tuple(value.zfill(6) if column == "종목코드" else value for column, value in zip(key_columns, values))
+
+
+def _lock_for(path):
+    """같은 파일에 대한 동시 쓰기를 막는 프로세스 내 잠금"""
+    path = os.path.abspath(path)
+    with _file_locks_guard:
+        return _file_locks.setdefault(path, threading.Lock())
+
+
+def _connect(filename, journal_mode=SQLITE_JOURNAL_MODE):
+    """SQLite 연결 (기본 WAL: 쓰는 동안에도 다른 프로세스가 읽을 수 있음)"""
+    conn = sqlite3.connect(filename, timeout=30)
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    return conn
+
+
+class BaseStorage:
+    """저장소 공통 동작: add()로 모아두었다가 flush()에서 한 번에 기록"""
+
+    def __init__(self):
+        self._pending = []
+
+    def add(self, rows):
+        """저장할 행(dict) 목록을 버퍼에 추가"""
+        self._pending.extend(rows)
+
+    def flush(self):
+        """버퍼에 모인 행을 한 번에 기록하고 기록한 행 수 반환 (중복으로 건너뛴 행 제외)"""
+        if not self._pending:
+            return 0
+        rows, self._pending = self._pending, []
+        written = self._write(rows)
+        return len(rows) if written is None else written
+
+    def write(self, rows):
+        """add() + flush()"""
+        self.add(rows)
+        return self.flush()
+
+    def _write(self, rows):
+        raise NotImplementedError
+
+    def write_market(self, rows):
+        """시장 지표 스냅샷(환율/지수) 행을 주식 행과 따로 기록 (같은 (시각, 종목)은 한 번만), 기록한 행 수 반환"""
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+
+class CsvAppendStorage(BaseStorage):
+    """파일을 다시 읽지 않고 끝에 이어 쓰는 CSV 저장소
+
+    - 헤더 한 줄만 읽어 컬럼 순서를 맞추며, 새 컬럼이 생긴 경우에만 한 번 헤더를 갱신
+    - 이미 저장된 (기준 날짜, 종목코드) 행은 다시 쓰지 않음
+      (키 목록은 파일 끝 CSV_DEDUP_TAIL_BYTES만 읽고, 이후엔 메모리에서 갱신하거나 다른 프로세스가 추가한 부분만 읽음)
+    - 시장 지표 스냅샷은 market_filename에 (시각, 종목) 기준으로 따로 기록
+    """
+
+    # 파일 경로 -> (마지막으로 확인한 파일 크기, 저장된 키 집합)
+    _saved_keys = {}
+
+    def __init__(self, filename=CSV_FILENAME, market_filename=MARKET_CSV_FILENAME, columns=STOCK_COLUMNS,
+                 key_columns=DEDUP_KEY_COLUMNS):
+        super().__init__()
+        self.filename = filename
+        self.market_filename = market_filename
+        self.columns = columns
+        self.key_columns = key_columns
+
+    def _read_keys(self, offset):
+        """offset 이후에 기록된 행의 키 집합 (offset이 행 중간이면 그 행은 건너뜀)"""
+        header = self._read_header()
+        if not header or any(column not in header for column in self.key_columns):
+            return set()
+
+        with open(self.filename, "rb") as file:
+            if offset:
+                file.seek(offset - 1)
+                if file.read(1) != b"\n":
+                    file.readline()  # 잘린 행
+            data = file.read()
+        lines = data.decode(CSV_ENCODING if not offset else "utf-8", errors="replace").splitlines()
+        if not offset:
+            lines = lines[1:]  # 헤더
+
+        indexes = [(column, header.index(column)) for column in self.key_columns]
+        keys = {dedup_key({column: row[index] for column, index in indexes if index < len(row)}, self.key_columns)
+                for row in csv.reader(lines)}
+        keys.discard(None)
+        return keys
+
+    def _load_keys(self):
+        """최근에 저장된 키 집합 (다른 프로세스가 이어 쓴 부분이 있으면 그 부분만 더 읽음)"""
+        path = os.path.abspath(self.filename)
+        size = os.path.getsize(self.filename) if os.path.exists(self.filename) else 0
+        cached = self._saved_keys.get(path)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+
+        if cached is not None and cached[0] < size:
+            keys = cached[1] | self._read_keys(cached[0])
+        else:
+            keys = self._read_keys(max(size - CSV_DEDUP_TAIL_BYTES, 0)) if size else set()
+        self._saved_keys[path] = (size, keys)
+        return keys
+
+    def _read_header(self):
+        if not os.path.exists(self.filename) or os.path.getsize(self.filename) == 0:
+            return None
+        with open(self.filename, "r", encoding=CSV_ENCODING, newline="") as file:
+            return next(csv.reader(file), None)
+
+    def _migrate_header(self, old_header, new_header):
+        """새 컬럼을 헤더에 추가 (스키마가 바뀔 때 한 번만 파일 전체를 다시 씀)"""
+        logger.info("🔧 [CSV] 새 컬럼 추가로 헤더 갱신: %s", [c for c in new_header if c not in old_header])
+        temp_filename = f"{self.filename}.tmp"
+        with open(self.filename, "r", encoding=CSV_ENCODING, newline="") as src, \
+                open(temp_filename, "w", encoding=CSV_ENCODING, newline="") as dst:
+            reader = csv.reader(src)
+            writer = csv.writer(dst)
+            next(reader, None)
+            writer.writerow(new_header)
+            padding = [""] * (len(new_header) - len(old_header))
+            for row in reader:
+                writer.writerow(row + padding)
+        os.replace(temp_filename, self.filename)
+
+    def _write(self, rows):
+        with _lock_for(self.filename):
+            saved_keys = self._load_keys()
+            unique_rows = []
+            for row in rows:
+                key = dedup_key(row, self.key_columns)
+                if key is None:
+                    unique_rows.append(row)
+                elif key not in saved_keys:
+                    saved_keys.add(key)
+                    unique_rows.append(row)
+            if len(unique_rows) < len(rows):
+                logger.info("♻️ [CSV] 이미 저장된 스냅샷 %s건 건너뜀", len(rows) - len(unique_rows))
+            rows = unique_rows
+            if not rows:
+                return 0
+
+            header = self._read_header()
+            columns = list(header) if header else [c for c in self.columns if any(c in row for row in rows)]
+            new_columns = [c for row in rows for c in row if c not in columns]
+            new_columns = list(dict.fromkeys(new_columns))
+
+            if header and new_columns:
+                self._migrate_header(header, columns + new_columns)
+            columns += new_columns
+
+            # ✅ 배치 전체를 메모리에서 만든 뒤 한 번의 write로 기록
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if not header:
+                writer.writerow(columns)
+            for row in rows:
+                writer.writerow(["" if row.get(c) is None else row.get(c) for c in columns])
+
+            with open(self.filename, "a", encoding=CSV_ENCODING, newline="") as file:
+                file.write(buffer.getvalue())
+                file.flush()
+                os.fsync(file.fileno())
+            self._saved_keys[os.path.abspath(self.filename)] = (os.path.getsize(self.filename), saved_keys)
+            return len(rows)
+
+    def write_market(self, rows):
+        return CsvAppendStorage(self.market_filename, None, MARKET_COLUMNS, MARKET_KEY_COLUMNS).write(rows)
+
+
+class SqliteStorage(BaseStorage):
+    """(date, code) 인덱스와 (code, date, time) 고유 인덱스가 있는 SQLite 저장소 (배치마다 하나의 트랜잭션으로 기록)
+
+    표시용 문자열 대신 정규화된 값(정수 가격/거래량, 실수 등락률/환율, ISO 날짜)으로 저장
+    시장 지표 스냅샷은 (ts, symbol) 기본 키의 market_snapshots 테이블에 따로 저장
+    """
+
+    def __init__(self, filename=SQLITE_FILENAME, journal_mode=SQLITE_JOURNAL_MODE):
+        super().__init__()
+        self.filename = filename
+        self.journal_mode = journal_mode
+        conn = _connect(self.filename, self.journal_mode)
+        try:
+            with conn:
+                self._create_tables(conn)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _create_tables(conn):
+        conn.execute("BEGIN IMMEDIATE")  # 스키마 변환까지 하나의 트랜잭션으로
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='stock_quotes'").fetchone()
+
+        if exists and version < 1:
+            # 이전 버전(모든 컬럼 TEXT, 표시용 문자열) 테이블은 정규화해서 옮김
+            logger.info("🔧 [SQLITE] stock_quotes 테이블을 정규화된 스키마로 변환")
+            conn.execute("ALTER TABLE stock_quotes RENAME TO stock_quotes_old")
+            conn.execute("DROP INDEX IF EXISTS idx_stock_quotes_date_code")
+            conn.execute("DROP INDEX IF EXISTS idx_stock_quotes_code_date")
+        elif exists and version < 2:
+            # 같은 스냅샷이 여러 번 저장된 행은 마지막 것만 남기고 고유 인덱스로 교체
+            removed = conn.execute(
+                "DELETE FROM stock_quotes WHERE code IS NOT NULL AND rowid NOT IN ("
+                "SELECT MAX(rowid) FROM stock_quotes WHERE code IS NOT NULL GROUP BY code, date, IFNULL(time, ''))"
+            ).rowcount
+            conn.execute("DROP INDEX IF EXISTS idx_stock_quotes_code_date")
+            logger.info("🔧 [SQLITE] 중복 스냅샷 %s건 정리 후 고유 인덱스 생성", removed)
+
+        columns = ", ".join(f'"{name}" {sql_type}' for name, sql_type in QUOTE_TABLE_COLUMNS)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS stock_quotes ({columns})")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_stock_quotes_date_code ON stock_quotes (date, code)")
+        # 장마감 스냅샷은 time이 NULL이라 (NULL끼리는 서로 다른 값으로 취급되므로) 빈 문자열로 묶음
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_stock_quotes_key "
+                     "ON stock_quotes (code, date, IFNULL(time, ''))")
+        if exists and 1 <= version < 3:
+            logger.info("🔧 [SQLITE] stock_quotes에 시장 지표 스냅샷 참조 컬럼(market_ts) 추가")
+            conn.execute("ALTER TABLE stock_quotes ADD COLUMN market_ts TEXT")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS market_snapshots ("
+            "ts TEXT NOT NULL, kind TEXT, symbol TEXT NOT NULL, value REAL, change REAL, change_rate REAL, "
+            "PRIMARY KEY (ts, symbol)) WITHOUT ROWID"
+        )
+
+        if exists and version < 1:
+            from normalize import SOURCE_COLUMNS
+            reverse_columns = {value: key for key, value in SOURCE_COLUMNS.items()}
+            cursor = conn.execute("SELECT * FROM stock_quotes_old")
+            old_columns = [reverse_columns.get(d[0], d[0]) for d in cursor.description]
+            rows = [dict(zip(old_columns, values)) for values in cursor.fetchall()]
+            if rows:
+                SqliteStorage._insert(conn, rows)
+            conn.execute("DROP TABLE stock_quotes_old")
+        conn.execute(f"PRAGMA user_version = {SQLITE_SCHEMA_VERSION}")
+
+    @staticmethod
+    def _insert(conn, rows):
+        """행 목록을 배치 단위로 정규화해서 기록 (같은 (code, date, time) 스냅샷은 새 값으로 덮어씀)"""
+        from normalize import normalize_records  # pandas는 SQLite에 기록할 때만 필요
+
+        with metrics.stage(STAGE_NORMALIZE):
+            df = normalize_records(rows)
+        names = [name for name, _ in QUOTE_TABLE_COLUMNS]
+        for name in names:
+            if name not in df:
+                df[name] = None
+        df["date"] = df["date"].dt.strftime("%Y-%m-%d")
+        for name, sql_type in QUOTE_TABLE_COLUMNS:
+            if sql_type == "REAL":
+                df[name] = df[name].astype("float64").round(4)  # float32 오차가 DB에 남지 않도록
+
+        values = df[names].astype(object).where(df[names].notna(), None).values.tolist()
+        placeholders = ", ".join("?" for _ in names)
+        column_list = ", ".join(f'"{name}"' for name in names)
+        conn.executemany(f"INSERT OR REPLACE INTO stock_quotes ({column_list}) VALUES ({placeholders})", values)
+
+    def _write(self, rows):
+        conn = _connect(self.filename, self.journal_mode)
+        try:
+            with conn:  # ✅ 트랜잭션: 전부 기록되거나 전혀 기록되지 않음
+                self._insert(conn, rows)
+        finally:
+            conn.close()
+
+    def write_market(self, rows):
+        if not rows:
+            return 0
+        from normalize import normalize_market_records
+
+        df = normalize_market_records(rows)
+        df = df[df["ts"].notna() & df["symbol"].notna()]
+        values = df[MARKET_TABLE_COLUMNS].astype(object).where(df[MARKET_TABLE_COLUMNS].notna(), None).values.tolist()
+        conn = _connect(self.filename, self.journal_mode)
+        try:
+            with conn:
+                conn.executemany(f"INSERT OR REPLACE INTO market_snapshots ({', '.join(MARKET_TABLE_COLUMNS)}) "
+                                 f"VALUES ({', '.join('?' for _ in MARKET_TABLE_COLUMNS)})", values)
+        finally:
+            conn.close()
+        return len(values)
+
+
+class OhlcvStorage:
+    """일별 시세(OHLCV) SQLite 테이블 ((code, date) 기본 키로 중복 없이 저장)"""
+
+    COLUMNS = ["code", "date", "close", "change", "open", "high", "low", "volume"]
+
+    def __init__(self, filename=SQLITE_FILENAME, journal_mode=SQLITE_JOURNAL_MODE):
+        self.filename = filename
+        self.journal_mode = journal_mode
+        conn = _connect(self.filename, self.journal_mode)
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS daily_ohlcv ("
+                    "code TEXT NOT NULL, date TEXT NOT NULL, close INTEGER, change INTEGER, "
+                    "open INTEGER, high INTEGER, low INTEGER, volume INTEGER, PRIMARY KEY (code, date))"
+                )
+        finally:
+            conn.close()
+
+    def latest_date(self, code):
+        """이미 저장된 가장 최근 날짜 (ISO 문자열, 없으면 None)"""
+        conn = _connect(self.filename, self.journal_mode)
+        try:
+            return conn.execute("SELECT MAX(date) FROM daily_ohlcv WHERE code = ?", (code,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def upsert(self, rows):
+        """일별 시세 행 목록을 하나의 트랜잭션으로 저장 (같은 날짜는 덮어씀)"""
+        if not rows:
+            return 0
+        placeholders = ", ".join("?" for _ in self.COLUMNS)
+        values = [[row.get(column) for column in self.COLUMNS] for row in rows]
+        conn = _connect(self.filename, self.journal_mode)
+        try:
+            with conn:
+                conn.executemany(f"INSERT OR REPLACE INTO daily_ohlcv ({', '.join(self.COLUMNS)}) "
+                                 f"VALUES ({placeholders})", values)
+        finally:
+            conn.close()
+        return len(rows)
+
+
+class TickStorage:
+    """장중 틱 SQLite 테이블 ((code, ts) 기본 키, 가격/거래량이 바뀐 틱만 기록됨)"""
+
+    COLUMNS = ["code", "ts", "price", "change", "change_rate", "volume"]
+
+    def __init__(self, filename=SQLITE_FILENAME, journal_mode=SQLITE_JOURNAL_MODE):
+        self.filename = filename
+        self.journal_mode = journal_mode
+        conn = _connect(self.filename, self.journal_mode)
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS intraday_ticks ("
+                    "code TEXT NOT NULL, ts TEXT NOT NULL, price INTEGER, change INTEGER, "
+                    "change_rate REAL, volume INTEGER, PRIMARY KEY (code, ts)) WITHOUT ROWID"
+                )
+        finally:
+            conn.close()
+
+    def latest(self, codes, since=None):
+        """종목별 마지막 틱 {종목코드: {price, volume, ts}} (since 이전 틱은 제외, 재시작 시 중복 기록 방지용)"""
+        result = {}
+        conn = _connect(self.filename, self.journal_mode)
+        try:
+            for code in codes:
+                row = conn.execute("SELECT ts, price, volume FROM intraday_ticks WHERE code = ? AND ts >= ? "
+                                   "ORDER BY ts DESC LIMIT 1", (code, since or "")).fetchone()
+                if row:
+                    result[code] = {"ts": row[0], "price": row[1], "volume": row[2]}
+        finally:
+            conn.close()
+        return result
+
+    def insert(self, rows):
+        """틱 목록을 하나의 트랜잭션으로 기록 (같은 종목/시각은 덮어씀)"""
+        if not rows:
+            return 0
+        placeholders = ", ".join("?" for _ in self.COLUMNS)
+        values = [[row.get(column) for column in self.COLUMNS] for row in rows]
+        conn = _connect(self.filename, self.journal_mode)
+        try:
+            with conn:
+                conn.executemany(f"INSERT OR REPLACE INTO intraday_ticks ({', '.join(self.COLUMNS)}) "
+                                 f"VALUES ({placeholders})", values)
+        finally:
+            conn.close()
+        return len(rows)
+
+
+class MultiStorage(BaseStorage):
+    """여러 저장소에 같은 행을 기록"""
+
+    def __init__(self, storages):
+        super().__init__()
+        self.storages = storages
+
+    def _write(self, rows):
+        return max([storage.write(list(rows)) for storage in self.storages])
+
+    def write_market(self, rows):
+        return max([storage.write_market(list(rows)) for storage in self.storages])
+
+
+def create_storage(backends=(STORAGE_CSV,), csv_filename=CSV_FILENAME, sqlite_filename=SQLITE_FILENAME,
+                   market_csv_filename=MARKET_CSV_FILENAME, sqlite_journal_mode=SQLITE_JOURNAL_MODE):
+    """설정된 저장소 종류에 맞는 저장소 객체 생성"""
+    if isinstance(backends, str):
+        backends = (backends,)
+
+    storages = []
+    for backend in backends:
+        if backend == STORAGE_CSV:
+            storages.append(CsvAppendStorage(csv_filename, market_csv_filename))
+        elif backend == STORAGE_SQLITE:
+            storages.append(SqliteStorage(sqlite_filename, sqlite_journal_mode))
+        else:
+            raise ValueError(f"알 수 없는 저장소 종류: {backend}")
+
+    return storages[0] if len(storages) == 1 else MultiStorage(storages)
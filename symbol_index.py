@@ -0,0 +1,165 @@
+import bisect
+import csv
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 한글 초성 목록 (유니코드 한글 음절 순서)
+CHOSUNG_LIST = ["ㄱ", "ㄲ", "ㄴ", "ㄷ", "ㄸ", "ㄹ", "ㅁ", "ㅂ", "ㅃ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅉ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+CHOSUNG_SET = set(CHOSUNG_LIST)
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+_JUNGSUNG_JONGSUNG_COUNT = 21 * 28
+
+# 검색 결과 순위 (작을수록 먼저)
+RANK_EXACT_CODE = 0
+RANK_EXACT_NAME = 1
+RANK_NAME_PREFIX = 2
+RANK_CHOSUNG_PREFIX = 3
+RANK_CODE_PREFIX = 4
+RANK_NAME_SUBSTRING = 5
+RANK_CHOSUNG_SUBSTRING = 6
+
+RELOAD_CHECK_INTERVAL = 1.0  # 파일 변경 확인 최소 간격 (초)
+
+
+def to_chosung(text):
+    """문자열의 한글 음절을 초성으로 변환 (예: "삼성전자" → "ㅅㅅㅈㅈ")"""
+    result = []
+    for char in text:
+        code = ord(char)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            result.append(CHOSUNG_LIST[(code - _HANGUL_BASE) // _JUNGSUNG_JONGSUNG_COUNT])
+        else:
+            result.append(char)
+    return "".join(result)
+
+
+def is_chosung_query(query):
+    """검색어가 초성으로만 이루어져 있는지 확인"""
+    letters = [char for char in query if not char.isspace()]
+    return bool(letters) and all(char in CHOSUNG_SET for char in letters)
+
+
+class SymbolIndex:
+    """종목 코드 CSV를 메모리에 올려두고 코드/이름 접두어/부분 문자열/초성으로 검색하는 인덱스
+
+    - 파일이 바뀌면 다음 검색 때 자동으로 다시 읽음
+    - 이름 접두어와 초성 접두어 검색은 정렬된 배열 + 이진 탐색
+    """
+
+    def __init__(self, filename="kospi_stock_codes.csv"):
+        self.filename = filename
+        self.entries = []  # (종목명, 종목코드, 원본 행 dict)
+        self._by_code = {}
+        self._names_sorted = []  # (소문자 종목명, entry 번호)
+        self._chosung_sorted = []  # (초성 문자열, entry 번호)
+        self._chosung = []
+        self._names_lower = []
+        self._mtime = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """CSV 파일을 다시 읽어 인덱스 재구성 (파일이 없으면 빈 인덱스)"""
+        entries = []
+        mtime = None
+        if os.path.exists(self.filename):
+            mtime = os.path.getmtime(self.filename)
+            with open(self.filename, "r", encoding="utf-8-sig", newline="") as file:
+                for row in csv.DictReader(file):
+                    name = (row.get("종목명") or "").strip()
+                    code = (row.get("종목코드") or "").strip()
+                    if name and code:
+                        entries.append((name, code.zfill(6), row))
+
+        chosung = [to_chosung(name) for name, _, _ in entries]
+        names_lower = [name.lower() for name, _, _ in entries]
+        names_sorted = sorted((name, i) for i, name in enumerate(names_lower))
+        chosung_sorted = sorted((value, i) for i, value in enumerate(chosung))
+
+        with self._lock:
+            self.entries = entries
+            self._by_code = {code: i for i, (_, code, _) in enumerate(entries)}
+            self._names_sorted = names_sorted
+            self._chosung_sorted = chosung_sorted
+            self._chosung = chosung
+            self._names_lower = names_lower
+            self._mtime = mtime
+        return len(entries)
+
+    def _reload_if_changed(self):
+        """파일 수정 시각이 바뀌었으면 다시 읽기 (RELOAD_CHECK_INTERVAL마다 한 번만 확인)"""
+        now = time.monotonic()
+        if now - self._last_check < RELOAD_CHECK_INTERVAL:
+            return
+        self._last_check = now
+
+        try:
+            mtime = os.path.getmtime(self.filename)
+        except OSError:
+            mtime = None
+        if mtime != self._mtime:
+            logger.info("🔄 [INDEX] %s 변경 감지, 종목 인덱스 다시 읽기", self.filename)
+            self.reload()
+
+    @staticmethod
+    def _prefix_matches(sorted_keys, prefix):
+        """정렬된 (key, 번호) 배열에서 prefix로 시작하는 항목 번호 목록"""
+        start = bisect.bisect_left(sorted_keys, (prefix,))
+        matches = []
+        for key, index in sorted_keys[start:]:
+            if not key.startswith(prefix):
+                break
+            matches.append(index)
+        return matches
+
+    def lookup(self, stock_code):
+        """종목코드로 (종목명, 종목코드) 찾기"""
+        self._reload_if_changed()
+        with self._lock:
+            index = self._by_code.get(stock_code.strip().zfill(6))
+            return None if index is None else self.entries[index][:2]
+
+    def search(self, query, limit=50):
+        """검색어로 종목 검색 후 순위대로 [(종목명, 종목코드, 순위), ...] 반환"""
+        query = query.strip()
+        if not query:
+            return []
+
+        self._reload_if_changed()
+        with self._lock:
+            entries = self.entries
+            ranks = {}
+
+            def add(indexes, rank):
+                for index in indexes:
+                    if index not in ranks or rank < ranks[index]:
+                        ranks[index] = rank
+
+            lowered = query.lower()
+
+            # ✅ 코드 검색
+            if query.isdigit():
+                if query in self._by_code:
+                    add([self._by_code[query]], RANK_EXACT_CODE)
+                add([i for i, (_, code, _) in enumerate(entries) if code.startswith(query)], RANK_CODE_PREFIX)
+
+            # ✅ 초성 검색
+            if is_chosung_query(query):
+                compact = query.replace(" ", "")
+                add(self._prefix_matches(self._chosung_sorted, compact), RANK_CHOSUNG_PREFIX)
+                add([i for i, value in enumerate(self._chosung) if compact in value], RANK_CHOSUNG_SUBSTRING)
+
+            # ✅ 이름 검색 (접두어 → 부분 문자열)
+            prefix_matches = self._prefix_matches(self._names_sorted, lowered)
+            add(prefix_matches, RANK_NAME_PREFIX)
+            add([i for i in prefix_matches if self._names_lower[i] == lowered], RANK_EXACT_NAME)
+            add([i for i, name in enumerate(self._names_lower) if lowered in name], RANK_NAME_SUBSTRING)
+
+            ordered = sorted(ranks, key=lambda i: (ranks[i], len(entries[i][0]), entries[i][0]))
+            return [(entries[i][0], entries[i][1], ranks[i]) for i in ordered[:limit]]
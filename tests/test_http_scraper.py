@@ -0,0 +1,75 @@
+"""http_scraper 파서 테스트 (bench/fixtures의 녹화된 페이지를 모의 서버로 제공)
+
+실행: python -m pytest -q
+"""
+import pytest
+from bench.mock_server import MockNaverServer
+from http_scraper import (NaverHttpClient, parse_exchange_page, MARKET_KIND_FX, MARKET_KIND_INDEX,
+                          EXCHANGE_PAIR)
+
+NO_DATA_CODE = "999999"  # bench/fixtures/item_999999.html: 종목 정보가 없는 페이지
+
+
+@pytest.fixture(scope="module")
+def client():
+    server = MockNaverServer()
+    server.start()
+    http_client = NaverHttpClient(base_url=server.url)
+    yield http_client
+    http_client.close()
+    server.stop()
+
+
+def test_rising_stock_page(client):
+    assert client.get_stock_data("005930") == {
+        "기준 날짜": "2025.02.11 기준(장마감)",
+        "종목명": "삼성전자",
+        "현재가": "55,700",
+        "등락가": "100",
+        "등락률": "0.18%",
+        "거래량": "24,171,386",
+    }
+
+
+def test_falling_stock_page(client):
+    assert client.get_stock_data("018260") == {
+        "기준 날짜": "2025.02.11 기준(장마감)",
+        "종목명": "삼성에스디에스",
+        "현재가": "55,700",
+        "등락가": "-100",
+        "등락률": "-0.18%",
+        "거래량": "24,171,386",
+    }
+
+
+def test_no_data_page_returns_none(client):
+    assert client.get_stock_data(NO_DATA_CODE) is None
+
+
+def test_exchange_rates(client):
+    assert client.get_exchange_rates() == [
+        {"구분": MARKET_KIND_FX, "종목": "USD/KRW", "현재값": "1,453.30", "변동": "+1.10", "변동률": ""},
+        {"구분": MARKET_KIND_FX, "종목": "JPY/KRW", "현재값": "951.85", "변동": "-3.42", "변동률": ""},
+        {"구분": MARKET_KIND_FX, "종목": "EUR/KRW", "현재값": "1,497.91", "변동": "+2.05", "변동률": ""},
+        {"구분": MARKET_KIND_FX, "종목": "CNY/KRW", "현재값": "198.72", "변동": "-0.11", "변동률": ""},
+    ]
+
+
+def test_exchange_rate(client):
+    expected = {"통화": EXCHANGE_PAIR, "현재 환율": "1,453.30", "변동률": "+1.10"}
+    assert client.get_exchange_rate() == expected
+    assert parse_exchange_page(client.fetch("/marketindex/")) == expected
+
+
+def test_market_indices(client):
+    assert client.get_market_indices() == [
+        {"구분": MARKET_KIND_INDEX, "종목": "KOSPI", "현재값": "2,589.14", "변동": "+12.34", "변동률": "+0.48%"},
+        {"구분": MARKET_KIND_INDEX, "종목": "KOSDAQ", "현재값": "741.29", "변동": "-3.05", "변동률": "-0.41%"},
+    ]
+
+
+def test_unchanged_page_reuses_parsed_result(client):
+    # 두 번째 요청은 ETag로 304 → 이전 파싱 결과 재사용 (반환값은 복사본이어야 함)
+    first = client.get_stock_data("005930")
+    first["현재가"] = "0"
+    assert client.get_stock_data("005930")["현재가"] == "55,700"
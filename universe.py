@@ -0,0 +1,259 @@
+import csv
+import datetime
+import logging
+import os
+import re
+from lxml import html as lxml_html
+from http_scraper import NaverHttpClient, HttpEngineError
+from batch_crawler import crawl_batch
+
+logger = logging.getLogger(__name__)
+
+UNIVERSE_FILE = "kospi_stock_codes.csv"
+CHANGES_FILE = "kospi_stock_codes_changes.csv"  # 신규 상장/상장 폐지 기록
+UNIVERSE_COLUMNS = ["종목명", "종목코드", "시장", "업종", "시가총액"]
+DIFF_COLUMNS = ("종목명", "시장", "업종")  # 이 값이 바뀌었을 때만 파일을 다시 씀
+
+# 시장 구분 (sise_market_sum.nhn?sosok=)
+MARKETS = {"KOSPI": 0, "KOSDAQ": 1}
+
+UNIVERSE_CONCURRENCY = 8
+UNIVERSE_RATE = 10.0
+
+_PAGE_PATTERN = re.compile(r"page=(\d+)")
+_CODE_PATTERN = re.compile(r"code=(\w+)")
+_GROUP_PATTERN = re.compile(r"no=(\d+)")
+
+
+def parse_market_sum_page(page_html):
+    """시가총액 페이지 HTML에서 ([{종목명, 종목코드, 시가총액}], 마지막 페이지 번호) 추출"""
+    tree = lxml_html.fromstring(page_html)
+
+    headers = [th.text_content().strip() for th in tree.cssselect("#contentarea table.type_2 thead th")]
+    market_cap_index = headers.index("시가총액") if "시가총액" in headers else None
+
+    stocks = []
+    for row in tree.cssselect("#contentarea table.type_2 tbody tr"):
+        links = row.cssselect("td:nth-child(2) a")
+        if not links:
+            continue  # 구분선 등 빈 행
+        code_match = _CODE_PATTERN.search(links[0].get("href", ""))
+        if not code_match:
+            continue
+
+        market_cap = ""
+        cells = row.cssselect("td")
+        if market_cap_index is not None and market_cap_index < len(cells):
+            market_cap = cells[market_cap_index].text_content().strip().replace(",", "")
+
+        stocks.append({
+            "종목명": links[0].text_content().strip(),
+            "종목코드": code_match.group(1),
+            "시가총액": market_cap,
+        })
+
+    last_page = 1
+    last_links = tree.cssselect("td.pgRR a")
+    if last_links:
+        page_match = _PAGE_PATTERN.search(last_links[0].get("href", ""))
+        if page_match:
+            last_page = int(page_match.group(1))
+    return stocks, last_page
+
+
+def parse_sector_list_page(page_html):
+    """업종 목록 페이지 HTML에서 [(업종명, 업종 번호)] 추출"""
+    tree = lxml_html.fromstring(page_html)
+    sectors = []
+    for link in tree.cssselect("table.type_1 a"):
+        match = _GROUP_PATTERN.search(link.get("href", ""))
+        if "sise_group_detail" in link.get("href", "") and match:
+            sectors.append((link.text_content().strip(), match.group(1)))
+    return sectors
+
+
+def parse_sector_detail_page(page_html):
+    """업종 상세 페이지 HTML에서 소속 종목코드 목록 추출"""
+    tree = lxml_html.fromstring(page_html)
+    codes = []
+    for link in tree.cssselect("table.type_5 td.name a"):
+        match = _CODE_PATTERN.search(link.get("href", ""))
+        if match:
+            codes.append(match.group(1))
+    return codes
+
+
+def _sort_key(stock):
+    """시장(KOSPI → KOSDAQ)별, 시가총액 큰 순서로 정렬"""
+    market_cap = stock.get("시가총액") or ""
+    return MARKETS.get(stock.get("시장"), len(MARKETS)), -int(market_cap) if market_cap.isdigit() else 0
+
+
+class UniverseBuilder:
+    """KOSPI/KOSDAQ 전체 종목 목록을 HTTP로 병렬 수집하고 기존 파일과 비교해 변경분만 반영"""
+
+    def __init__(self, http_client=None, filename=UNIVERSE_FILE, changes_filename=CHANGES_FILE,
+                 max_workers=UNIVERSE_CONCURRENCY, rate=UNIVERSE_RATE):
+        self.http_client = http_client or NaverHttpClient()
+        self.filename = filename
+        self.changes_filename = changes_filename
+        self.max_workers = max_workers
+        self.rate = rate
+        self.complete = True  # 모든 페이지를 가져왔는지 (실패 시 상장 폐지 판단을 하지 않음)
+        self.sectors_complete = True  # 모든 업종 페이지를 가져왔는지 (실패 시 못 가져온 종목은 기존 업종 유지)
+
+    def _fetch_market_page(self, job):
+        market, page = job
+        try:
+            page_html = self.http_client.fetch("/sise/sise_market_sum.nhn",
+                                               params={"sosok": MARKETS[market], "page": page})
+        except HttpEngineError as e:
+            logger.error("❌ [UNIVERSE] %s %s페이지 요청 실패: %s", market, page, e)
+            return None
+        return parse_market_sum_page(page_html)
+
+    def _fetch_sector_page(self, sector):
+        name, number = sector
+        try:
+            page_html = self.http_client.fetch("/sise/sise_group_detail.nhn",
+                                               params={"type": "upjong", "no": number})
+        except HttpEngineError as e:
+            logger.error("❌ [UNIVERSE] 업종 '%s' 요청 실패: %s", name, e)
+            return None
+        return parse_sector_detail_page(page_html)
+
+    def _run(self, jobs, fetch):
+        return crawl_batch(jobs, fetch, max_workers=self.max_workers, rate=self.rate)
+
+    def fetch_stocks(self):
+        """두 시장의 모든 페이지를 병렬로 가져와 종목 목록 반환"""
+        stocks = []
+        first_pages = self._run([(market, 1) for market in MARKETS], self._fetch_market_page)
+        if any(result is None for result in first_pages):
+            self.complete = False
+
+        remaining_jobs = []
+        for market, result in zip(MARKETS, first_pages):
+            if result is None:
+                continue
+            page_stocks, last_page = result
+            stocks.extend({**stock, "시장": market} for stock in page_stocks)
+            remaining_jobs.extend((market, page) for page in range(2, last_page + 1))
+
+        for (market, _), result in zip(remaining_jobs, self._run(remaining_jobs, self._fetch_market_page)):
+            if result is None:
+                self.complete = False
+                continue
+            stocks.extend({**stock, "시장": market} for stock in result[0])
+        return stocks
+
+    def fetch_sectors(self):
+        """업종별 상세 페이지를 병렬로 가져와 {종목코드: 업종명} 반환 (실패가 있으면 sectors_complete = False)"""
+        try:
+            sectors = parse_sector_list_page(self.http_client.fetch("/sise/sise_group.nhn", params={"type": "upjong"}))
+        except HttpEngineError as e:
+            logger.error("❌ [UNIVERSE] 업종 목록 요청 실패: %s", e)
+            self.sectors_complete = False
+            return {}
+
+        sector_by_code = {}
+        for (name, _), codes in zip(sectors, self._run(sectors, self._fetch_sector_page)):
+            if codes is None:
+                self.sectors_complete = False
+                continue
+            for code in codes:
+                sector_by_code[code] = name
+        return sector_by_code
+
+    def build(self):
+        """전체 종목 목록 수집 ([{종목명, 종목코드, 시장, 업종, 시가총액}])"""
+        self.complete = True
+        self.sectors_complete = True
+        stocks = self.fetch_stocks()
+        sector_by_code = self.fetch_sectors()
+
+        # 업종 페이지를 다 가져오지 못했으면 업종을 찾지 못한 종목은 None (알 수 없음 → 변경으로 보지 않음)
+        missing_sector = "" if self.sectors_complete else None
+        universe = {}
+        for stock in stocks:
+            stock["업종"] = sector_by_code.get(stock["종목코드"], missing_sector)
+            universe.setdefault(stock["종목코드"], stock)
+        return list(universe.values())
+
+    def load_existing(self):
+        """기존 종목 파일 읽기 ({종목코드: 행}, 헤더)"""
+        if not os.path.exists(self.filename):
+            return {}, []
+        with open(self.filename, "r", encoding="utf-8-sig", newline="") as file:
+            reader = csv.DictReader(file)
+            return {row["종목코드"].zfill(6): row for row in reader if row.get("종목코드")}, reader.fieldnames or []
+
+    @staticmethod
+    def diff(existing, fetched, complete=True):
+        """(신규 상장, 상장 폐지, 정보 변경) 목록 계산"""
+        fetched_by_code = {stock["종목코드"]: stock for stock in fetched}
+        added = [stock for code, stock in fetched_by_code.items() if code not in existing]
+        removed = [row for code, row in existing.items() if code not in fetched_by_code] if complete else []
+        changed = [stock for code, stock in fetched_by_code.items()
+                   if code in existing and any(stock.get(c) is not None and existing[code].get(c, "") != stock[c]
+                                               for c in DIFF_COLUMNS)]
+        return added, removed, changed
+
+    def _write_universe(self, rows):
+        """종목 파일을 임시 파일에 쓴 뒤 교체 (쓰는 도중 중단되어도 기존 파일 유지)"""
+        temp_filename = f"{self.filename}.tmp"
+        with open(temp_filename, "w", encoding="utf-8-sig", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=UNIVERSE_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(temp_filename, self.filename)
+
+    def _append_changes(self, added, removed):
+        """신규 상장/상장 폐지 내역을 변경 기록 파일 끝에 추가"""
+        if not added and not removed:
+            return
+        today = datetime.date.today().isoformat()
+        is_new = not os.path.exists(self.changes_filename)
+        with open(self.changes_filename, "a", encoding="utf-8-sig", newline="") as file:
+            writer = csv.writer(file)
+            if is_new:
+                writer.writerow(["날짜", "구분", "종목코드", "종목명", "시장"])
+            for stock in added:
+                writer.writerow([today, "신규", stock["종목코드"], stock["종목명"], stock.get("시장", "")])
+            for row in removed:
+                writer.writerow([today, "폐지", row["종목코드"], row["종목명"], row.get("시장", "")])
+
+    def refresh(self):
+        """전체 종목을 수집해 변경분이 있을 때만 종목 파일 갱신 (변경 건수 dict 반환)"""
+        logger.info("📌 [UNIVERSE] KOSPI/KOSDAQ 전체 종목 수집 시작...")
+        fetched = self.build()
+        if not fetched:
+            logger.warning("⚠️ [UNIVERSE] 수집된 종목이 없어 갱신하지 않음")
+            return {"added": 0, "removed": 0, "changed": 0}
+
+        existing, header = self.load_existing()
+        if not self.sectors_complete:
+            # 업종을 가져오지 못한 종목은 기존 파일의 업종 유지 (빈 값으로 덮어쓰지 않음)
+            for stock in fetched:
+                if stock["업종"] is None:
+                    stock["업종"] = existing.get(stock["종목코드"], {}).get("업종", "")
+            logger.warning("⚠️ [UNIVERSE] 일부 업종 페이지 수집 실패로 해당 종목은 기존 업종 유지")
+        added, removed, changed = self.diff(existing, fetched, complete=self.complete)
+        schema_changed = header != UNIVERSE_COLUMNS
+
+        if added or removed or changed or schema_changed:
+            rows = list(fetched)
+            if not self.complete:
+                # 일부 페이지를 못 가져온 경우 기존 종목은 그대로 유지
+                fetched_codes = {stock["종목코드"] for stock in fetched}
+                rows += [row for code, row in existing.items() if code not in fetched_codes]
+            self._write_universe(sorted(rows, key=_sort_key))
+            self._append_changes(added, removed)
+            logger.info("✅ [UNIVERSE] 종목 파일 갱신: 신규 %s / 폐지 %s / 변경 %s (총 %s개)",
+                        len(added), len(removed), len(changed), len(fetched))
+        else:
+            logger.info("✅ [UNIVERSE] 변경 사항 없음 (총 %s개)", len(fetched))
+
+        if not self.complete:
+            logger.warning("⚠️ [UNIVERSE] 일부 페이지 수집 실패로 상장 폐지 판단은 건너뜀")
+        return {"added": len(added), "removed": len(removed), "changed": len(changed)}